@@ -7,9 +7,18 @@ from dotenv import load_dotenv
 from flasgger import Swagger
 from flask_cors import CORS
 from pyngrok import ngrok
+from sqlalchemy.orm import configure_mappers
 
 from .db import db
 from .db import mongo
+from . import instrumentation
+from .background_jobs import background_jobs_sweeper, recover_background_jobs
+from .commands import register_commands
+from .controllers.calculators.quote_client import quote_client
+from .controllers.product_images.image_job_runner import image_job_runner
+from .controllers.webhook_inbox.webhook_inbox_runner import webhook_inbox_runner
+from .controllers.transactions.transactions_expiry import unpaid_transaction_sweeper
+from .controllers.transactions.transactions_midtrans import MidtransConfirmation
 from .controllers.users import users_blueprint
 from .controllers.sellers import sellers_blueprint
 from .controllers.locations import locations_blueprint
@@ -23,6 +32,8 @@ from .controllers.shipments import shipments_blueprint
 from .controllers.calculators import calculators_blueprint
 from .controllers.categories import categories_blueprint
 from .controllers.transactions import transactions_blueprint
+from .controllers.reference import reference_blueprint
+from .controllers.reference.reference_store import reference_store
 
 load_dotenv(override=True)
 migrate = Migrate()
@@ -34,8 +45,11 @@ host = os.getenv("MYSQL_HOST")
 database = os.getenv("MYSQL_DATABASE")
 
 
-def create_app():
-
+def create_app(test_config=None):
+    """
+    test_config overrides the settings read from the environment, e.g. a
+    SQLite SQLALCHEMY_DATABASE_URI for benchmarks.
+    """
     app = Flask(__name__)
 
     app.config["SECRET_KEY"] = os.getenv("SECRET_KEY")
@@ -48,8 +62,42 @@ def create_app():
     app.config["MIDTRANS_SERVER_KEY"] = os.getenv("MIDTRANS_SERVER_KEY")
     app.config["MIDTRANS_IS_PRODUCTION"] = os.getenv("MIDTRANS_IS_PRODUCTION")
     app.config["MIDTRANS_CLIENT_KEY"] = os.getenv("MIDTRANS_CLIENT_KEY")
+    app.config["QUOTE_MAX_CONNECTIONS"] = os.getenv("QUOTE_MAX_CONNECTIONS")
+    app.config["QUOTE_MAX_CONCURRENCY"] = os.getenv("QUOTE_MAX_CONCURRENCY")
+    app.config["QUOTE_TIMEOUT_SECONDS"] = os.getenv("QUOTE_TIMEOUT_SECONDS")
+    app.config["IMAGE_JOB_WORKERS"] = os.getenv("IMAGE_JOB_WORKERS")
+    app.config["IMAGE_UPLOAD_WORKERS"] = os.getenv("IMAGE_UPLOAD_WORKERS")
+    app.config["IMAGE_JOB_MAX_ATTEMPTS"] = os.getenv("IMAGE_JOB_MAX_ATTEMPTS")
+    app.config["IMAGE_JOB_BACKOFF_SECONDS"] = os.getenv("IMAGE_JOB_BACKOFF_SECONDS")
+    app.config["IMAGE_JOB_LEASE_SECONDS"] = os.getenv("IMAGE_JOB_LEASE_SECONDS")
+    app.config["REFERENCE_STORE_TTL"] = os.getenv("REFERENCE_STORE_TTL")
+    app.config["WEBHOOK_WORKERS"] = os.getenv("WEBHOOK_WORKERS")
+    app.config["WEBHOOK_MAX_ATTEMPTS"] = os.getenv("WEBHOOK_MAX_ATTEMPTS")
+    app.config["WEBHOOK_BACKOFF_SECONDS"] = os.getenv("WEBHOOK_BACKOFF_SECONDS")
+    app.config["WEBHOOK_LEASE_SECONDS"] = os.getenv("WEBHOOK_LEASE_SECONDS")
+    app.config["BACKGROUND_RECOVERY_INTERVAL_SECONDS"] = os.getenv(
+        "BACKGROUND_RECOVERY_INTERVAL_SECONDS", "60"
+    )
+    app.config["TRANSACTION_SWEEP_INTERVAL_SECONDS"] = os.getenv(
+        "TRANSACTION_SWEEP_INTERVAL_SECONDS"
+    )
+    app.config["TRANSACTION_SWEEP_BATCH_SIZE"] = os.getenv(
+        "TRANSACTION_SWEEP_BATCH_SIZE"
+    )
+    app.config["INSTRUMENTATION_ENABLED"] = os.getenv("INSTRUMENTATION_ENABLED")
+    app.config["SLOW_REQUEST_MS"] = os.getenv("SLOW_REQUEST_MS")
+    app.config["INSTRUMENTATION_SAMPLE_QUERIES"] = os.getenv(
+        "INSTRUMENTATION_SAMPLE_QUERIES"
+    )
+    app.config["QUERY_BUDGETS"] = os.getenv("QUERY_BUDGETS")
+    app.config["QUERY_REPEAT_THRESHOLD"] = os.getenv("QUERY_REPEAT_THRESHOLD")
+    app.config["QUERY_BUDGET_STRICT"] = os.getenv("QUERY_BUDGET_STRICT")
+
+    if test_config:
+        app.config.update(test_config)
 
-    ngrok.set_auth_token(os.getenv("NGROK_AUTH_TOKEN"))
+    if os.getenv("NGROK_AUTH_TOKEN"):
+        ngrok.set_auth_token(os.getenv("NGROK_AUTH_TOKEN"))
 
     app.register_blueprint(users_blueprint)
     app.register_blueprint(sellers_blueprint)
@@ -64,13 +112,24 @@ def create_app():
     app.register_blueprint(calculators_blueprint)
     app.register_blueprint(categories_blueprint)
     app.register_blueprint(transactions_blueprint)
+    app.register_blueprint(reference_blueprint)
 
     db.init_app(app)
+    # once, every model is imported by now; creates the backref attributes
+    # the repositories build their load options from
+    configure_mappers()
+    instrumentation.init_app(app)
     mongo.init_app(app)
     migrate.init_app(app, db)
     jwt.init_app(app)
     Swagger(app)
     CORS(app)
+    register_commands(app)
+    quote_client.init_app(app)
+    image_job_runner.init_app(app)
+    webhook_inbox_runner.init_app(
+        app, handler=MidtransConfirmation().process_notification
+    )
 
     cloudinary.config(
         cloud_name=os.getenv("CLOUDINARY_CLOUD_NAME"),
@@ -81,4 +140,8 @@ def create_app():
     with app.app_context():
         db.create_all()
 
+    reference_store.init_app(app)
+    unpaid_transaction_sweeper.init_app(app)
+    background_jobs_sweeper.init_app(app)
+
     return app
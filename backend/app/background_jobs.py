@@ -0,0 +1,71 @@
+import threading
+from datetime import datetime, timedelta
+import pytz
+
+from .db import db
+from .controllers.product_images.image_job_runner import image_job_runner
+from .controllers.webhook_inbox.webhook_inbox_runner import webhook_inbox_runner
+
+
+def recover_background_jobs(app, stale_before=None):
+    """
+    Resubmit image jobs and webhook inbox entries left behind by stopped
+    processes or lost timers. With stale_before, only the ones untouched
+    since then.
+    """
+    with app.app_context():
+        try:
+            image_job_runner.recover(stale_before)
+            webhook_inbox_runner.recover(stale_before)
+        finally:
+            db.session.remove()
+
+
+class BackgroundJobsSweeper:
+    """
+    Recovers background jobs once when the worker starts, then every
+    BACKGROUND_RECOVERY_INTERVAL_SECONDS picks up what is still queued
+    after a full interval: leases of dead workers and jobs whose in-memory
+    submit or retry timer died with their process. Keep the interval above
+    the longest retry backoff. 0 disables both.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.interval = 0
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def init_app(self, app):
+        self.app = app
+        self.interval = float(
+            app.config.get("BACKGROUND_RECOVERY_INTERVAL_SECONDS") or 0
+        )
+
+        if self.interval <= 0:
+            return
+
+        self.thread = threading.Thread(
+            target=self.work, name="background-jobs-sweeper", daemon=True
+        )
+        self.thread.start()
+
+    def work(self):
+        stale_before = None
+
+        while True:
+            try:
+                recover_background_jobs(self.app, stale_before)
+            except Exception:
+                self.app.logger.exception("Background job recovery failed")
+
+            if self.stop_event.wait(self.interval):
+                return
+
+            stale_before = datetime.now(pytz.UTC) - timedelta(seconds=self.interval)
+
+    def stop(self):
+        self.stop_event.set()
+
+
+background_jobs_sweeper = BackgroundJobsSweeper()
@@ -0,0 +1,74 @@
+import click
+from flask.cli import AppGroup
+
+from .db import db
+from .controllers.products.products_repository import ProductsRepository
+from .controllers.stock_holds.stock_holds_service import StockHoldsService
+from .controllers.idempotency.idempotency_service import IdempotencyService
+from .controllers.transactions.transactions_expiry import TransactionsExpiryService
+
+
+products_cli = AppGroup("products", help="Product maintenance commands.")
+stock_cli = AppGroup("stock", help="Stock reservation commands.")
+transactions_cli = AppGroup("transactions", help="Transaction maintenance commands.")
+idempotency_cli = AppGroup("idempotency", help="Idempotency key maintenance commands.")
+
+
+@products_cli.command("rebuild-ratings")
+def rebuild_ratings():
+    """Recompute rating_sum, rating_count and avg_rating from the reviews table."""
+    try:
+        updated = ProductsRepository().rebuild_ratings()
+        db.session.commit()
+        click.echo(f"Rebuilt ratings for {updated} products")
+    except Exception as e:
+        db.session.rollback()
+        raise click.ClickException(str(e))
+
+
+@stock_cli.command("release-expired-holds")
+@click.option("--batch-size", default=500, show_default=True)
+def release_expired_holds(batch_size):
+    """Give back the stock of unpaid orders whose hold has expired."""
+    try:
+        released = StockHoldsService().release_expired(batch_size=batch_size)
+        click.echo(f"Released {released} expired stock holds")
+    except Exception as e:
+        raise click.ClickException(str(e))
+
+
+@transactions_cli.command("expire-unpaid")
+@click.option("--batch-size", default=500, show_default=True)
+@click.option("--max-batches", default=None, type=int)
+def expire_unpaid(batch_size, max_batches):
+    """Cancel transactions that were not paid before the payment deadline."""
+    try:
+        metrics = TransactionsExpiryService().expire_unpaid(
+            batch_size=batch_size, max_batches=max_batches
+        )
+        click.echo(
+            f"Expired {metrics['transactions']} transactions in "
+            f"{metrics['batches']} batches ({metrics['duration_ms']} ms): "
+            f"{metrics['vouchers']} vouchers, {metrics['stock_holds']} stock holds "
+            f"released, {metrics['shipment_details']} shipment details deleted"
+        )
+    except Exception as e:
+        raise click.ClickException(str(e))
+
+
+@idempotency_cli.command("purge-keys")
+@click.option("--older-than-hours", default=24, show_default=True)
+def purge_keys(older_than_hours):
+    """Delete completed idempotency keys, retries after this window execute again."""
+    try:
+        purged = IdempotencyService().purge(older_than_hours=older_than_hours)
+        click.echo(f"Purged {purged} idempotency keys")
+    except Exception as e:
+        raise click.ClickException(str(e))
+
+
+def register_commands(app):
+    app.cli.add_command(products_cli)
+    app.cli.add_command(stock_cli)
+    app.cli.add_command(transactions_cli)
+    app.cli.add_command(idempotency_cli)
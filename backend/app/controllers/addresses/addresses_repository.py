@@ -1,3 +1,5 @@
+from sqlalchemy.orm import joinedload
+
 from app.db import db
 from app.models import Addresses
 
@@ -10,8 +12,18 @@ class AddressesRepository:
     def create_address(self, data):
         return self.address(**data)
 
+    def address_options(self):
+        # Addresses.to_dict reads both names, join them instead of two
+        # lazy loads per address
+        return (
+            joinedload(self.address.province_addresses),
+            joinedload(self.address.district_addresses),
+        )
+
     def get_list_address(self, role_id, role):
-        query = self.address.query.filter(self.address.is_active == 1)
+        query = self.address.query.filter(self.address.is_active == 1).options(
+            *self.address_options()
+        )
 
         if role == "user":
             query = query.filter_by(user_id=role_id)
@@ -22,7 +34,9 @@ class AddressesRepository:
         return query.all()
 
     def get_address_by_filter(self, address_id, role_id, role):
-        query = self.address.query.filter(self.address.is_active == 1)
+        query = self.address.query.filter(self.address.is_active == 1).options(
+            *self.address_options()
+        )
 
         if role == "user":
             query = query.filter_by(user_id=role_id, id=address_id)
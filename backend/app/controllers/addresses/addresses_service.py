@@ -181,13 +181,13 @@ class AddressesService:
         return address
 
     def check_district_and_province(self, province_id, district_id):
-        district_id = self.location_service.get_location_by_id(
-            prov_id=None, dist_id=district_id
-        )
+        try:
+            district = self.location_service.get_district(int(district_id))
+        except (TypeError, ValueError):
+            raise ValueError("Invalid district_id")
 
-        error = district_id.get("error", None)
-        if error:
-            raise ValueError(error)
+        if district is None:
+            raise ValueError("District not found")
 
-        if district_id["province_id"] != province_id:
+        if district["province_id"] != province_id:
             raise ValueError("Province and district do not match")
@@ -1,6 +1,7 @@
 from . import calculators_blueprint
 from .calculators_service import CalculatorsService
 from .shipment_service import ShipmentService
+from ..common import has_admin_token
 
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from flask import request
@@ -26,3 +27,12 @@ def shipment_option():
     data = request.get_json()
     identity = get_jwt_identity()
     return shipment_service.shipment_option_price(data, identity)
+
+
+@calculators_blueprint.route("/shipmentcache", methods=["GET"])
+@swag_from("./shipment_cache_stats.yml")
+def shipment_cache_stats():
+    if not has_admin_token(request):
+        return {"error": "Unauthorized"}, 401
+
+    return shipment_service.cache_stats()
@@ -1,5 +1,3 @@
-import asyncio
-
 from ..users.users_services import UserServices
 
 from .voucher_service import VoucherService
@@ -142,8 +140,9 @@ class CalculatorsService:
         if not carts:
             raise ValueError("No items in cart")
 
-        if not self.user_service.user_info(user_id=user_id):
-            raise ValueError("User not found")
+        user, status_code = self.user_service.verify_user(user_id=user_id)
+        if status_code != 200:
+            raise ValueError(user["error"])
 
     def calculate_shipment_fee(
         self,
@@ -157,6 +156,8 @@ class CalculatorsService:
         )["district_id"]
 
         all_shipment_fee = {}
+        quote_requests = []
+        quoted_couriers = []
 
         for courier in selected_courier:
             seller_ids = calculated_product_detail.keys()
@@ -168,43 +169,48 @@ class CalculatorsService:
             seller_address = self.shipment_service.get_seller_address(
                 seller_id=seller_id
             )
-            seller_address_id = seller_address["id"]
             seller_district = seller_address["district_id"]
             courier_vendor = courier["selected_courier"]
 
-            seller_identity = {"role": "seller", "id": seller_id}
-            couriers_option, status_code = (
-                self.shipping_options_service.get_option_list(identity=seller_identity)
+            seller_courier, status_code = (
+                self.shipping_options_service.get_active_couriers(seller_id=seller_id)
             )
             if status_code != 200:
-                raise ValueError(couriers_option["error"])
-
-            seller_courier = []
-            for option in couriers_option:
-                if option["is_active"] == 1:
-                    seller_courier.append(option["shipment"])
+                raise ValueError(seller_courier["error"])
 
             if courier_vendor not in seller_courier:
                 raise ValueError(
                     f"selected_courier vendor {courier_vendor} not in any courier that provided by seller {seller_id}"
                 )
 
-            shipment_option = asyncio.run(
-                self.shipment_service.get_possible_shipment_option(
-                    user_district=user_district,
-                    seller_district=seller_district,
-                    total_weight=calculated_product_detail.get(int(seller_id)).get(
+            quoted_couriers.append(
+                {**courier, "seller_address_id": seller_address["id"]}
+            )
+            quote_requests.append(
+                {
+                    "user_district": user_district,
+                    "seller_district": seller_district,
+                    "total_weight": calculated_product_detail.get(int(seller_id)).get(
                         "total_weight_gram"
                     ),
-                    courier=courier_vendor,
-                )
+                    "courier": courier_vendor,
+                }
             )
 
+        # quote every seller concurrently on the shared loop and session
+        shipment_options = self.shipment_service.quote_client.run(
+            self.shipment_service.get_many_shipment_options(quote_requests)
+        )
+
+        for courier, shipment_option in zip(quoted_couriers, shipment_options):
+            seller_id = courier["seller_id"]
+            courier_vendor = courier["selected_courier"]
+
             for data in shipment_option.get(courier_vendor):
                 if data["service"] == courier["selected_service"]:
                     all_shipment_fee[seller_id] = {
                         "shipment_fee": data["cost"],
-                        "seller_address_id": seller_address_id,
+                        "seller_address_id": courier["seller_address_id"],
                         "service": data["service"],
                         "etd": data["etd"],
                         "vendor_name": courier_vendor,
@@ -0,0 +1,82 @@
+# 1 m3 = 1_000_000 cm3, couriers divide by 5000 to get volumetric kg
+VOLUMETRIC_DIVISOR = 5000
+
+
+class CartPricing:
+    """
+    Columnar cart pricing. Cart lines come in as parallel lists (one
+    entry per line) and every per-line figure is computed column by
+    column, then grouped by seller in a single pass.
+    """
+
+    def __init__(self, seller_ids, prices, quantities, weights_kg, volumes_m3):
+        self.seller_ids = seller_ids
+        self.prices = prices
+        self.quantities = quantities
+        self.weights_kg = weights_kg
+        self.volumes_m3 = volumes_m3
+
+        self.sub_totals = [
+            price * quantity for price, quantity in zip(prices, quantities)
+        ]
+        self.sub_weights = [
+            weight * quantity for weight, quantity in zip(weights_kg, quantities)
+        ]
+        self.sub_volumes = [
+            volume * quantity for volume, quantity in zip(volumes_m3, quantities)
+        ]
+        self.sub_volumes_to_weight = [
+            (sub_volume * 1_000_000) / VOLUMETRIC_DIVISOR
+            for sub_volume in self.sub_volumes
+        ]
+
+    def line(self, index):
+        return {
+            "sub_total": self.sub_totals[index],
+            "sub_weight": self.sub_weights[index],
+            "sub_volume": self.sub_volumes[index],
+            "sub_volume_to_weight": self.sub_volumes_to_weight[index],
+        }
+
+    def seller_totals(self):
+        """
+        {seller_id: {"total_price_before_shipment", "total_weight_gram"}}
+        in order of each seller's first line. The billable weight is the
+        larger of the actual and volumetric weight of that seller's lines.
+        """
+        price = {}
+        weight = {}
+        volume_to_weight = {}
+
+        for seller_id, sub_total, sub_weight, sub_volume_to_weight in zip(
+            self.seller_ids,
+            self.sub_totals,
+            self.sub_weights,
+            self.sub_volumes_to_weight,
+        ):
+            price[seller_id] = price.get(seller_id, 0) + sub_total
+            weight[seller_id] = weight.get(seller_id, 0) + sub_weight
+            volume_to_weight[seller_id] = (
+                volume_to_weight.get(seller_id, 0) + sub_volume_to_weight
+            )
+
+        return {
+            seller_id: {
+                "total_price_before_shipment": price[seller_id],
+                "total_weight_gram": max(
+                    weight[seller_id], volume_to_weight[seller_id]
+                )
+                * 1000,
+            }
+            for seller_id in price
+        }
+
+
+def calculate_discount(total_price, discount_type_name, percentage, max_discount_amount):
+    if discount_type_name == "PERCENTAGE":
+        return min(total_price * percentage / 100, max_discount_amount)
+
+    if discount_type_name == "FIXED_DISCOUNT":
+        return max_discount_amount
+
+    raise ValueError(f"Invalid discount type: {discount_type_name}")
@@ -1,5 +1,6 @@
 from ..products.product_services_user import ProductServicesUser
 from ..products.products_repository import ProductsRepository
+from .cart_pricing import CartPricing
 
 
 class ProductService:
@@ -8,60 +9,45 @@ class ProductService:
         self.product_service_user = product_service_user or ProductServicesUser()
 
     def calculate_product_detail(self, carts):
-        return_value = {}
-        sub_total_weight = 0
-        sub_total_volume_to_weight = 0
         sorted_cart = self.split_to_each_seller(carts=carts)
+        lines = [line for products in sorted_cart.values() for line in products]
 
-        for seller_id, products in sorted_cart.items():
-            return_value[seller_id] = {
-                "items": [],
-                "total_price_before_shipment": 0,
-            }
-
-            for product in products:
-
-                product_detail, status_code = (
-                    self.product_service_user.get_product_by_id(
-                        product_id=product["id"]
-                    )
-                )
-
-                if status_code != 200:
-                    raise ValueError(f"Product with id: {product['id']} not found")
-
-                if product_detail["stock"] < product["quantity"]:
-                    raise ValueError(
-                        f"Insufficient quantity for product with id: {product['id']}"
-                    )
-
-                sub_total = product_detail["price"] * product["quantity"]
-                sub_weight = product_detail["weight_kg"] * product["quantity"]
-                sub_volume = product_detail["volume_m3"] * product["quantity"]
-                sub_volume_to_weight = (product_detail["volume_m3"] * 1_000_000) / 5000
-
-                return_value[seller_id]["items"].append(
-                    {
-                        "detail_product": self.sorted_detail_product(product_detail),
-                        "quantity": product["quantity"],
-                        "sub_total": sub_total,
-                        "sub_weight": sub_weight,
-                        "sub_volume": sub_volume,
-                        "sub_volume_to_weight": sub_volume_to_weight,
-                    }
+        for product_detail, cart_item in lines:
+            if product_detail["stock"] < cart_item["quantity"]:
+                raise ValueError(
+                    f"Insufficient quantity for product with id: {cart_item['product_id']}"
                 )
 
-                sub_total_weight += sub_weight
-                sub_total_volume_to_weight += sub_volume_to_weight
+        pricing = CartPricing(
+            seller_ids=[product_detail["seller_id"] for product_detail, _ in lines],
+            prices=[product_detail["price"] for product_detail, _ in lines],
+            quantities=[cart_item["quantity"] for _, cart_item in lines],
+            # Float(5, 2) columns come back as Decimal, which the weights
+            # stored in shipment_details cannot be bound as on every driver
+            weights_kg=[
+                float(product_detail["weight_kg"]) for product_detail, _ in lines
+            ],
+            volumes_m3=[
+                float(product_detail["volume_m3"]) for product_detail, _ in lines
+            ],
+        )
 
-                return_value[seller_id]["total_price_before_shipment"] += sub_total
+        return_value = {}
+        for seller_id, totals in pricing.seller_totals().items():
+            return_value[seller_id] = {
+                "items": [],
+                "total_price_before_shipment": totals["total_price_before_shipment"],
+                "total_weight_gram": totals["total_weight_gram"],
+            }
 
-            if sub_total_weight > sub_total_volume_to_weight:
-                return_value[seller_id]["total_weight_gram"] = sub_total_weight * 1000
-            else:
-                return_value[seller_id]["total_weight_gram"] = (
-                    sub_total_volume_to_weight * 1000
-                )
+        for index, (product_detail, cart_item) in enumerate(lines):
+            return_value[product_detail["seller_id"]]["items"].append(
+                {
+                    "detail_product": self.sorted_detail_product(product_detail),
+                    "quantity": cart_item["quantity"],
+                    **pricing.line(index),
+                }
+            )
 
         return return_value
 
@@ -87,24 +73,32 @@ class ProductService:
         return sorted_detail_product
 
     def split_to_each_seller(self, carts):
+        try:
+            product_ids = [int(item["product_id"]) for item in carts]
+        except (TypeError, ValueError):
+            raise ValueError("Invalid product_id in cart")
+
+        products, status_code = self.product_service_user.get_products_by_ids(
+            product_ids=product_ids
+        )
+
+        if status_code != 200:
+            raise Exception(products["error"])
+
+        products_by_id = {product["id"]: product for product in products["products"]}
         sorted_carts = {}
 
         for item in carts:
-            product = self.product_service_user.get_product_by_id(
-                product_id=item["product_id"]
-            )
+            product = products_by_id.get(int(item["product_id"]))
 
             if not product:
                 raise ValueError(f"Product with id: {item['product_id']} not found")
 
-            product = product[0]
-
             seller_id = product["seller_id"]
-            product["quantity"] = item["quantity"]
 
             if seller_id not in sorted_carts:
                 sorted_carts[seller_id] = []
 
-            sorted_carts[seller_id].append(product)
+            sorted_carts[seller_id].append((product, item))
 
         return sorted_carts
@@ -0,0 +1,97 @@
+import asyncio
+import atexit
+import threading
+
+import aiohttp
+
+from app.instrumentation import track_external
+
+
+class QuoteClient:
+    """
+    Owns one background event loop and one connection-pooled aiohttp
+    session for outbound shipping quotes. Request threads submit
+    coroutines with run() instead of starting a new loop (and new TCP/TLS
+    connections) with asyncio.run for every call.
+    """
+
+    def __init__(self, app=None):
+        self.loop = None
+        self.thread = None
+        self.session = None
+        self.semaphore = None
+        self.lock = threading.Lock()
+        self.max_connections = 20
+        self.max_concurrency = 10
+        self.timeout = 10
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.max_connections = int(app.config.get("QUOTE_MAX_CONNECTIONS") or 20)
+        self.max_concurrency = int(app.config.get("QUOTE_MAX_CONCURRENCY") or 10)
+        self.timeout = float(app.config.get("QUOTE_TIMEOUT_SECONDS") or 10)
+
+        atexit.register(self.close)
+
+    def start(self):
+        with self.lock:
+            if self.loop is not None:
+                return
+
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(
+                target=loop.run_forever, name="quote-client", daemon=True
+            )
+            thread.start()
+
+            self.loop = loop
+            self.thread = thread
+
+    def run(self, coro):
+        self.start()
+
+        # the HTTP calls run on the loop thread, time the wait in the caller
+        with track_external("rajaongkir"):
+            return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    def get_session(self):
+        # only called from the loop thread, so no locking is needed
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.max_connections, ttl_dns_cache=300
+                ),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+            self.semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        return self.session
+
+    async def post_form(self, url, data):
+        session = self.get_session()
+
+        async with self.semaphore:
+            async with session.post(url, data=data) as response:
+                return response.status, await response.json(content_type=None)
+
+    async def close_session(self):
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+
+    def close(self):
+        with self.lock:
+            loop = self.loop
+            self.loop = None
+
+        if loop is None:
+            return
+
+        try:
+            asyncio.run_coroutine_threadsafe(self.close_session(), loop).result(5)
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+
+
+quote_client = QuoteClient()
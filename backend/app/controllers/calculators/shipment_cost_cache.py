@@ -0,0 +1,206 @@
+import os
+import json
+import math
+import time
+import asyncio
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+# grams per cache bucket. Couriers do not all bill per whole kilogram, so
+# by default only identical weights share an entry. Set a courier's step
+# with SHIPMENT_CACHE_WEIGHT_STEPS=jne=1000,... once its price is known to
+# be flat within the step.
+DEFAULT_WEIGHT_STEP = 1
+
+
+def parse_weight_steps(value):
+    steps = {}
+
+    for entry in (value or "").split(","):
+        if "=" in entry:
+            courier, step = entry.split("=", 1)
+            steps[courier.strip()] = int(step)
+
+    return steps
+
+
+class LRUBackend:
+    blocking = False
+
+    def __init__(self, max_entries=10_000):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+
+            if entry is None:
+                return None
+
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self.entries[key]
+                return None
+
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self.lock:
+            self.entries[key] = (value, time.monotonic() + ttl)
+            self.entries.move_to_end(key)
+
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+
+class RedisBackend:
+    # network calls, ShipmentCostCache runs them in the loop's executor
+    blocking = True
+
+    def __init__(self, url, prefix="shipment_cost:"):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError(
+                "SHIPMENT_CACHE_BACKEND=redis requires the redis package to be installed"
+            )
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key):
+        value = self.client.get(self.prefix + key)
+        return json.loads(value) if value else None
+
+    def set(self, key, value, ttl):
+        self.client.set(self.prefix + key, json.dumps(value), ex=int(ttl))
+
+
+class ShipmentCostCache:
+    """
+    TTL cache for RajaOngkir cost lookups keyed by
+    (origin, destination, weight bucket, courier).
+    Concurrent misses on the same key share a single upstream request.
+    """
+
+    def __init__(self, backend=None, ttl=21600, weight_steps=None):
+        self.backend = backend or LRUBackend()
+        self.ttl = ttl
+        self.weight_steps = weight_steps or {}
+        self.lock = threading.Lock()
+        self.in_flight = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    @classmethod
+    def from_env(cls):
+        backend_name = os.getenv("SHIPMENT_CACHE_BACKEND", "memory")
+        ttl = int(os.getenv("SHIPMENT_CACHE_TTL", 21600))
+
+        if backend_name == "redis":
+            backend = RedisBackend(os.getenv("SHIPMENT_CACHE_REDIS_URL"))
+        else:
+            backend = LRUBackend(
+                max_entries=int(os.getenv("SHIPMENT_CACHE_MAX_ENTRIES", 10_000))
+            )
+
+        return cls(
+            backend=backend,
+            ttl=ttl,
+            weight_steps=parse_weight_steps(os.getenv("SHIPMENT_CACHE_WEIGHT_STEPS")),
+        )
+
+    def weight_bucket(self, courier, weight):
+        """Cache key part only, the upstream call keeps the real weight."""
+        try:
+            weight = float(weight)
+        except (TypeError, ValueError):
+            raise ValueError("Invalid total weight")
+
+        step = self.weight_steps.get(courier, DEFAULT_WEIGHT_STEP)
+        return max(step, math.ceil(weight / step) * step)
+
+    async def backend_get(self, key):
+        if not self.backend.blocking:
+            return self.backend.get(key)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.backend.get, key)
+
+    async def backend_set(self, key, value):
+        if not self.backend.blocking:
+            return self.backend.set(key, value, self.ttl)
+
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.backend.set, key, value, self.ttl)
+
+    async def get_or_fetch(self, origin, destination, weight, courier, fetch):
+        """fetch() must return a JSON-serializable value."""
+        bucket = self.weight_bucket(courier, weight)
+        key = f"{origin}:{destination}:{bucket}:{courier}"
+
+        cached = await self.backend_get(key)
+        if cached is not None:
+            self.count("hits")
+            return cached
+
+        with self.lock:
+            future = self.in_flight.get(key)
+            is_leader = future is None
+
+            if is_leader:
+                future = Future()
+                self.in_flight[key] = future
+
+        if not is_leader:
+            self.count("coalesced")
+            return await asyncio.wrap_future(future)
+
+        self.count("misses")
+
+        try:
+            value = await fetch()
+            await self.backend_set(key, value)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self.lock:
+                self.in_flight.pop(key, None)
+
+    def count(self, counter):
+        with self.lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses + self.coalesced
+
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            }
+
+
+_shipment_cost_cache = None
+_shipment_cost_cache_lock = threading.Lock()
+
+
+def get_shipment_cost_cache():
+    global _shipment_cost_cache
+
+    with _shipment_cost_cache_lock:
+        if _shipment_cost_cache is None:
+            _shipment_cost_cache = ShipmentCostCache.from_env()
+
+        return _shipment_cost_cache
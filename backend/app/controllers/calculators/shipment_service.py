@@ -1,11 +1,12 @@
 import os
-import aiohttp
 import asyncio
 from dotenv import load_dotenv
 from ..users.users_services import UserServices
 from ..sellers.sellers_service import SellersServices
 from ..addresses.addresses_service import AddressesService
 from ..shipping_options.shipping_options_service import ShippingOptionsService
+from .shipment_cost_cache import get_shipment_cost_cache
+from .quote_client import quote_client as default_quote_client
 
 
 load_dotenv()
@@ -18,6 +19,8 @@ class ShipmentService:
         seller_service=None,
         address_service=None,
         shipping_options_service=None,
+        cost_cache=None,
+        quote_client=None,
     ):
         self.shipping_options_service = (
             shipping_options_service or ShippingOptionsService()
@@ -25,6 +28,8 @@ class ShipmentService:
         self.seller_service = seller_service or SellersServices()
         self.user_service = user_service or UserServices()
         self.address_service = address_service or AddressesService()
+        self.cost_cache = cost_cache or get_shipment_cost_cache()
+        self.quote_client = quote_client or default_quote_client
 
     def shipment_option_price(self, data, identity):
         """
@@ -47,22 +52,16 @@ class ShipmentService:
                 "district_id"
             ]
 
-            seller_identity = {"role": "seller", "id": seller_id}
-            couriers_option, status_code = (
-                self.shipping_options_service.get_option_list(identity=seller_identity)
+            courier, status_code = self.shipping_options_service.get_active_couriers(
+                seller_id=seller_id
             )
             if status_code != 200:
-                raise ValueError(couriers_option["error"])
-
-            courier = []
-            for option in couriers_option:
-                if option["is_active"] == 1:
-                    courier.append(option["shipment"])
+                raise ValueError(courier["error"])
 
             if len(courier) == 0:
                 raise ValueError("Seller does not have any shopping options")
 
-            all_options = asyncio.run(
+            all_options = self.quote_client.run(
                 self.get_possible_shipment_option(
                     user_district=user_district,
                     seller_district=seller_district,
@@ -95,17 +94,20 @@ class ShipmentService:
         if role != "user":
             raise ValueError("Unauthorized")
 
-        user, status_code = self.user_service.user_info(user_id=user_id)
+        user, status_code = self.user_service.verify_user(user_id=user_id)
 
         if status_code != 200:
             raise ValueError("User not found")
 
     def check_seller(self, seller_id):
-        seller, status_code = self.seller_service.seller_info(seller_id=seller_id)
+        seller, status_code = self.seller_service.verify_seller(seller_id=seller_id)
 
         if status_code != 200:
             raise ValueError("Seller not found")
 
+    def cache_stats(self):
+        return self.cost_cache.stats(), 200
+
     def get_seller_address(self, seller_id):
         identity = {"role": "seller", "id": seller_id}
         address, status_code = self.address_service.list_address(identity=identity)
@@ -115,16 +117,15 @@ class ShipmentService:
 
         return address[0]
 
-    async def fetch_courier_options(self, session, link, params, courier):
-        params["courier"] = courier
-        async with session.post(link, data=params) as response:
-            if response.status != 200:
-                response_data = await response.json()
-                description = response_data["rajaongkir"]["status"]["description"]
-                raise Exception(description)
+    async def fetch_courier_options(self, link, params, courier):
+        params = {**params, "courier": courier}
+        status, response_data = await self.quote_client.post_form(link, params)
+
+        if status != 200:
+            description = response_data["rajaongkir"]["status"]["description"]
+            raise Exception(description)
 
-            data = await response.json()
-            return data.get("rajaongkir").get("results")[0].get("costs")
+        return response_data.get("rajaongkir").get("results")[0].get("costs")
 
     async def get_possible_shipment_option(
         self, user_district, seller_district, total_weight, courier=None
@@ -147,26 +148,42 @@ class ShipmentService:
 
         all_options = {}
 
-        async with aiohttp.ClientSession() as session:
-            tasks = [
-                self.fetch_courier_options(session, link, params, each_courier)
-                for each_courier in available_courier
-            ]
-
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-
-            for courier, result in zip(available_courier, results):
-                if isinstance(result, Exception):
-                    raise Exception(f"Error fetching options for {courier}: {result}")
-                else:
-                    all_options[courier] = [
-                        {
-                            "service": option["service"],
-                            "cost": option["cost"][0]["value"],
-                            "etd": option["cost"][0]["etd"],
-                            "description": option["description"],
-                        }
-                        for option in result
-                    ]
+        tasks = [
+            self.cost_cache.get_or_fetch(
+                origin=user_district,
+                destination=seller_district,
+                weight=total_weight,
+                courier=each_courier,
+                fetch=lambda each_courier=each_courier: (
+                    self.fetch_courier_options(link, params, each_courier)
+                ),
+            )
+            for each_courier in available_courier
+        ]
+
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        for courier, result in zip(available_courier, results):
+            if isinstance(result, Exception):
+                raise Exception(f"Error fetching options for {courier}: {result}")
+            else:
+                all_options[courier] = [
+                    {
+                        "service": option["service"],
+                        "cost": option["cost"][0]["value"],
+                        "etd": option["cost"][0]["etd"],
+                        "description": option["description"],
+                    }
+                    for option in result
+                ]
 
         return all_options
+
+    async def get_many_shipment_options(self, quote_requests):
+        # one concurrent pass for every seller in the cart
+        return await asyncio.gather(
+            *[
+                self.get_possible_shipment_option(**quote_request)
+                for quote_request in quote_requests
+            ]
+        )
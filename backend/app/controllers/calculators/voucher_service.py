@@ -1,5 +1,6 @@
 from datetime import datetime
 
+from .cart_pricing import calculate_discount
 from ..user_seller_vouchers.user_seller_vouchers_service import (
     UserSellerVouchersService,
 )
@@ -48,23 +49,14 @@ class VoucherService:
     def calculate_discount(self, calculated_product_detail, seller_voucher_detail):
         seller_id = seller_voucher_detail["seller_id"]
 
-        total_price = calculated_product_detail[seller_id][
-            "total_price_before_shipment"
-        ]
-        percentage = seller_voucher_detail["percentage"]
-        discount_type_name = seller_voucher_detail["discount_type_name"]
-        max_discount_amount = seller_voucher_detail["max_discount_amount"]
-
-        if discount_type_name == "PERCENTAGE":
-            total_discount = total_price * percentage / 100
-
-            if total_discount > max_discount_amount:
-                total_discount = max_discount_amount
-
-        if discount_type_name == "FIXED_DISCOUNT":
-            total_discount = max_discount_amount
-
-        return total_discount
+        return calculate_discount(
+            total_price=calculated_product_detail[seller_id][
+                "total_price_before_shipment"
+            ],
+            discount_type_name=seller_voucher_detail["discount_type_name"],
+            percentage=seller_voucher_detail["percentage"],
+            max_discount_amount=seller_voucher_detail["max_discount_amount"],
+        )
 
     def voucher_verification(
         self,
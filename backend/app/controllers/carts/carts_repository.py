@@ -1,3 +1,5 @@
+from pymongo.errors import DuplicateKeyError
+
 from app.db import mongo
 
 
@@ -8,29 +10,37 @@ class CartsRepository:
     def find_cart_by_user_id(self, user_id):
         return self.collection.db.carts.find_one({"_id": user_id})
 
-    def insert_cart(self, user_id, items):
-        return self.collection.db.carts.update_one(
-            {"_id": user_id}, {"$set": {"items": [items]}}, upsert=True
-        )
+    def save_items(self, user_id, items, version):
+        """
+        Replace the cart items if the cart is still at version (None for
+        a cart that does not exist yet or predates versioning). Returns
+        False when another request changed the cart in between.
+        """
+        if version is None:
+            cart_filter = {"_id": user_id, "version": {"$exists": False}}
+        else:
+            cart_filter = {"_id": user_id, "version": version}
+
+        try:
+            result = self.collection.db.carts.update_one(
+                cart_filter,
+                {"$set": {"items": items}, "$inc": {"version": 1}},
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            # the filter missed an existing cart, so the upsert tried to
+            # insert a second document with the same _id
+            return False
+
+        return result.matched_count == 1 or result.upserted_id is not None
 
     def find_one(self, user_id, product_id):
         return self.collection.db.carts.find_one(
             {"_id": user_id, "items.product_id": product_id}
         )
 
-    def update_existed(self, user_id, product_id, quantity):
-        self.collection.db.carts.update_one(
-            {"_id": user_id, "items.product_id": product_id},
-            {"$set": {"items.$.quantity": quantity}},
-        )
-
-    def update_new(self, user_id, items):
-        self.collection.db.carts.update_one(
-            {"_id": user_id},
-            {"$push": {"items": items}},
-        )
-
     def delete_one(self, user_id, product_id):
         self.collection.db.carts.update_one(
-            {"_id": user_id}, {"$pull": {"items": {"product_id": product_id}}}
+            {"_id": user_id},
+            {"$pull": {"items": {"product_id": product_id}}, "$inc": {"version": 1}},
         )
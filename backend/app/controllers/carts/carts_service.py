@@ -1,9 +1,11 @@
+import os
 from datetime import datetime
 import pytz
 
 from .carts_repository import CartsRepository
 from app.db import mongo
 from ..products.product_services_user import ProductServicesUser
+from ..products.products_repository import ProductsRepository
 from ..users.users_repository import UserRepository
 
 
@@ -13,11 +15,14 @@ class CartsService:
         repository=None,
         product_service_user=None,
         user_repository=None,
+        product_repository=None,
     ):
         self.mongo = mongo
         self.repository = repository or CartsRepository()
         self.product_service_user = product_service_user or ProductServicesUser()
         self.user_repository = user_repository or UserRepository()
+        self.product_repository = product_repository or ProductsRepository()
+        self.write_attempts = int(os.getenv("CART_WRITE_ATTEMPTS", 3))
 
     def list_cart(self, user_id):
         try:
@@ -33,16 +38,26 @@ class CartsService:
 
             items_with_price = {"items": [], "total_price": 0}
 
+            # every product of the cart in one query instead of one per item
+            products, status_code = self.product_service_user.get_products_by_ids(
+                product_ids=[item["product_id"] for item in cart["items"]]
+            )
+
+            if status_code != 200:
+                raise ValueError(products["error"])
+
+            product_details = {
+                product["id"]: product for product in products["products"]
+            }
+
             for item in cart["items"]:
-                product_detail, status_code = (
-                    self.product_service_user.get_product_by_id(
-                        product_id=item["product_id"]
-                    )
-                )
+                product_detail = product_details.get(item["product_id"])
 
-                if status_code != 200:
+                if product_detail is None:
                     raise ValueError(f"Product {item['product_id']} not found")
 
+                product_detail = dict(product_detail)
+
                 sub_total = product_detail["price"] * item["quantity"]
 
                 if product_detail["image_url"]:
@@ -73,47 +88,47 @@ class CartsService:
 
             user_id = identity.get("id")
             items = data.get("items")
-            user_cart = self.repository.find_cart_by_user_id(user_id)
-
-            for item in items:
-                if user_cart:
-                    # check is product exist in products table, if not raise error
-                    self.check_product(
-                        product_id=item["product_id"], quantity=item["quantity"]
-                    )
-
-                    # check if user already have specific product in cart
-                    is_exist = self.repository.find_one(
-                        user_id=user_id, product_id=item["product_id"]
-                    )
-
-                    if is_exist:
-                        self.repository.update_existed(
-                            user_id=user_id,
-                            product_id=item["product_id"],
-                            quantity=item["quantity"],
-                        )
-                    else:
-                        item["added_to_cart"] = str(datetime.now(pytz.UTC))
-
-                        self.repository.update_new(user_id=user_id, items=item)
-                else:
-                    self.check_product(
-                        product_id=item["product_id"], quantity=item["quantity"]
-                    )
-                    item["added_to_cart"] = str(datetime.now(pytz.UTC))
-
-                    user_cart = True
-
-                    self.repository.insert_cart(user_id, item)
-
-            return {"message": "Cart created/updated successfully"}, 200
+
+            if not items:
+                raise ValueError("Items are required")
+
+            items = self.normalize_items(items)
+            self.check_products(items)
+
+            # optimistic: retry the read / merge / write when another request
+            # changed the cart in between
+            for _ in range(self.write_attempts):
+                user_cart = self.repository.find_cart_by_user_id(user_id) or {}
+                merged_items = self.merge_items(user_cart.get("items", []), items)
+
+                if self.repository.save_items(
+                    user_id, merged_items, user_cart.get("version")
+                ):
+                    return {"message": "Cart created/updated successfully"}, 200
+
+            return {"error": "Cart was changed by another request, try again"}, 409
 
         except ValueError as e:
             return {"error": str(e)}, 400
         except Exception as e:
             return {"error": str(e)}, 500
 
+    def merge_items(self, cart_items, items):
+        merged = {item["product_id"]: dict(item) for item in cart_items}
+        added_to_cart = str(datetime.now(pytz.UTC))
+
+        for item in items:
+            if item["product_id"] in merged:
+                merged[item["product_id"]]["quantity"] = item["quantity"]
+            else:
+                merged[item["product_id"]] = {
+                    "product_id": item["product_id"],
+                    "quantity": item["quantity"],
+                    "added_to_cart": added_to_cart,
+                }
+
+        return list(merged.values())
+
     def delete_cart(self, product_id, identity):
         try:
             if identity.get("role") != "user":
@@ -133,18 +148,34 @@ class CartsService:
         except Exception as e:
             return {"error": str(e)}, 500
 
-    def check_product(self, product_id, quantity):
-        product, status_code = self.product_service_user.get_product_by_id(
-            product_id=product_id
+    def normalize_items(self, items):
+        # ids and quantities may arrive as strings, the stock map and the
+        # stored cart are keyed by int
+        try:
+            return [
+                {
+                    **item,
+                    "product_id": int(item["product_id"]),
+                    "quantity": int(item["quantity"]),
+                }
+                for item in items
+            ]
+        except (KeyError, TypeError, ValueError):
+            raise ValueError("product_id and quantity must be integers")
+
+    def check_products(self, items):
+        stocks = self.product_repository.get_product_stocks(
+            [item["product_id"] for item in items]
         )
 
-        if status_code != 200:
-            raise ValueError("Product not found")
-
-        if quantity <= 0:
-            raise ValueError("Quantity must be greater than 0")
+        for item in items:
+            if item["product_id"] not in stocks:
+                raise ValueError("Product not found")
 
-        if product["stock"] < quantity:
-            raise ValueError(f"Insufficient quantity for product with id: {product_id}")
+            if item["quantity"] <= 0:
+                raise ValueError("Quantity must be greater than 0")
 
-        return product
+            if stocks[item["product_id"]] < item["quantity"]:
+                raise ValueError(
+                    f"Insufficient quantity for product with id: {item['product_id']}"
+                )
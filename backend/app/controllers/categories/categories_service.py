@@ -1,17 +1,17 @@
 from app.db import db
 from .categories_repository import CategoriesRepository
+from ..reference.reference_store import reference_store
 
 
 class CategoriesService:
-    def __init__(self, db=db, repository=None):
+    def __init__(self, db=db, repository=None, reference_store=reference_store):
         self.db = db
         self.repository = repository or CategoriesRepository()
+        self.reference_store = reference_store
 
     def get_categories(self):
         try:
-            categories = self.repository.get_categories()
-
-            return [category.to_dict() for category in categories]
+            return self.reference_store.response("categories")
 
         except Exception as e:
             return {"error": str(e)}
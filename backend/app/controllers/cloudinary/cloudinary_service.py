@@ -1,15 +1,26 @@
 import cloudinary.uploader
 import io
 import base64
-from PIL import Image
+from PIL import Image, UnidentifiedImageError
+
+from app.instrumentation import track_external
+from .image_variants import build_variants
 
 
 class CloudinaryService:
     def __init__(self):
         pass
 
+    def open_image(image_data):
+        try:
+            return Image.open(image_data)
+        except UnidentifiedImageError:
+            raise ValueError("Invalid image file")
+
     def compress_image(image_data, quality=85):
-        img = Image.open(image_data)
+        img = CloudinaryService.open_image(image_data)
+        if img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
         buffer = io.BytesIO()
         img.save(buffer, format="JPEG", quality=quality)
         buffer.seek(0)
@@ -17,28 +28,90 @@ class CloudinaryService:
 
     def upload_image(self, image_data):
         compressed_image = CloudinaryService.compress_image(image_data)
-        result = cloudinary.uploader.upload(compressed_image, resource_tpye="image")
+        with track_external("cloudinary"):
+            result = cloudinary.uploader.upload(
+                compressed_image, resource_tpye="image"
+            )
         return {"secure_url": result["secure_url"], "public_id": result["public_id"]}
 
     def base64_to_image_file(self, base64_str):
         image_data = base64.b64decode(base64_str)
         return io.BytesIO(image_data)
 
-    def upload_multiple_images(self, images_base64):
+    def upload_buffer(self, buffer, image_format):
+        with track_external("cloudinary"):
+            result = cloudinary.uploader.upload(
+                buffer, resource_type="image", format=image_format
+            )
+        return {"secure_url": result["secure_url"], "public_id": result["public_id"]}
+
+    def upload_variants(self, image_data):
+        image_data.seek(0)
+        img = CloudinaryService.open_image(image_data)
+
+        variants = []
+        try:
+            for width, image_format, buffer in build_variants(img):
+                variants.append(
+                    {
+                        "width": width,
+                        "image_format": image_format,
+                        **self.upload_buffer(buffer, image_format),
+                    }
+                )
+        except Exception:
+            self.delete_uploaded(variants)
+            raise
+
+        return variants
+
+    def upload_base64_image(self, image_base64, variants=False):
+        image_file = self.base64_to_image_file(image_base64)
+        result = self.upload_image(image_file)
+
+        if variants:
+            try:
+                result["variants"] = self.upload_variants(image_file)
+            except Exception:
+                self.delete_uploaded([result])
+                raise
+
+        return result
+
+    def delete_uploaded(self, uploaded):
+        for image in uploaded:
+            self.delete_uploaded(image.get("variants", []))
+            self.delete_image(image["public_id"])
+
+    def upload_multiple_images(self, images_base64, executor=None, variants=False):
+        images = images_base64[:5]
+
+        if executor is None:
+            return [self.upload_base64_image(image, variants) for image in images]
+
+        # decode, compress and upload every image in parallel, all or nothing
+        futures = [
+            executor.submit(self.upload_base64_image, image, variants)
+            for image in images
+        ]
         urls = []
-        for image in images_base64[:5]:
-            image_file = self.base64_to_image_file(image)
-            if isinstance(image_file, io.BytesIO):
-                result = self.upload_image(image_file)
-                if isinstance(result, dict):
-                    urls.append(result)
-                else:
-                    print(result)
+        errors = []
+        for future in futures:
+            try:
+                urls.append(future.result())
+            except Exception as e:
+                errors.append(e)
+
+        if errors:
+            self.delete_uploaded(urls)
+            raise errors[0]
+
         return urls
 
     def delete_image(self, public_id):
         try:
-            result = cloudinary.uploader.destroy(public_id)
+            with track_external("cloudinary"):
+                result = cloudinary.uploader.destroy(public_id)
             return result
         except Exception as e:
             return {"error": str(e)}
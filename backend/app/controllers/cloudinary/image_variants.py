@@ -0,0 +1,60 @@
+import io
+
+from PIL import Image, ImageOps
+
+
+VARIANT_WIDTHS = (128, 320, 800)
+VARIANT_FORMATS = {"webp": "WEBP", "jpeg": "JPEG"}
+VARIANT_QUALITY = 80
+
+
+def build_variants(img):
+    """
+    Yield (width, image_format, buffer) for every width/format pair.
+    Images narrower than a variant width are encoded at their own size.
+    """
+    img = ImageOps.exif_transpose(img)
+    if img.mode not in ("RGB", "L"):
+        img = img.convert("RGB")
+
+    for width in VARIANT_WIDTHS:
+        if img.width > width:
+            height = max(1, round(img.height * width / img.width))
+            resized = img.resize((width, height), Image.LANCZOS)
+        else:
+            resized = img
+
+        for image_format, pil_format in VARIANT_FORMATS.items():
+            buffer = io.BytesIO()
+            resized.save(buffer, format=pil_format, quality=VARIANT_QUALITY)
+            buffer.seek(0)
+            yield width, image_format, buffer
+
+
+def parse_variant_args(args):
+    """
+    Read image_size / image_format query params. Returns None when no
+    variant is requested, otherwise (width, image_format).
+    """
+    image_size = args.get("image_size", None)
+    if image_size is None:
+        return None
+
+    try:
+        image_size = int(image_size)
+    except ValueError:
+        image_size = None
+
+    if image_size not in VARIANT_WIDTHS:
+        raise ValueError(
+            f"image_size must be one of {', '.join(map(str, VARIANT_WIDTHS))}"
+        )
+
+    image_format = args.get("image_format", "webp").lower()
+    if image_format == "jpg":
+        image_format = "jpeg"
+
+    if image_format not in VARIANT_FORMATS:
+        raise ValueError(f"image_format must be one of {', '.join(VARIANT_FORMATS)}")
+
+    return image_size, image_format
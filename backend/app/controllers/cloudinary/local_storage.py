@@ -0,0 +1,53 @@
+import os
+import uuid
+
+from .cloudinary_service import CloudinaryService
+
+
+class LocalImageStorage(CloudinaryService):
+    """
+    Filesystem stand-in for Cloudinary (IMAGE_STORAGE=local) so the
+    image pipeline can run offline. Files are served by
+    GET /api/products/images/<filename>.
+    """
+
+    def __init__(self, directory=None, base_url=None):
+        self.directory = directory or os.getenv(
+            "IMAGE_LOCAL_DIR", os.path.join(os.getcwd(), "uploads")
+        )
+        self.base_url = (
+            base_url or os.getenv("IMAGE_LOCAL_BASE_URL", "/api/products/images")
+        ).rstrip("/")
+
+    def upload_image(self, image_data):
+        compressed_image = CloudinaryService.compress_image(image_data)
+        return self.upload_buffer(compressed_image, "jpeg")
+
+    def upload_buffer(self, buffer, image_format):
+        public_id = f"{uuid.uuid4().hex}.{image_format}"
+
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.path(public_id), "wb") as f:
+            f.write(buffer.getvalue())
+
+        return {
+            "secure_url": f"{self.base_url}/{public_id}",
+            "public_id": public_id,
+        }
+
+    def delete_image(self, public_id):
+        try:
+            os.remove(self.path(public_id))
+            return {"result": "ok"}
+        except FileNotFoundError:
+            return {"result": "not found"}
+
+    def path(self, public_id):
+        return os.path.join(self.directory, os.path.basename(public_id))
+
+
+def get_image_storage():
+    if os.getenv("IMAGE_STORAGE", "cloudinary") == "local":
+        return LocalImageStorage()
+
+    return CloudinaryService()
@@ -1,3 +1,8 @@
 from .is_filled import is_filled
 from .get_data_and_validate import get_data_and_validate
 from .change_date import change_date
+from .keyset_paginate import keyset_paginate, KeysetPage
+from .snowflake import generate_snowflake_id, SnowflakeGenerator
+from .identity_context import request_identity
+from .admin_token import has_admin_token
+from .lease import lease_owner
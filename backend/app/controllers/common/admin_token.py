@@ -0,0 +1,13 @@
+import os
+import hmac
+
+
+def has_admin_token(request):
+    """
+    X-Admin-Token matches ADMIN_TOKEN (REFERENCE_ADMIN_TOKEN is still
+    accepted). Always False when no token is configured.
+    """
+    admin_token = os.getenv("ADMIN_TOKEN") or os.getenv("REFERENCE_ADMIN_TOKEN")
+    token = request.headers.get("X-Admin-Token", "")
+
+    return bool(admin_token) and hmac.compare_digest(token, admin_token)
@@ -0,0 +1,25 @@
+from flask import g, has_request_context
+
+
+def request_identity(role, role_id, loader):
+    """
+    Memoize loader() for (role, role_id) on flask.g, so every service that
+    verifies the caller during one request shares a single lookup.
+    Outside a request (CLI, workers) loader() is simply called.
+    """
+    if not has_request_context():
+        return loader()
+
+    cache = g.setdefault("identity_cache", {})
+    key = (role, str(role_id))
+
+    if key not in cache:
+        result = loader()
+
+        # don't pin transient failures for the rest of the request
+        if result[1] >= 500:
+            return result
+
+        cache[key] = result
+
+    return cache[key]
@@ -0,0 +1,76 @@
+import base64
+import json
+from datetime import datetime
+
+from sqlalchemy import and_, or_
+
+
+class KeysetPage:
+    def __init__(self, items, next_cursor):
+        self.items = items
+        self.next_cursor = next_cursor
+
+    def __iter__(self):
+        return iter(self.items)
+
+
+def encode_cursor(sort_value, row_id):
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+
+    raw = json.dumps([sort_value, row_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("utf-8").rstrip("=")
+
+
+def decode_cursor(cursor, sort_column):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+
+        if sort_value is not None and sort_column.type.python_type is datetime:
+            sort_value = datetime.fromisoformat(sort_value)
+
+        return sort_value, row_id
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+
+def keyset_paginate(query, sort_column, id_column, cursor, per_page, descending=False):
+    """
+    Seek on (sort_column, id_column) instead of OFFSET and skip the COUNT(*).
+    An empty cursor returns the first page.
+    """
+    if cursor:
+        sort_value, last_id = decode_cursor(cursor, sort_column)
+
+        if descending:
+            query = query.filter(
+                or_(
+                    sort_column < sort_value,
+                    and_(sort_column == sort_value, id_column < last_id),
+                )
+            )
+        else:
+            query = query.filter(
+                or_(
+                    sort_column > sort_value,
+                    and_(sort_column == sort_value, id_column > last_id),
+                )
+            )
+
+    if descending:
+        query = query.order_by(None).order_by(sort_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(None).order_by(sort_column.asc(), id_column.asc())
+
+    items = query.limit(per_page + 1).all()
+    next_cursor = None
+
+    if len(items) > per_page:
+        items = items[:per_page]
+        last_item = items[-1]
+        next_cursor = encode_cursor(
+            getattr(last_item, sort_column.key), getattr(last_item, id_column.key)
+        )
+
+    return KeysetPage(items=items, next_cursor=next_cursor)
@@ -0,0 +1,10 @@
+import os
+import socket
+
+
+def lease_owner():
+    """
+    Identifies this process in locked_by columns. Computed per call so a
+    forked worker does not inherit its parent's id.
+    """
+    return f"{socket.gethostname()}:{os.getpid()}"
@@ -0,0 +1,106 @@
+import os
+import time
+import threading
+
+# 2024-01-01T00:00:00Z, 41 bits of milliseconds last until 2093
+SNOWFLAKE_EPOCH_MS = 1704067200000
+WORKER_ID_BITS = 10
+SEQUENCE_BITS = 12
+MAX_WORKER_ID = (1 << WORKER_ID_BITS) - 1
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+# a 63 bit id has at most 19 digits, padding keeps string order == time order
+ID_DIGITS = 19
+# legacy ids are prefix + YYYYMMDD + uuid, e.g. TRX2024...; a leading 9 makes
+# every snowflake id sort after all of them, so keyset cursors on id stay
+# ordered across the cutover
+ORDER_DIGIT = "9"
+# tolerate small NTP step backs by waiting, refuse anything larger
+MAX_CLOCK_DRIFT_MS = 50
+
+
+class SnowflakeGenerator:
+    """
+    timestamp (41 bits) | worker id (10 bits) | sequence (12 bits)
+
+    Ids from one worker are strictly increasing and workers with distinct
+    ids never collide. SNOWFLAKE_WORKER_ID (0-1023) is required and must
+    be unique per process across all hosts. It is read when the first id
+    is generated and again after a fork, so a pre-fork server can assign
+    it per worker from its post-fork hook.
+    """
+
+    def __init__(self, worker_id=None, epoch_ms=SNOWFLAKE_EPOCH_MS):
+        self.configured_worker_id = worker_id
+        self.epoch_ms = epoch_ms
+        self.lock = threading.Lock()
+        self.reset()
+
+        if hasattr(os, "register_at_fork"):
+            # a generator created before gunicorn forks must not share its state
+            os.register_at_fork(after_in_child=self.reset)
+
+    def reset(self):
+        self.worker_id = None
+        self.last_ms = -1
+        self.sequence = 0
+
+    def resolve_worker_id(self, worker_id):
+        if worker_id is None:
+            worker_id = os.getenv("SNOWFLAKE_WORKER_ID")
+
+        if worker_id is None or worker_id == "":
+            raise RuntimeError(
+                "SNOWFLAKE_WORKER_ID is not set, give every process a unique id"
+            )
+
+        worker_id = int(worker_id)
+        if not 0 <= worker_id <= MAX_WORKER_ID:
+            raise ValueError(f"SNOWFLAKE_WORKER_ID must be between 0 and {MAX_WORKER_ID}")
+
+        return worker_id
+
+    def current_ms(self):
+        return time.time_ns() // 1_000_000 - self.epoch_ms
+
+    def next_id(self):
+        with self.lock:
+            if self.worker_id is None:
+                self.worker_id = self.resolve_worker_id(self.configured_worker_id)
+
+            now = self.current_ms()
+
+            if now < self.last_ms:
+                if self.last_ms - now > MAX_CLOCK_DRIFT_MS:
+                    raise RuntimeError("Clock moved backwards, refusing to generate id")
+
+                while now < self.last_ms:
+                    time.sleep(0.001)
+                    now = self.current_ms()
+
+            if now == self.last_ms:
+                self.sequence = (self.sequence + 1) & MAX_SEQUENCE
+
+                # 4096 ids in this millisecond already, wait for the next one
+                if self.sequence == 0:
+                    while now <= self.last_ms:
+                        now = self.current_ms()
+            else:
+                self.sequence = 0
+
+            self.last_ms = now
+
+            return (
+                (now << (WORKER_ID_BITS + SEQUENCE_BITS))
+                | (self.worker_id << SEQUENCE_BITS)
+                | self.sequence
+            )
+
+    def next_prefixed_id(self, prefix):
+        return f"{prefix}{ORDER_DIGIT}{self.next_id():0{ID_DIGITS}d}"
+
+
+snowflake = SnowflakeGenerator()
+
+
+def generate_snowflake_id(prefix):
+    return snowflake.next_prefixed_id(prefix)
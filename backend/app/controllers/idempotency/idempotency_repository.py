@@ -0,0 +1,93 @@
+from datetime import datetime
+import pytz
+
+from sqlalchemy import update, delete
+
+from app.db import db
+from app.models import IdempotencyKeys
+from app.models.idempotency_keys import idempotency_key_status
+
+
+class IdempotencyRepository:
+    def __init__(self, db=db, idempotency_keys=IdempotencyKeys):
+        self.db = db
+        self.idempotency_keys = idempotency_keys
+
+    def create_key(self, owner, endpoint, idempotency_key, request_hash):
+        return self.idempotency_keys(
+            owner=owner,
+            endpoint=endpoint,
+            idempotency_key=idempotency_key,
+            request_hash=request_hash,
+        )
+
+    def get_key(self, owner, endpoint, idempotency_key):
+        return (
+            self.idempotency_keys.query.filter_by(
+                owner=owner, endpoint=endpoint, idempotency_key=idempotency_key
+            )
+            .populate_existing()
+            .first()
+        )
+
+    def refresh_key(self, key_id):
+        """Heartbeat of the owner, keeps locked_at recent while it runs."""
+        self.db.session.execute(
+            update(self.idempotency_keys)
+            .where(
+                self.idempotency_keys.id == key_id,
+                self.idempotency_keys.status
+                == idempotency_key_status.IN_PROGRESS.value,
+            )
+            .values(locked_at=datetime.now(pytz.UTC))
+            .execution_options(synchronize_session=False)
+        )
+
+    def take_over_key(self, key_id, locked_before):
+        """Claim a key whose owner stopped heartbeating (crashed worker)."""
+        result = self.db.session.execute(
+            update(self.idempotency_keys)
+            .where(
+                self.idempotency_keys.id == key_id,
+                self.idempotency_keys.status
+                == idempotency_key_status.IN_PROGRESS.value,
+                self.idempotency_keys.locked_at < locked_before,
+            )
+            .values(locked_at=datetime.now(pytz.UTC))
+            .execution_options(synchronize_session=False)
+        )
+
+        return result.rowcount == 1
+
+    def complete_key(self, key_id, response_code, response_body):
+        self.db.session.execute(
+            update(self.idempotency_keys)
+            .where(self.idempotency_keys.id == key_id)
+            .values(
+                status=idempotency_key_status.COMPLETED.value,
+                response_code=response_code,
+                response_body=response_body,
+                completed_at=datetime.now(pytz.UTC),
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    def delete_key(self, key_id):
+        self.db.session.execute(
+            delete(self.idempotency_keys)
+            .where(self.idempotency_keys.id == key_id)
+            .execution_options(synchronize_session=False)
+        )
+
+    def purge_keys(self, created_before):
+        result = self.db.session.execute(
+            delete(self.idempotency_keys)
+            .where(
+                self.idempotency_keys.created_at < created_before,
+                self.idempotency_keys.status
+                == idempotency_key_status.COMPLETED.value,
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+        return result.rowcount
@@ -0,0 +1,166 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from datetime import datetime, timedelta
+import pytz
+
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+
+from app.db import db
+from app.models.idempotency_keys import idempotency_key_status
+from .idempotency_repository import IdempotencyRepository
+
+
+class IdempotencyService:
+    """
+    Runs a handler at most once per (owner, endpoint, Idempotency-Key).
+    The first request inserts the key as in progress and executes; a
+    duplicate arriving meanwhile polls the row until the response is
+    stored, and later duplicates get the stored response back. Server
+    errors are not stored so the client can retry with the same key.
+
+    While the handler runs, a heartbeat thread refreshes locked_at every
+    third of IDEMPOTENCY_LOCK_SECONDS, so a slow Midtrans call is never
+    taken over; only a key whose owner died goes stale.
+    """
+
+    def __init__(
+        self,
+        db=db,
+        repository=None,
+        wait_seconds=None,
+        lock_seconds=None,
+        poll_interval=0.05,
+    ):
+        self.db = db
+        self.repository = repository or IdempotencyRepository()
+        self.wait_seconds = wait_seconds or float(
+            os.getenv("IDEMPOTENCY_WAIT_SECONDS", 15)
+        )
+        self.lock_seconds = lock_seconds or int(
+            os.getenv("IDEMPOTENCY_LOCK_SECONDS", 120)
+        )
+        self.poll_interval = poll_interval
+
+    def run(self, owner, endpoint, idempotency_key, data, handler):
+        if len(idempotency_key) > 255:
+            return {"error": "Idempotency-Key must be at most 255 characters"}, 400
+
+        request_hash = self.hash_request(data)
+        deadline = time.monotonic() + self.wait_seconds
+        interval = self.poll_interval
+
+        while True:
+            try:
+                entry = self.repository.create_key(
+                    owner=owner,
+                    endpoint=endpoint,
+                    idempotency_key=idempotency_key,
+                    request_hash=request_hash,
+                )
+                self.db.session.add(entry)
+                self.db.session.commit()
+
+                return self.execute(entry.id, handler)
+            except IntegrityError:
+                self.db.session.rollback()
+            except Exception as e:
+                self.db.session.rollback()
+                return {"error": str(e)}, 500
+
+            entry = self.repository.get_key(owner, endpoint, idempotency_key)
+
+            # None when the owner failed with a server error and released the key
+            if entry is not None:
+                if entry.request_hash != request_hash:
+                    self.db.session.rollback()
+                    return {
+                        "error": "Idempotency-Key was already used with a different request"
+                    }, 422
+
+                if entry.status == idempotency_key_status.COMPLETED.value:
+                    response = json.loads(entry.response_body), entry.response_code
+                    self.db.session.rollback()
+                    return response
+
+                locked_before = datetime.now(pytz.UTC) - timedelta(
+                    seconds=self.lock_seconds
+                )
+                if self.repository.take_over_key(entry.id, locked_before):
+                    self.db.session.commit()
+                    return self.execute(entry.id, handler)
+
+            # end the read transaction so the next poll sees the owner's commit
+            self.db.session.rollback()
+
+            if time.monotonic() >= deadline:
+                return {
+                    "error": "A request with this Idempotency-Key is still being processed"
+                }, 409
+
+            time.sleep(interval)
+            interval = min(interval * 2, 0.5)
+
+    def execute(self, key_id, handler):
+        stopped = threading.Event()
+        heartbeat = threading.Thread(
+            target=self.heartbeat,
+            args=(current_app._get_current_object(), key_id, stopped),
+            name=f"idempotency-heartbeat-{key_id}",
+            daemon=True,
+        )
+        heartbeat.start()
+
+        try:
+            body, status_code = handler()
+        except Exception as e:
+            self.db.session.rollback()
+            body, status_code = {"error": str(e)}, 500
+        finally:
+            stopped.set()
+
+        try:
+            if status_code >= 500:
+                self.repository.delete_key(key_id)
+            else:
+                self.repository.complete_key(
+                    key_id, status_code, json.dumps(body, default=str)
+                )
+            self.db.session.commit()
+        except Exception:
+            self.db.session.rollback()
+            current_app.logger.exception(
+                "Could not store idempotent response for key %s", key_id
+            )
+
+        return body, status_code
+
+    def heartbeat(self, app, key_id, stopped):
+        while not stopped.wait(self.lock_seconds / 3):
+            with app.app_context():
+                try:
+                    self.repository.refresh_key(key_id)
+                    self.db.session.commit()
+                except Exception:
+                    self.db.session.rollback()
+                    app.logger.exception(
+                        "Could not refresh idempotency key %s", key_id
+                    )
+
+    def purge(self, older_than_hours):
+        try:
+            created_before = datetime.now(pytz.UTC) - timedelta(hours=older_than_hours)
+            purged = self.repository.purge_keys(created_before)
+            self.db.session.commit()
+
+            return purged
+        except Exception:
+            self.db.session.rollback()
+            raise
+
+    def hash_request(self, data):
+        payload = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
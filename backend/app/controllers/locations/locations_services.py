@@ -1,28 +1,36 @@
 from app.db import db
 from .locations_repository import LocationRepository
+from ..reference.reference_store import reference_store
 
 
 class LocationServices:
-    def __init__(self, db=db, repository=None):
+    def __init__(self, db=db, repository=None, reference_store=reference_store):
         self.db = db
         self.repository = repository or LocationRepository()
+        self.reference_store = reference_store
 
     def get_provinces(self):
         try:
-            return [data.to_dict() for data in self.repository.get_provinces()]
+            return self.reference_store.response("provinces")
         except Exception as e:
             return {"error": str(e)}, 500
 
     def get_districts(self, req):
         try:
-            province_id = req.args.get("prov_id")
+            province_id = req.args.get("prov_id", None)
+            key = "districts"
 
-            districts = self.repository.get_districts(province_id=province_id)
+            # an unparseable prov_id must not fall back to every district
+            if province_id is not None:
+                try:
+                    key = f"districts:{int(province_id)}"
+                except ValueError:
+                    raise ValueError("prov_id must be an integer")
 
-            if not districts:
+            if not self.reference_store.has(key):
                 raise ValueError("District not found")
 
-            return [district.to_dict() for district in districts]
+            return self.reference_store.response(key)
 
         except ValueError as e:
             return {"error": str(e)}, 400
@@ -32,16 +40,21 @@ class LocationServices:
     def get_location_by_id(self, prov_id, dist_id):
         try:
             if dist_id:
-                district = self.repository.get_districts_by_id(dist_id)
-                if district is None:
+                if not self.reference_store.has(f"district:{dist_id}"):
                     raise ValueError("District not found")
-                return district.to_dict()
+                return self.reference_store.response(f"district:{dist_id}")
 
             if prov_id:
-                province = self.repository.get_provinces_by_id(prov_id)
-                if province is None:
+                if not self.reference_store.has(f"province:{prov_id}"):
                     raise ValueError("Province not found")
-                return province.to_dict()
+                return self.reference_store.response(f"province:{prov_id}")
 
+            raise ValueError("Please provide prov_id or dist_id")
+
+        except ValueError as e:
+            return {"error": str(e)}, 400
         except Exception as e:
             return {"error": str(e)}, 500
+
+    def get_district(self, district_id):
+        return self.reference_store.get().districts_by_id.get(district_id)
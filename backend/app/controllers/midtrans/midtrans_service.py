@@ -4,6 +4,8 @@ import midtransclient.transactions
 import midtransclient
 from dotenv import load_dotenv
 
+from app.instrumentation import track_external
+
 load_dotenv()
 
 
@@ -24,6 +26,11 @@ class MidtransService:
             server_key=os.getenv("MIDTRANS_SERVER_KEY"),
         )
 
+        # e.g. the local stand-in in standins/midtrans.py
+        snap_base_url = os.getenv("MIDTRANS_SNAP_BASE_URL")
+        if snap_base_url:
+            snap.api_config.SNAP_SANDBOX_BASE_URL = snap_base_url
+
         param = {
             "transaction_details": {
                 "order_id": parent_id,
@@ -33,7 +40,8 @@ class MidtransService:
             "credit_card": {"secure": True},
         }
 
-        snap_response = snap.create_transaction(param)
+        with track_external("midtrans"):
+            snap_response = snap.create_transaction(param)
 
         return snap_response
 
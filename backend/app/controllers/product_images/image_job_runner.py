@@ -0,0 +1,159 @@
+import json
+import atexit
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+
+from app.db import db
+from app.models.image_jobs import image_job_status
+from ..common import lease_owner
+from .image_jobs_repository import ImageJobsRepository
+from .product_images_service import ProductImagesService
+
+
+class ImageJobRunner:
+    """
+    Processes queued ImageJobs in the background. Job state lives in the
+    image_jobs table. A running job is leased to its process for
+    IMAGE_JOB_LEASE_SECONDS; recover() requeues queued jobs and jobs
+    whose lease ran out, so it is safe with several app processes.
+    """
+
+    def __init__(self, app=None):
+        self.app = app
+        self.executor = None
+        self.upload_executor = None
+        self.max_attempts = 3
+        self.backoff_seconds = 2.0
+        self.lease_seconds = 600
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.max_attempts = int(app.config.get("IMAGE_JOB_MAX_ATTEMPTS") or 3)
+        self.backoff_seconds = float(app.config.get("IMAGE_JOB_BACKOFF_SECONDS") or 2)
+        self.lease_seconds = int(app.config.get("IMAGE_JOB_LEASE_SECONDS") or 600)
+
+        self.executor = ThreadPoolExecutor(
+            max_workers=int(app.config.get("IMAGE_JOB_WORKERS") or 2),
+            thread_name_prefix="image-job",
+        )
+        self.upload_executor = ThreadPoolExecutor(
+            max_workers=int(app.config.get("IMAGE_UPLOAD_WORKERS") or 5),
+            thread_name_prefix="image-upload",
+        )
+
+        atexit.register(self.shutdown)
+
+    def submit(self, job_id, delay=0):
+        if self.executor is None:
+            raise RuntimeError("Image job runner is not initialised")
+
+        if delay:
+            timer = threading.Timer(delay, self.submit, args=(job_id,))
+            timer.daemon = True
+            timer.start()
+            return
+
+        self.executor.submit(self.process, job_id)
+
+    def recover(self, stale_before=None):
+        repository = ImageJobsRepository()
+
+        try:
+            job_ids = repository.requeue_expired_jobs(stale_before)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        for job_id in job_ids:
+            self.submit(job_id)
+
+        return len(job_ids)
+
+    def process(self, job_id):
+        with self.app.app_context():
+            try:
+                self.run_job(job_id)
+            except Exception as e:
+                db.session.rollback()
+                current_app.logger.exception("image job %s failed", job_id)
+                self.fail_job(job_id, str(e))
+            finally:
+                db.session.remove()
+
+    def fail_job(self, job_id, error):
+        try:
+            ImageJobsRepository().finish_job(
+                job_id,
+                lease_owner(),
+                status=image_job_status.FAILED.value,
+                error=error,
+            )
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            current_app.logger.exception(
+                "image job %s could not be marked failed", job_id
+            )
+
+    def run_job(self, job_id):
+        repository = ImageJobsRepository()
+        owner = lease_owner()
+
+        if not repository.claim_job(job_id, owner, self.lease_seconds):
+            db.session.rollback()
+            return
+        db.session.commit()
+
+        job = repository.get_job(job_id)
+        product_images_service = ProductImagesService(
+            upload_executor=self.upload_executor
+        )
+
+        message, status_code = product_images_service.save_image(
+            product_id=job.product_id,
+            new_images_base64=json.loads(job.payload),
+        )
+
+        retry_in = None
+
+        if status_code in [200, 201]:
+            values = {
+                "status": image_job_status.DONE.value,
+                "payload": None,
+                "error": None,
+            }
+        elif status_code == 400 or job.attempts >= self.max_attempts:
+            values = {
+                "status": image_job_status.FAILED.value,
+                "error": message["error"],
+            }
+        else:
+            values = {
+                "status": image_job_status.QUEUED.value,
+                "error": message["error"],
+            }
+            retry_in = self.backoff_seconds * 2 ** (job.attempts - 1)
+
+        if not repository.finish_job(job_id, owner, **values):
+            # the lease ran out and another worker took the job over
+            db.session.rollback()
+            current_app.logger.warning("image job %s lost its lease", job_id)
+            return
+        db.session.commit()
+
+        if retry_in is not None:
+            self.submit(job_id, delay=retry_in)
+
+    def shutdown(self):
+        for executor in [self.executor, self.upload_executor]:
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+
+image_job_runner = ImageJobRunner()
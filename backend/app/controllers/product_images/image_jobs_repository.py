@@ -0,0 +1,122 @@
+import json
+import uuid
+from datetime import datetime, timedelta
+import pytz
+
+from sqlalchemy import update, func, and_, or_
+
+from app.db import db
+from app.models import ImageJobs
+from app.models.image_jobs import image_job_status
+
+
+class ImageJobsRepository:
+
+    def __init__(self, db=db, image_job=ImageJobs):
+        self.db = db
+        self.image_job = image_job
+
+    def create_job(self, product_id, seller_id, images_base64):
+        return self.image_job(
+            id=uuid.uuid4().hex,
+            product_id=product_id,
+            seller_id=seller_id,
+            image_count=len(images_base64),
+            payload=json.dumps(images_base64),
+        )
+
+    def get_job(self, job_id):
+        return self.image_job.query.filter_by(id=job_id).first()
+
+    def get_seller_job(self, job_id, seller_id):
+        return self.image_job.query.filter_by(id=job_id, seller_id=seller_id).first()
+
+    def count_pending_images(self, product_id):
+        return (
+            self.db.session.query(func.coalesce(func.sum(self.image_job.image_count), 0))
+            .filter(
+                self.image_job.product_id == product_id,
+                self.image_job.status.in_(
+                    [image_job_status.QUEUED.value, image_job_status.PROCESSING.value]
+                ),
+            )
+            .scalar()
+        )
+
+    def expired_lease(self, now):
+        return and_(
+            self.image_job.status == image_job_status.PROCESSING.value,
+            or_(
+                self.image_job.locked_until.is_(None),
+                self.image_job.locked_until < now,
+            ),
+        )
+
+    def claim_job(self, job_id, owner, lease_seconds):
+        """
+        Conditional update so a job is only ever held by one worker. A
+        PROCESSING job whose lease ran out (its worker died) is taken over.
+        """
+        now = datetime.now(pytz.UTC)
+        result = self.db.session.execute(
+            update(self.image_job)
+            .where(
+                self.image_job.id == job_id,
+                or_(
+                    self.image_job.status == image_job_status.QUEUED.value,
+                    self.expired_lease(now),
+                ),
+            )
+            .values(
+                status=image_job_status.PROCESSING.value,
+                attempts=self.image_job.attempts + 1,
+                locked_by=owner,
+                locked_until=now + timedelta(seconds=lease_seconds),
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+        return result.rowcount == 1
+
+    def finish_job(self, job_id, owner, **values):
+        """Only applies while owner still holds the lease."""
+        result = self.db.session.execute(
+            update(self.image_job)
+            .where(
+                self.image_job.id == job_id,
+                self.image_job.status == image_job_status.PROCESSING.value,
+                self.image_job.locked_by == owner,
+            )
+            .values(locked_by=None, locked_until=None, **values)
+            .execution_options(synchronize_session=False)
+        )
+
+        return result.rowcount == 1
+
+    def requeue_expired_jobs(self, stale_before=None):
+        """
+        Put jobs whose worker died back in the queue and return the ids of
+        all queued jobs. Jobs of live workers keep their lease. With
+        stale_before, only jobs last updated before it, so jobs waiting out
+        a retry backoff are left to their timer.
+        """
+        self.db.session.execute(
+            update(self.image_job)
+            .where(self.expired_lease(datetime.now(pytz.UTC)))
+            .values(
+                status=image_job_status.QUEUED.value, locked_by=None, locked_until=None
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+        query = self.db.session.query(self.image_job.id).filter(
+            self.image_job.status == image_job_status.QUEUED.value
+        )
+        if stale_before is not None:
+            query = query.filter(self.image_job.updated_at < stale_before)
+
+        return [
+            job_id
+            for (job_id,) in query.order_by(self.image_job.created_at)
+            .all()
+        ]
@@ -1,12 +1,18 @@
 from app.db import db
-from app.models import ProductImages
+from app.models import ProductImages, ProductImageVariants
 
 
 class ProductImagesRepository:
 
-    def __init__(self, db=db, product_image=ProductImages):
+    def __init__(
+        self,
+        db=db,
+        product_image=ProductImages,
+        product_image_variant=ProductImageVariants,
+    ):
         self.db = db
         self.product_image = product_image
+        self.product_image_variant = product_image_variant
 
     def get_product_images(self, product_id):
         return self.product_image.query.filter_by(product_id=product_id).all()
@@ -20,8 +26,19 @@ class ProductImagesRepository:
 
         return image
 
+    def save_product_image_variant(
+        self, width, image_format, image_public_id, image_secure_url
+    ):
+        return self.product_image_variant(
+            width=width,
+            image_format=image_format,
+            image_public_id=image_public_id,
+            image_secure_url=image_secure_url,
+        )
+
     def get_product_image_by_id(self, image_id):
         return self.product_image.query.filter_by(id=image_id).first()
 
     def delete_product_image(self, image_id):
+        self.product_image_variant.query.filter_by(product_image_id=image_id).delete()
         return self.product_image.query.filter_by(id=image_id).delete()
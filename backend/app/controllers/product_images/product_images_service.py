@@ -1,14 +1,67 @@
 from app.db import db
 from .product_images_repository import ProductImagesRepository
-from ..cloudinary.cloudinary_service import CloudinaryService
+from .image_jobs_repository import ImageJobsRepository
+from ..cloudinary.local_storage import get_image_storage
 
 
 class ProductImagesService:
 
-    def __init__(self, db=db, repository=None, cloudinary_service=None):
+    def __init__(
+        self,
+        db=db,
+        repository=None,
+        cloudinary_service=None,
+        image_jobs_repository=None,
+        upload_executor=None,
+    ):
         self.db = db
         self.repository = repository or ProductImagesRepository()
-        self.cloudinary_service = cloudinary_service or CloudinaryService()
+        self.cloudinary_service = cloudinary_service or get_image_storage()
+        self.image_jobs_repository = image_jobs_repository or ImageJobsRepository()
+        self.upload_executor = upload_executor
+
+    def enqueue_images(self, product_id, seller_id, new_images_base64):
+        """
+        Validate and persist an image job. The caller commits and then
+        hands job.id to the image job runner.
+        """
+        if not isinstance(new_images_base64, list) or not all(
+            isinstance(image, str) for image in new_images_base64
+        ):
+            raise ValueError("image_base64 must be a list of base64 strings")
+
+        number_of_image = len(
+            self.repository.get_product_images(product_id)
+        ) + self.image_jobs_repository.count_pending_images(product_id)
+
+        if number_of_image + len(new_images_base64) > 5:
+            raise ValueError(
+                "Cannot upload more than 5 images. Please delete some images first."
+            )
+
+        job = self.image_jobs_repository.create_job(
+            product_id=product_id,
+            seller_id=seller_id,
+            images_base64=new_images_base64,
+        )
+        self.db.session.add(job)
+
+        return job
+
+    def get_image_job(self, job_id, seller_id):
+        try:
+            job = self.image_jobs_repository.get_seller_job(
+                job_id=job_id, seller_id=seller_id
+            )
+
+            if not job:
+                raise ValueError("Image job not found")
+
+            return job.to_dict(), 200
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        except Exception as e:
+            return {"error": str(e)}, 500
 
     def save_image(self, product_id, new_images_base64):
         """
@@ -30,7 +83,7 @@ class ProductImagesService:
                 )
 
             images_details = self.cloudinary_service.upload_multiple_images(
-                new_images_base64
+                new_images_base64, executor=self.upload_executor, variants=True
             )
 
             if len(images_details) <= 0:
@@ -43,6 +96,15 @@ class ProductImagesService:
                     image_public_id=image["public_id"],
                     image_secure_url=image["secure_url"],
                 )
+                new_image.variants = [
+                    self.repository.save_product_image_variant(
+                        width=variant["width"],
+                        image_format=variant["image_format"],
+                        image_public_id=variant["public_id"],
+                        image_secure_url=variant["secure_url"],
+                    )
+                    for variant in image.get("variants", [])
+                ]
                 result.append(new_image)
                 number_of_image += 1
 
@@ -69,10 +131,16 @@ class ProductImagesService:
             ):
                 raise ValueError("Product image not found")
 
+            variant_public_ids = [
+                variant.image_public_id for variant in product_image.variants
+            ]
+
             self.repository.delete_product_image(image_id=image_id)
             self.db.session.commit()
 
             self.cloudinary_service.delete_image(image_public_id)
+            for public_id in variant_public_ids:
+                self.cloudinary_service.delete_image(public_id)
 
             return {"message": "Product image deleted successfully"}, 200
         except ValueError as e:
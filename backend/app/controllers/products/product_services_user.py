@@ -1,5 +1,6 @@
 from app.db import db
 from . import products_repository
+from ..cloudinary.image_variants import parse_variant_args
 
 
 class ProductServicesUser:
@@ -11,6 +12,7 @@ class ProductServicesUser:
         try:
             page = request.args.get("page", 1, int)
             per_page = request.args.get("per_page", 10, int)
+            image_variant = parse_variant_args(request.args)
 
             products = self.repository.get_product_by_category(
                 category_id=category_id, page=page, per_page=per_page
@@ -19,7 +21,7 @@ class ProductServicesUser:
             if not products:
                 raise ValueError("Product not found / Invalid Category ID")
 
-            return self.response(products=products), 200
+            return self.response(products=products, image_variant=image_variant), 200
         except ValueError as e:
             return {"error": str(e)}, 400
         except Exception as e:
@@ -33,10 +35,12 @@ class ProductServicesUser:
         province_id = req.args.get("province_id", None)
         district_id = req.args.get("district_id", None)
         seller_id = req.args.get("seller_id", None)
+        cursor = req.args.get("cursor", None)
 
         try:
             per_page = req.args.get("per_page", 10, int)
             page = req.args.get("page", 1, int)
+            image_variant = parse_variant_args(req.args)
 
             products = self.repository.get_product_by_filter(
                 rating=rating,
@@ -48,12 +52,19 @@ class ProductServicesUser:
                 province_id=province_id,
                 district_id=district_id,
                 seller_id=seller_id,
+                cursor=cursor,
             )
 
             if not products:
                 raise ValueError("Product not found / Invalid Filter")
 
-            return self.response(products=products), 200
+            if cursor is not None:
+                return (
+                    self.cursor_response(products=products, image_variant=image_variant),
+                    200,
+                )
+
+            return self.response(products=products, image_variant=image_variant), 200
 
         except ValueError as e:
             return {"error": str(e)}, 400
@@ -75,10 +86,26 @@ class ProductServicesUser:
         except Exception as e:
             return {"error": str(e)}, 500
 
-    def response(self, products):
+    def get_products_by_ids(self, product_ids):
+        try:
+            products = self.repository.get_products_by_ids(product_ids=product_ids)
+
+            return {
+                "products": [product.to_dict() for product in products],
+            }, 200
+        except Exception as e:
+            return {"error": str(e)}, 500
+
+    def response(self, products, image_variant=None):
         return {
-            "products": [product.to_dict() for product in products],
+            "products": [product.to_dict(image_variant) for product in products],
             "total_page": products.pages,
             "current_page": products.page,
             "total_items": products.total,
         }
+
+    def cursor_response(self, products, image_variant=None):
+        return {
+            "products": [product.to_dict(image_variant) for product in products],
+            "next_cursor": products.next_cursor,
+        }
@@ -1,9 +1,10 @@
-from flask import request
+from flask import request, abort, send_from_directory
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from flasgger import swag_from
 
 from . import products_blueprint
 from .products_services import ProductsServices
+from ..cloudinary.local_storage import LocalImageStorage, get_image_storage
 
 
 service = ProductsServices()
@@ -64,3 +65,23 @@ def product_delete_image(image_id):
     identity = get_jwt_identity()
     data = request.get_json()
     return service.delete_image(identity=identity, image_id=image_id, data=data)
+
+
+@products_blueprint.route("/seller/imagejobs/<string:job_id>", methods=["GET"])
+@jwt_required()
+@swag_from("./products_seller_image_job.yml")
+def product_image_job(job_id):
+    role = get_jwt_identity().get("role")
+    role_id = get_jwt_identity().get("id")
+    return service.get_image_job(job_id, role, role_id)
+
+
+@products_blueprint.route("/images/<path:filename>", methods=["GET"])
+@swag_from("./products_local_image.yml")
+def product_local_image(filename):
+    storage = get_image_storage()
+
+    if not isinstance(storage, LocalImageStorage):
+        abort(404)
+
+    return send_from_directory(storage.directory, filename)
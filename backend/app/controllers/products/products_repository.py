@@ -1,7 +1,10 @@
+from sqlalchemy import update, select
 from sqlalchemy.sql import func
+from sqlalchemy.orm import selectinload
 
 from app.db import db
-from app.models import Products, Reviews, Addresses
+from ..common import keyset_paginate
+from app.models import Products, Reviews, Addresses, Sellers, Users, ProductImages
 
 
 class ProductsRepository:
@@ -13,17 +16,27 @@ class ProductsRepository:
     def create_product(self, seller_id, **data):
         return self.product(seller_id=seller_id, **data)
 
-    def get_list_products(self, role, page, per_page, role_id=None):
+    def get_list_products(self, role, page, per_page, role_id=None, cursor=None):
         if role == "seller":
-            return self.product.query.filter_by(seller_id=role_id).paginate(
-                page=page, per_page=per_page
-            )
+            query = self.product.query.filter_by(seller_id=role_id)
+        elif role == "user":
+            query = self.product.query.filter_by(is_active=1)
+        else:
+            return None
 
-        if role == "user":
-            return self.product.query.filter_by(is_active=1).paginate(
-                page=page, per_page=per_page
+        query = query.options(*self.listing_options())
+
+        if cursor is not None:
+            return keyset_paginate(
+                query,
+                sort_column=self.product.id,
+                id_column=self.product.id,
+                cursor=cursor,
+                per_page=per_page,
             )
 
+        return query.paginate(page=page, per_page=per_page)
+
     def get_product_by_id(self, role, product_id, role_id=None):
         if role == "seller":
             return self.product.query.filter_by(
@@ -33,10 +46,37 @@ class ProductsRepository:
         if role == "user":
             return self.product.query.filter_by(is_active=1, id=product_id).first()
 
+    def get_products_by_ids(self, product_ids):
+        if not product_ids:
+            return []
+
+        return (
+            self.product.query.filter(
+                self.product.id.in_(set(product_ids)), self.product.is_active == 1
+            )
+            .options(*self.listing_options())
+            .all()
+        )
+
+    def get_product_stocks(self, product_ids):
+        if not product_ids:
+            return {}
+
+        rows = (
+            self.db.session.query(self.product.id, self.product.stock)
+            .filter(
+                self.product.id.in_(set(product_ids)), self.product.is_active == 1
+            )
+            .all()
+        )
+        return dict(rows)
+
     def get_product_by_category(self, category_id, page, per_page):
-        return self.product.query.filter_by(
-            category_id=category_id, is_active=1
-        ).paginate(page=page, per_page=per_page)
+        return (
+            self.product.query.filter_by(category_id=category_id, is_active=1)
+            .options(*self.listing_options())
+            .paginate(page=page, per_page=per_page)
+        )
 
     def get_product_by_filter(
         self,
@@ -49,33 +89,36 @@ class ProductsRepository:
         province_id=None,
         district_id=None,
         seller_id=None,
+        cursor=None,
     ):
         query = self.product.query
+        # first requested ordering is the seek key in cursor mode
+        sort_keys = []
 
         if rating:
-            query = (
-                query.outerjoin(Reviews, self.product.id == Reviews.product_id)
-                .group_by(self.product.id)
-                .filter(self.product.is_active == 1)
-            )
+            query = query.filter(self.product.is_active == 1)
 
             if rating == "asc":
-                query = query.order_by(func.coalesce(func.avg(Reviews.rating), 0).asc())
+                query = query.order_by(self.product.avg_rating.asc())
+                sort_keys.append((self.product.avg_rating, False))
             if rating == "desc":
-                query = query.order_by(
-                    func.coalesce(func.avg(Reviews.rating), 0).desc()
-                )
+                query = query.order_by(self.product.avg_rating.desc())
+                sort_keys.append((self.product.avg_rating, True))
 
         if category_id:
             query = query.filter(self.product.category_id == category_id)
         if price == "asc":
             query = query.order_by(self.product.price.asc())
+            sort_keys.append((self.product.price, False))
         if price == "desc":
             query = query.order_by(self.product.price.desc())
+            sort_keys.append((self.product.price, True))
         if date == "newest":
             query = query.order_by(self.product.created_at.desc())
+            sort_keys.append((self.product.created_at, True))
         if date == "oldest":
             query = query.order_by(self.product.created_at.asc())
+            sort_keys.append((self.product.created_at, False))
         if province_id:
             query = (
                 query.join(Addresses, self.product.seller_id == Addresses.seller_id)
@@ -91,4 +134,72 @@ class ProductsRepository:
         if seller_id:
             query = query.filter(self.product.seller_id == seller_id)
 
+        query = query.options(*self.listing_options())
+
+        if cursor is not None:
+            sort_column, descending = (
+                sort_keys[0] if sort_keys else (self.product.id, False)
+            )
+
+            return keyset_paginate(
+                query,
+                sort_column=sort_column,
+                id_column=self.product.id,
+                cursor=cursor,
+                per_page=per_page,
+                descending=descending,
+            )
+
         return query.paginate(page=page, per_page=per_page)
+
+    def listing_options(self):
+        # load everything to_dict touches for a whole page in one query per relation
+        return (
+            selectinload(self.product.reviews)
+            .joinedload(Reviews.user_reviews)
+            .lazyload(Users.addresses),
+            selectinload(self.product.seller_products)
+            .selectinload(Sellers.addresses)
+            .joinedload(Addresses.district_addresses),
+            selectinload(self.product.product_images).selectinload(
+                ProductImages.variants
+            ),
+        )
+
+    def add_rating(self, product_id, rating):
+        # avg_rating is assigned first so it is computed from the old sum/count
+        # (MySQL applies SET assignments left to right)
+        self.db.session.execute(
+            update(self.product)
+            .where(self.product.id == product_id)
+            .ordered_values(
+                (
+                    self.product.avg_rating,
+                    (self.product.rating_sum + rating)
+                    / (self.product.rating_count + 1),
+                ),
+                (self.product.rating_sum, self.product.rating_sum + rating),
+                (self.product.rating_count, self.product.rating_count + 1),
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    def rebuild_ratings(self):
+        def aggregate(function):
+            return (
+                select(function)
+                .where(Reviews.product_id == self.product.id)
+                .scalar_subquery()
+            )
+
+        result = self.db.session.execute(
+            update(self.product)
+            .values(
+                rating_sum=func.coalesce(aggregate(func.sum(Reviews.rating)), 0),
+                rating_count=aggregate(func.count(Reviews.id)),
+                avg_rating=func.coalesce(aggregate(func.avg(Reviews.rating)), 0),
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+        return result.rowcount
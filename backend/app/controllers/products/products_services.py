@@ -1,7 +1,9 @@
 from .products_repository import ProductsRepository
 from ..sellers.sellers_service import SellersServices
 from ..cloudinary.cloudinary_service import CloudinaryService
+from ..cloudinary.image_variants import parse_variant_args
 from ..product_images.product_images_service import ProductImagesService
+from ..product_images.image_job_runner import image_job_runner
 
 from app.db import db
 from ..common import is_filled, get_data_and_validate
@@ -15,12 +17,14 @@ class ProductsServices:
         seller_service=None,
         cloudinary_service=None,
         product_images_service=None,
+        image_job_runner=image_job_runner,
     ):
         self.db = db
         self.repository = repository or ProductsRepository()
         self.seller_service = seller_service or SellersServices()
         self.cloudinary_service = cloudinary_service or CloudinaryService()
         self.product_images_service = product_images_service or ProductImagesService()
+        self.image_job_runner = image_job_runner
 
     def create_product(self, data, role, role_id):
         try:
@@ -37,9 +41,14 @@ class ProductsServices:
                 "height_cm",
             ]
 
-            seller_info_address = self.check_role_and_id(role, role_id)["seller"][
-                "addresses"
-            ]
+            seller_check = self.check_role_and_id(role, role_id)
+            if isinstance(seller_check, tuple):
+                return seller_check
+
+            # the only caller that needs the full seller, for its addresses
+            seller_info_address = self.seller_service.seller_info(role_id)[0][
+                "seller"
+            ]["addresses"]
 
             if not seller_info_address or len(seller_info_address) <= 0:
                 raise ValueError("Must input an address before creating a product")
@@ -58,24 +67,29 @@ class ProductsServices:
             new_product = self.repository.create_product(seller_id=role_id, **all_data)
 
             self.db.session.add(new_product)
-            self.db.session.commit()
+            self.db.session.flush()
 
-            # save to db and upload to cloudinary
-            product_id = new_product.id
-            message, status_code = self.product_images_service.save_image(
-                product_id=product_id, new_images_base64=images_base64
+            # images are decoded, compressed and uploaded in the background
+            image_job = self.product_images_service.enqueue_images(
+                product_id=new_product.id,
+                seller_id=role_id,
+                new_images_base64=images_base64,
             )
+            self.db.session.commit()
 
-            if status_code not in [200, 201]:
-                raise ValueError(message["error"])
+            self.image_job_runner.submit(image_job.id)
 
-            return {"message": "Product created successfully"}, 201
+            return {
+                "message": "Product created successfully",
+                "product_id": new_product.id,
+                "image_job_id": image_job.id,
+            }, 202
 
         except (TypeError, ValueError) as e:
             self.db.session.rollback()
             return {"error": str(e)}, 400
         except Exception as e:
-            self.db.session.rollback
+            self.db.session.rollback()
             return {"error": str(e)}, 500
 
     def get_list_products(self, request, role, role_id=None):
@@ -84,11 +98,20 @@ class ProductsServices:
         try:
             per_page = request.args.get("per_page", 10, int)
             page = request.args.get("page", 1, int)
+            cursor = request.args.get("cursor", None)
+            image_variant = parse_variant_args(request.args)
 
             products = self.repository.get_list_products(
-                role=role, page=page, per_page=per_page, role_id=role_id
+                role=role, page=page, per_page=per_page, role_id=role_id, cursor=cursor
             )
-            return self.response(products=products), 200
+
+            if cursor is not None:
+                return (
+                    self.cursor_response(products=products, image_variant=image_variant),
+                    200,
+                )
+
+            return self.response(products=products, image_variant=image_variant), 200
         except ValueError as e:
             return {"error": str(e)}, 400
         except Exception as e:
@@ -124,6 +147,7 @@ class ProductsServices:
             )
             count_updated_key = 0
             key_updated = []
+            image_job = None
 
             if product is None:
                 raise ValueError("Product not found")
@@ -137,13 +161,12 @@ class ProductsServices:
                     key_updated.append(key)
 
             if image_base64:
-                message, status_code = self.product_images_service.save_image(
-                    product_id=product_id, new_images_base64=image_base64
+                image_job = self.product_images_service.enqueue_images(
+                    product_id=product_id,
+                    seller_id=role_id,
+                    new_images_base64=image_base64,
                 )
 
-                if status_code not in [200, 201]:
-                    raise ValueError(message["error"])
-
                 count_updated_key += 1
                 key_updated.append("images")
 
@@ -152,13 +175,21 @@ class ProductsServices:
 
             self.db.session.commit()
 
-            return {
+            response = {
                 "message": "Product updated successfully",
                 "key_updated": key_updated,
-            }, 200
+            }
+
+            if image_job:
+                self.image_job_runner.submit(image_job.id)
+                response["image_job_id"] = image_job.id
+
+            return response, 200
         except ValueError as e:
+            self.db.session.rollback()
             return {"error": str(e)}, 400
         except Exception as e:
+            self.db.session.rollback()
             return {"error": str(e)}, 500
 
     def delete_product(self, product_id, role, role_id):
@@ -217,13 +248,28 @@ class ProductsServices:
         except Exception as e:
             return {"error": str(e)}, 500
 
+    def get_image_job(self, job_id, role, role_id):
+        try:
+            if role != "seller":
+                return {"error": "Unauthorized"}, 401
+
+            self.check_role_and_id(role, role_id)
+
+            return self.product_images_service.get_image_job(
+                job_id=job_id, seller_id=role_id
+            )
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        except Exception as e:
+            return {"error": str(e)}, 500
+
     def check_role_and_id(self, role, role_id):
         if role != "seller":
             return {"error": "Unauthorized"}, 401
         if role_id is None:
             return {"error": "Invalid seller"}, 400
 
-        seller_info = self.seller_service.seller_info(role_id)
+        seller_info = self.seller_service.verify_seller(role_id)
 
         if seller_info[1] != 200:
             raise ValueError("Seller not found")
@@ -245,59 +291,16 @@ class ProductsServices:
             height_cm=int,
         )
 
-    def response(self, products):
+    def response(self, products, image_variant=None):
         return {
-            "products": [product.to_dict() for product in products],
+            "products": [product.to_dict(image_variant) for product in products],
             "total_page": products.pages,
             "current_page": products.page,
             "total_items": products.total,
         }
 
-    def transaction_success_modification(self, product_id, quantity, commit=True):
-        try:
-            product = self.repository.get_product_by_id(
-                product_id=product_id, role="user"
-            )
-
-            product.item_sold(quantity)
-            product.reduce_item_qty(quantity)
-
-            if commit:
-                self.db.session.commit()
-
-            return {
-                "message": "Product stock and sold quantity updated successfully"
-            }, 200
-
-        except ValueError as e:
-            if commit:
-                self.db.session.rollback()
-            return {"error": str(e)}, 400
-        except Exception as e:
-            if commit:
-                self.db.session.rollback()
-            return {"error": str(e)}, 500
-
-    def transaction_canceled_modification(self, product_id, quantity, commit=True):
-        try:
-            product = self.repository.get_product_by_id(
-                product_id=product_id, role="user"
-            )
-
-            product.item_sold(-quantity)
-            product.increase_item_qty(quantity)
-
-            if commit:
-                self.db.session.commit()
-
-            return {
-                "message": "Product stock and sold quantity updated successfully"
-            }, 200
-        except ValueError as e:
-            if commit:
-                self.db.session.rollback()
-            return {"error": str(e)}, 400
-        except Exception as e:
-            if commit:
-                self.db.session.rollback()
-            return {"error": str(e)}, 500
+    def cursor_response(self, products, image_variant=None):
+        return {
+            "products": [product.to_dict(image_variant) for product in products],
+            "next_cursor": products.next_cursor,
+        }
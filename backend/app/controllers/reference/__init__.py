@@ -0,0 +1,7 @@
+from flask import Blueprint
+
+reference_blueprint = Blueprint(
+    "reference_blueprint", __name__, url_prefix="/api/reference"
+)
+
+from . import reference_controller
@@ -0,0 +1,19 @@
+from flask import request
+from flasgger import swag_from
+
+from . import reference_blueprint
+from ..common import has_admin_token
+from .reference_store import reference_store
+
+
+@reference_blueprint.route("/refresh", methods=["POST"])
+@swag_from("./reference_refresh.yml")
+def refresh_reference():
+    if not has_admin_token(request):
+        return {"error": "Unauthorized"}, 401
+
+    try:
+        reference_store.reload()
+        return reference_store.stats(), 200
+    except Exception as e:
+        return {"error": str(e)}, 500
@@ -0,0 +1,30 @@
+from app.db import db
+from app.models import Provinces, Districts, Categories, Shipments
+
+
+class ReferenceRepository:
+    def __init__(
+        self,
+        db=db,
+        province=Provinces,
+        district=Districts,
+        category=Categories,
+        shipment=Shipments,
+    ):
+        self.db = db
+        self.province = province
+        self.district = district
+        self.category = category
+        self.shipment = shipment
+
+    def get_provinces(self):
+        return self.province.query.order_by(self.province.id).all()
+
+    def get_districts(self):
+        return self.district.query.order_by(self.district.id).all()
+
+    def get_categories(self):
+        return self.category.query.order_by(self.category.id).all()
+
+    def get_shipments(self):
+        return self.shipment.query.order_by(self.shipment.id).all()
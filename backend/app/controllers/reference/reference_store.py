@@ -0,0 +1,152 @@
+import json
+import time
+import hashlib
+import threading
+
+from flask import Response, request
+
+from .reference_repository import ReferenceRepository
+
+
+class ReferenceSnapshot:
+    """
+    One immutable build of the reference tables. Lookups return shared
+    dicts, treat them as read-only.
+    """
+
+    def __init__(self, version, provinces, districts, categories, shipments):
+        self.version = version
+        self.provinces = provinces
+        self.districts = districts
+        self.categories = categories
+        self.shipments = shipments
+
+        self.provinces_by_id = {province["id"]: province for province in provinces}
+        self.districts_by_id = {district["id"]: district for district in districts}
+        self.shipments_by_vendor = {
+            shipment["vendor_name"]: shipment for shipment in shipments
+        }
+        self.shipments_by_id = {shipment["id"]: shipment for shipment in shipments}
+
+        self.districts_by_province = {}
+        for district in districts:
+            self.districts_by_province.setdefault(district["province_id"], []).append(
+                district
+            )
+
+        self.bodies = {}
+        self.add_body("provinces", provinces)
+        self.add_body("districts", districts)
+        self.add_body("categories", categories)
+        self.add_body("shipments", shipments)
+
+        for province_id, province_districts in self.districts_by_province.items():
+            self.add_body(f"districts:{province_id}", province_districts)
+        for province_id, province in self.provinces_by_id.items():
+            self.add_body(f"province:{province_id}", province)
+        for district_id, district in self.districts_by_id.items():
+            self.add_body(f"district:{district_id}", district)
+
+    def add_body(self, key, data):
+        body = json.dumps(data).encode("utf-8")
+        self.bodies[key] = (body, hashlib.sha1(body).hexdigest()[:20])
+
+
+class ReferenceStore:
+    """
+    In-process copy of provinces, districts, categories and shipment
+    vendors. These only change when the import scripts run, so they are
+    loaded once and served from memory with precomputed JSON bodies and
+    ETags. reload() swaps in a new snapshot atomically; it runs from the
+    admin refresh endpoint or, when REFERENCE_STORE_TTL is set, after the
+    snapshot gets older than the TTL.
+    """
+
+    def __init__(self, repository=None):
+        self.repository = repository
+        self.snapshot = None
+        self.loaded_at = 0
+        self.ttl = 0
+        self.version = 0
+        self.lock = threading.Lock()
+        self.refresh_lock = threading.Lock()
+
+    def init_app(self, app):
+        self.ttl = int(app.config.get("REFERENCE_STORE_TTL") or 0)
+
+        with app.app_context():
+            self.reload()
+
+    def reload(self):
+        repository = self.repository or ReferenceRepository()
+
+        provinces = [province.to_dict() for province in repository.get_provinces()]
+        province_names = {province["id"]: province["province"] for province in provinces}
+        districts = [
+            {
+                "id": district.id,
+                "province_id": district.province_id,
+                "province_name": province_names.get(district.province_id),
+                "district": district.district,
+            }
+            for district in repository.get_districts()
+        ]
+        categories = [category.to_dict() for category in repository.get_categories()]
+        shipments = [shipment.to_dict() for shipment in repository.get_shipments()]
+
+        with self.lock:
+            self.version += 1
+            self.snapshot = ReferenceSnapshot(
+                version=self.version,
+                provinces=provinces,
+                districts=districts,
+                categories=categories,
+                shipments=shipments,
+            )
+            self.loaded_at = time.monotonic()
+
+            return self.snapshot
+
+    def get(self):
+        snapshot = self.snapshot
+
+        if snapshot is None:
+            return self.reload()
+
+        if self.ttl and time.monotonic() - self.loaded_at > self.ttl:
+            # only one thread rebuilds, the others keep serving the old snapshot
+            if self.refresh_lock.acquire(blocking=False):
+                try:
+                    return self.reload()
+                finally:
+                    self.refresh_lock.release()
+
+        return snapshot
+
+    def has(self, key):
+        return key in self.get().bodies
+
+    def response(self, key):
+        snapshot = self.get()
+        body, etag = snapshot.bodies[key]
+
+        response = Response(body, status=200, mimetype="application/json")
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "no-cache"
+        response.headers["X-Reference-Version"] = str(snapshot.version)
+
+        return response.make_conditional(request)
+
+    def stats(self):
+        snapshot = self.get()
+
+        return {
+            "version": snapshot.version,
+            "provinces": len(snapshot.provinces),
+            "districts": len(snapshot.districts),
+            "categories": len(snapshot.categories),
+            "shipments": len(snapshot.shipments),
+        }
+
+
+reference_store = ReferenceStore()
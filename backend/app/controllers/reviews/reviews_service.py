@@ -1,4 +1,5 @@
 from .reviews_repository import ReviewsRepository
+from ..products.products_repository import ProductsRepository
 from app.db import db
 
 
@@ -6,6 +7,7 @@ class ReviewsService:
     def __init__(self, db=db, repository=None, product_repository=None):
         self.db = db
         self.repository = repository or ReviewsRepository()
+        self.product_repository = product_repository or ProductsRepository()
 
     def create_review(
         self, product_id, rating, seller_id, user_id, transaction_id, review
@@ -39,6 +41,7 @@ class ReviewsService:
             )
 
             self.db.session.add(new_review)
+            self.product_repository.add_rating(product_id=product_id, rating=rating)
 
             return {"message": "Review created successfully"}, 201
         except ValueError as e:
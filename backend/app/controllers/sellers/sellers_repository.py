@@ -19,5 +19,16 @@ class SellersRepository:
     def get_seller_by_id(self, seller_id):
         return self.seller.query.filter_by(id=seller_id).first()
 
+    def get_seller_identity(self, seller_id):
+        return self.db.session.query(self.seller.id).filter_by(id=seller_id).first()
+
+    def get_existing_seller_ids(self, seller_ids):
+        rows = (
+            self.db.session.query(self.seller.id)
+            .filter(self.seller.id.in_(seller_ids))
+            .all()
+        )
+        return {seller_id for (seller_id,) in rows}
+
     def seller_register(self, new_seller_data):
         return self.seller(**new_seller_data)
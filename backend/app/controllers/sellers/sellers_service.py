@@ -3,7 +3,7 @@ from flask_jwt_extended import create_access_token
 from .sellers_repository import SellersRepository
 from ..locations.locations_repository import LocationRepository
 from app.db import db
-from ..common import is_filled, get_data_and_validate
+from ..common import is_filled, get_data_and_validate, request_identity
 from ..cloudinary.cloudinary_service import CloudinaryService
 
 
@@ -91,6 +91,40 @@ class SellersServices:
         except Exception as e:
             return {"error": str(e)}, 500
 
+    def verify_seller(self, seller_id):
+        """Lean existence check for the caller, memoized for the request."""
+        return request_identity(
+            "seller", seller_id, lambda: self.load_identity(seller_id)
+        )
+
+    def load_identity(self, seller_id):
+        try:
+            seller = self.repository.get_seller_identity(seller_id)
+
+            if not seller:
+                raise ValueError("Seller not found")
+
+            return {"seller": {"id": seller.id}}, 200
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        except Exception as e:
+            return {"error": str(e)}, 500
+
+    def check_sellers_exist(self, seller_ids):
+        try:
+            seller_ids = {int(seller_id) for seller_id in seller_ids}
+            existing_ids = self.repository.get_existing_seller_ids(seller_ids)
+
+            missing_ids = seller_ids - existing_ids
+            if missing_ids:
+                raise ValueError(f"Seller not found: {sorted(missing_ids)}")
+
+            return {"message": "Sellers found"}, 200
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        except Exception as e:
+            return {"error": str(e)}, 500
+
     def seller_edit_personal(self, seller_id, data):
         request_type = data.get("request_type")
 
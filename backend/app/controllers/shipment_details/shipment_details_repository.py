@@ -14,6 +14,11 @@ class ShipmentDetailsRepository:
     def delete_shipment_detail(self, transaction_id):
         self.shipment_details.query.filter_by(transaction_id=transaction_id).delete()
 
+    def delete_shipment_details(self, transaction_ids):
+        return self.shipment_details.query.filter(
+            self.shipment_details.transaction_id.in_(transaction_ids)
+        ).delete(synchronize_session=False)
+
     def get_by_seller_and_transaction(self, seller_id, transaction_id):
         return self.shipment_details.query.filter_by(
             seller_id=seller_id, transaction_id=transaction_id
@@ -19,14 +19,25 @@ class ShipmentDetailsService:
         self.shipment_service = shipment_service or ShipmentsService()
         self.seller_service = seller_service or SellersServices()
 
-    def create_detail(self, data, user_address_id, transaction_id, user_id, seller_id):
+    def create_detail(
+        self,
+        data,
+        user_address_id,
+        transaction_id,
+        user_id,
+        seller_id,
+        shipment_id=None,
+        commit=True,
+    ):
+        """
+        With commit=False the detail is only added to the session and the
+        caller owns the transaction (checkout commits once for all sellers).
+        """
         try:
-            shipments = self.shipment_service.list_shipments()
-            shipments = {
-                shipment["vendor_name"]: shipment["id"] for shipment in shipments
-            }
-
-            shipment_id = shipments.get(data.get("vendor_name"))
+            if shipment_id is None:
+                shipment_id = self.shipment_service.get_shipment_id(
+                    data.get("vendor_name")
+                )
             seller_address_id = data.get("seller_address_id")
             service = data.get("service")
             shipment_cost = data.get("shipment_fee")
@@ -48,15 +59,19 @@ class ShipmentDetailsService:
             )
 
             self.db.session.add(new_shipment_detail)
-            self.db.session.commit()
+
+            if commit:
+                self.db.session.commit()
 
             return {"message": "Shipment detail created successfully"}, 201
 
         except ValueError as e:
-            self.db.session.rollback()
+            if commit:
+                self.db.session.rollback()
             return {"error": str(e)}, 400
         except Exception as e:
-            self.db.session.rollback()
+            if commit:
+                self.db.session.rollback()
             return {"error": str(e)}, 500
 
     def delete_detail(self, transaction_id):
@@ -1,16 +1,21 @@
 from app.db import db
 from .shipments_repository import ShipmentsRepository
+from ..reference.reference_store import reference_store
 
 
 class ShipmentsService:
 
-    def __init__(self, db=db, repository=None):
+    def __init__(self, db=db, repository=None, reference_store=reference_store):
         self.db = db
         self.repository = repository or ShipmentsRepository()
+        self.reference_store = reference_store
 
     def list_shipments(self):
         try:
-            shipments = self.repository.get_list_shipments()
-            return [shipment.to_dict() for shipment in shipments]
+            return self.reference_store.response("shipments")
         except Exception as e:
             return {"error": str(e)}, 500
+
+    def get_shipment_id(self, vendor_name):
+        shipment = self.reference_store.get().shipments_by_vendor.get(vendor_name)
+        return shipment["id"] if shipment else None
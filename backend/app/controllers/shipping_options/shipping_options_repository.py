@@ -20,3 +20,11 @@ class ShippingOptionsRepository:
 
     def get_list_options(self, seller_id):
         return self.option.query.filter_by(seller_id=seller_id).all()
+
+    def get_active_shipment_ids(self, seller_id):
+        rows = (
+            self.db.session.query(self.option.shipment_id)
+            .filter_by(seller_id=seller_id, is_active=1)
+            .all()
+        )
+        return [shipment_id for (shipment_id,) in rows]
@@ -2,14 +2,22 @@ from app.db import db
 from .shipping_options_repository import ShippingOptionsRepository
 
 from ..shipments.shipments_repository import ShipmentsRepository
+from ..reference.reference_store import reference_store
 
 
 class ShippingOptionsService:
 
-    def __init__(self, db=db, repository=None, shipment_repository=None):
+    def __init__(
+        self,
+        db=db,
+        repository=None,
+        shipment_repository=None,
+        reference_store=reference_store,
+    ):
         self.db = db
         self.repository = repository or ShippingOptionsRepository()
         self.shipment_repository = shipment_repository or ShipmentsRepository()
+        self.reference_store = reference_store
 
     def update_option(self, data, identity):
         try:
@@ -65,3 +73,25 @@ class ShippingOptionsService:
             return {"error": str(e)}, 400
         except Exception as e:
             return {"error": str(e)}, 500
+
+    def get_active_couriers(self, seller_id):
+        """
+        Vendor names of the seller's active shipping options, one query
+        for the option ids and the names from the reference store.
+        """
+        try:
+            shipment_ids = self.repository.get_active_shipment_ids(seller_id=seller_id)
+            shipments = self.reference_store.get().shipments_by_id
+
+            if any(shipment_id not in shipments for shipment_id in shipment_ids):
+                # a vendor imported after the snapshot was built
+                shipments = self.reference_store.reload().shipments_by_id
+
+            return [
+                shipments[shipment_id]["vendor_name"]
+                for shipment_id in shipment_ids
+                if shipment_id in shipments
+            ], 200
+
+        except Exception as e:
+            return {"error": str(e)}, 500
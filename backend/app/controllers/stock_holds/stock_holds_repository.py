@@ -0,0 +1,123 @@
+from sqlalchemy import update, case, func
+
+from app.db import db
+from app.models import StockHolds, Products, ProductOrders
+from app.models.stock_holds import stock_hold_status
+
+
+class StockHoldsRepository:
+    def __init__(
+        self,
+        db=db,
+        stock_hold=StockHolds,
+        product=Products,
+        product_order=ProductOrders,
+    ):
+        self.db = db
+        self.stock_hold = stock_hold
+        self.product = product
+        self.product_order = product_order
+
+    def create_hold(self, transaction_id, product_id, quantity, expires_at):
+        return self.stock_hold(
+            transaction_id=transaction_id,
+            product_id=product_id,
+            quantity=quantity,
+            expires_at=expires_at,
+        )
+
+    def reserve_stock(self, product_id, quantity, active_only=True):
+        # the WHERE clause is the stock check, so two orders can never both
+        # take the last items
+        conditions = [self.product.id == product_id, self.product.stock >= quantity]
+        if active_only:
+            conditions.append(self.product.is_active == 1)
+
+        result = self.db.session.execute(
+            update(self.product)
+            .where(*conditions)
+            .values(stock=self.product.stock - quantity)
+            .execution_options(synchronize_session=False)
+        )
+
+        return result.rowcount == 1
+
+    def adjust_products(self, stock_delta, sold_delta):
+        """
+        One UPDATE ... SET stock = stock + CASE id ... for every product
+        touched by an order. stock_delta / sold_delta map product_id -> delta.
+        """
+        product_ids = sorted(set(stock_delta) | set(sold_delta))
+        if not product_ids:
+            return
+
+        values = {}
+        if stock_delta:
+            values["stock"] = self.product.stock + case(
+                stock_delta, value=self.product.id, else_=0
+            )
+        if sold_delta:
+            values["sold_qty"] = self.product.sold_qty + case(
+                sold_delta, value=self.product.id, else_=0
+            )
+
+        self.db.session.execute(
+            update(self.product)
+            .where(self.product.id.in_(product_ids))
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+
+    def set_hold_status(self, hold_ids, status):
+        if not hold_ids:
+            return
+
+        self.db.session.execute(
+            update(self.stock_hold)
+            .where(self.stock_hold.id.in_(hold_ids))
+            .values(status=status.value)
+            .execution_options(synchronize_session=False)
+        )
+
+    def lock_holds(self, transaction_ids, statuses):
+        return (
+            self.stock_hold.query.filter(
+                self.stock_hold.transaction_id.in_(transaction_ids),
+                self.stock_hold.status.in_([status.value for status in statuses]),
+            )
+            .order_by(self.stock_hold.id)
+            .with_for_update()
+            .all()
+        )
+
+    def lock_expired_holds(self, now, limit):
+        return (
+            self.stock_hold.query.filter(
+                self.stock_hold.status == stock_hold_status.ACTIVE.value,
+                self.stock_hold.expires_at < now,
+            )
+            .order_by(self.stock_hold.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+
+    def get_held_transaction_ids(self, transaction_ids):
+        rows = (
+            self.db.session.query(self.stock_hold.transaction_id)
+            .filter(self.stock_hold.transaction_id.in_(transaction_ids))
+            .distinct()
+            .all()
+        )
+
+        return {transaction_id for (transaction_id,) in rows}
+
+    def get_ordered_quantities(self, transaction_ids):
+        return (
+            self.db.session.query(
+                self.product_order.product_id, func.sum(self.product_order.quantity)
+            )
+            .filter(self.product_order.transaction_id.in_(transaction_ids))
+            .group_by(self.product_order.product_id)
+            .all()
+        )
@@ -0,0 +1,188 @@
+import os
+from datetime import datetime, timedelta
+import pytz
+
+from app.db import db
+from app.models.stock_holds import stock_hold_status
+from .stock_holds_repository import StockHoldsRepository
+
+
+class StockHoldsService:
+    """
+    Stock is taken when an order is placed and tracked in stock_holds
+    until Midtrans settles (hold committed, sold_qty counted) or the
+    payment fails / expires (hold released, stock given back).
+    Callers own the database transaction; nothing here commits except
+    release_expired.
+    """
+
+    def __init__(self, db=db, repository=None, hold_ttl_seconds=None):
+        self.db = db
+        self.repository = repository or StockHoldsRepository()
+        self.hold_ttl_seconds = hold_ttl_seconds or int(
+            os.getenv("STOCK_HOLD_TTL_SECONDS", 88200)
+        )
+
+    def reserve(self, transaction_lines):
+        """
+        transaction_lines: {transaction_id: [(product_id, quantity), ...]}
+        Raises ValueError when a product does not have enough stock, the
+        caller must roll back.
+        """
+        totals = {}
+        for lines in transaction_lines.values():
+            for product_id, quantity in lines:
+                totals[product_id] = totals.get(product_id, 0) + quantity
+
+        # same lock order for every order, so concurrent checkouts cannot deadlock
+        for product_id in sorted(totals):
+            if not self.repository.reserve_stock(product_id, totals[product_id]):
+                raise ValueError(f"Insufficient stock for product with id: {product_id}")
+
+        expires_at = datetime.now(pytz.UTC) + timedelta(seconds=self.hold_ttl_seconds)
+        holds = [
+            self.repository.create_hold(
+                transaction_id=transaction_id,
+                product_id=product_id,
+                quantity=quantity,
+                expires_at=expires_at,
+            )
+            for transaction_id, lines in transaction_lines.items()
+            for product_id, quantity in lines
+        ]
+        self.db.session.add_all(holds)
+
+        return holds
+
+    def commit(self, transaction_ids):
+        """
+        Returns the ids of transactions whose stock was given back before
+        the payment arrived and is no longer available; their holds stay
+        released and the caller routes them to a refund.
+        """
+        sold_delta = {}
+        committed_hold_ids = []
+        released_lines = {}
+
+        holds = self.repository.lock_holds(
+            transaction_ids, [stock_hold_status.ACTIVE, stock_hold_status.RELEASED]
+        )
+        for hold in holds:
+            if hold.status == stock_hold_status.RELEASED.value:
+                # released by the sweeper before the late payment arrived
+                released_lines.setdefault(hold.transaction_id, []).append(hold)
+                continue
+
+            committed_hold_ids.append(hold.id)
+            add(sold_delta, hold.product_id, hold.quantity)
+
+        short_transaction_ids = []
+
+        for transaction_id, released in sorted(released_lines.items()):
+            lines = [(hold.product_id, hold.quantity) for hold in released]
+
+            if not self.retake(lines):
+                short_transaction_ids.append(transaction_id)
+                continue
+
+            committed_hold_ids.extend(hold.id for hold in released)
+            for product_id, quantity in lines:
+                add(sold_delta, product_id, quantity)
+
+        self.repository.set_hold_status(committed_hold_ids, stock_hold_status.COMMITTED)
+
+        # orders placed before stock holds existed never took their stock
+        held_transaction_ids = self.repository.get_held_transaction_ids(transaction_ids)
+        for transaction_id in transaction_ids:
+            if transaction_id in held_transaction_ids:
+                continue
+
+            lines = [
+                (product_id, int(quantity))
+                for product_id, quantity in self.repository.get_ordered_quantities(
+                    [transaction_id]
+                )
+            ]
+            if not self.retake(lines):
+                short_transaction_ids.append(transaction_id)
+                continue
+
+            for product_id, quantity in lines:
+                add(sold_delta, product_id, quantity)
+
+        self.repository.adjust_products({}, sold_delta)
+
+        return short_transaction_ids
+
+    def retake(self, lines):
+        """
+        Take stock for [(product_id, quantity), ...] with the same guarded
+        update as reserve(), all lines or none.
+        """
+        savepoint = self.db.session.begin_nested()
+
+        for product_id, quantity in sorted(lines):
+            # deactivated since the order was placed, the item is paid for
+            if not self.repository.reserve_stock(
+                product_id, quantity, active_only=False
+            ):
+                savepoint.rollback()
+                return False
+
+        savepoint.commit()
+        return True
+
+    def restock_cancelled(self, transaction_ids):
+        """Cancellation of paid transactions: items go back to stock and are no longer sold."""
+        stock_delta = {}
+        sold_delta = {}
+
+        for product_id, quantity in self.repository.get_ordered_quantities(
+            transaction_ids
+        ):
+            add(stock_delta, product_id, int(quantity))
+            add(sold_delta, product_id, -int(quantity))
+
+        self.repository.adjust_products(stock_delta, sold_delta)
+
+    def release(self, transaction_ids):
+        holds = self.repository.lock_holds(transaction_ids, [stock_hold_status.ACTIVE])
+        self.release_holds(holds)
+
+        return len(holds)
+
+    def release_expired(self, batch_size=500):
+        released = 0
+
+        while True:
+            try:
+                holds = self.repository.lock_expired_holds(
+                    now=datetime.now(pytz.UTC), limit=batch_size
+                )
+
+                if not holds:
+                    break
+
+                self.release_holds(holds)
+                self.db.session.commit()
+                released += len(holds)
+            except Exception:
+                self.db.session.rollback()
+                raise
+
+        return released
+
+    def release_holds(self, holds):
+        stock_delta = {}
+
+        for hold in holds:
+            add(stock_delta, hold.product_id, hold.quantity)
+
+        self.repository.set_hold_status(
+            [hold.id for hold in holds], stock_hold_status.RELEASED
+        )
+        self.repository.adjust_products(stock_delta, {})
+
+
+def add(totals, key, value):
+    totals[key] = totals.get(key, 0) + value
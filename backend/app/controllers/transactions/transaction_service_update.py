@@ -34,7 +34,7 @@ class TransactionServiceUpdate:
         if role != "seller":
             raise ValueError("Unauthorized")
 
-        seller, status_code = self.seller_service.seller_info(seller_id=role_id)
+        seller, status_code = self.seller_service.verify_seller(seller_id=role_id)
 
         if status_code != 200:
             raise ValueError(seller["error"])
@@ -7,11 +7,13 @@ from .transactions_service import TransactionsService
 from .transactions_midtrans import MidtransConfirmation
 from .transactions_service_read_delete import TransactionsDeleteRead
 from .transactions_service_update import TransactionServiceUpdate
+from ..idempotency.idempotency_service import IdempotencyService
 
 service = TransactionsService()
 read_delete_service = TransactionsDeleteRead()
 midtrans_confirmation = MidtransConfirmation()
 update_service = TransactionServiceUpdate()
+idempotency_service = IdempotencyService()
 
 
 @transactions_blueprint.route("/create", methods=["POST"])
@@ -20,7 +22,18 @@ update_service = TransactionServiceUpdate()
 def transaction_create():
     data = request.get_json()
     identity = get_jwt_identity()
-    return service.create_transaction(data, identity)
+    idempotency_key = request.headers.get("Idempotency-Key")
+
+    if not idempotency_key:
+        return service.create_transaction(data, identity)
+
+    return idempotency_service.run(
+        owner=f"{identity.get('role')}:{identity.get('id')}",
+        endpoint="transactions.create",
+        idempotency_key=idempotency_key,
+        data=data,
+        handler=lambda: service.create_transaction(data, identity),
+    )
 
 
 @transactions_blueprint.route("/", methods=["GET"])
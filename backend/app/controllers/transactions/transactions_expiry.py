@@ -0,0 +1,162 @@
+import os
+import time
+import threading
+from datetime import datetime, timedelta
+import pytz
+
+from flask import current_app
+
+from app.db import db
+from .transactions_repository import TransactionsRepository
+from ..shipment_details.shipment_details_repository import ShipmentDetailsRepository
+from ..user_seller_vouchers.user_seller_vouchers_repository import (
+    UserSellerVouchersRepository,
+)
+from ..stock_holds.stock_holds_service import StockHoldsService
+
+
+class TransactionsExpiryService:
+    """
+    Cancels transactions still waiting for payment after the payment
+    deadline, for when the Midtrans expire notification never arrives.
+    Each batch locks its rows with SKIP LOCKED and commits on its own, so
+    several nodes can sweep at the same time without touching the same
+    transaction.
+    """
+
+    def __init__(
+        self,
+        db=db,
+        repository=None,
+        shipment_details_repository=None,
+        voucher_repository=None,
+        stock_hold_service=None,
+        payment_timeout_seconds=None,
+    ):
+        self.db = db
+        self.repository = repository or TransactionsRepository()
+        self.shipment_details_repository = (
+            shipment_details_repository or ShipmentDetailsRepository()
+        )
+        self.voucher_repository = voucher_repository or UserSellerVouchersRepository()
+        self.stock_hold_service = stock_hold_service or StockHoldsService()
+        # above the 24h Midtrans payment window plus a grace period, so a
+        # payment made in the last minutes still finds its transaction open
+        self.payment_timeout_seconds = payment_timeout_seconds or int(
+            os.getenv("TRANSACTION_PAYMENT_TIMEOUT_SECONDS", 90000)
+        )
+
+    def expire_unpaid(self, batch_size=500, max_batches=None):
+        started = time.perf_counter()
+        created_before = datetime.now(pytz.UTC) - timedelta(
+            seconds=self.payment_timeout_seconds
+        )
+        metrics = {
+            "batches": 0,
+            "transactions": 0,
+            "vouchers": 0,
+            "shipment_details": 0,
+            "stock_holds": 0,
+        }
+
+        while max_batches is None or metrics["batches"] < max_batches:
+            try:
+                rows = self.repository.lock_unpaid_transactions(
+                    created_before=created_before, limit=batch_size
+                )
+
+                if not rows:
+                    self.db.session.rollback()
+                    break
+
+                cancelled = self.cancel_unpaid(
+                    transaction_ids=[row.id for row in rows],
+                    voucher_ids=[
+                        row.user_seller_voucher_id
+                        for row in rows
+                        if row.user_seller_voucher_id
+                    ],
+                    information="Payment expired",
+                )
+                for key, count in cancelled.items():
+                    metrics[key] += count
+
+                self.db.session.commit()
+                metrics["batches"] += 1
+            except Exception:
+                self.db.session.rollback()
+                raise
+
+        metrics["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+        if metrics["transactions"]:
+            current_app.logger.info("transaction_sweep %s", metrics)
+
+        return metrics
+
+
+    def cancel_unpaid(self, transaction_ids, voucher_ids, information):
+        """
+        Cancel transactions still waiting for payment and give back what
+        they hold. The caller commits.
+        """
+        counts = {
+            "transactions": self.repository.cancel_unpaid_transactions(
+                transaction_ids, information=information
+            ),
+            "vouchers": 0,
+            "shipment_details": self.shipment_details_repository.delete_shipment_details(
+                transaction_ids
+            ),
+            "stock_holds": self.stock_hold_service.release(transaction_ids),
+        }
+        if voucher_ids:
+            counts["vouchers"] = self.voucher_repository.release_vouchers(voucher_ids)
+
+        return counts
+
+
+class UnpaidTransactionSweeper:
+    """
+    Runs TransactionsExpiryService.expire_unpaid every
+    TRANSACTION_SWEEP_INTERVAL_SECONDS on a daemon thread. Disabled when
+    the interval is 0, e.g. when the CLI command is scheduled by cron.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.interval = 0
+        self.batch_size = 500
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def init_app(self, app):
+        self.app = app
+        self.interval = float(app.config.get("TRANSACTION_SWEEP_INTERVAL_SECONDS") or 0)
+        self.batch_size = int(app.config.get("TRANSACTION_SWEEP_BATCH_SIZE") or 500)
+
+        if self.interval <= 0:
+            return
+
+        self.thread = threading.Thread(
+            target=self.work, name="transaction-sweeper", daemon=True
+        )
+        self.thread.start()
+
+    def work(self):
+        while not self.stop_event.wait(self.interval):
+            with self.app.app_context():
+                try:
+                    TransactionsExpiryService().expire_unpaid(
+                        batch_size=self.batch_size
+                    )
+                except Exception:
+                    self.app.logger.exception("Unpaid transaction sweep failed")
+                finally:
+                    db.session.remove()
+
+    def stop(self):
+        self.stop_event.set()
+
+
+unpaid_transaction_sweeper = UnpaidTransactionSweeper()
@@ -7,6 +7,11 @@ from ..product_orders.product_orders_service import ProductOrdersService
 from ..products.products_services import ProductsServices
 from .transactions_voucher import TransactionsVoucherService
 from ..shipment_details.shipment_details_service import ShipmentDetailsService
+from ..stock_holds.stock_holds_service import StockHoldsService
+from ..webhook_inbox.webhook_inbox_repository import WebhookInboxRepository
+from ..webhook_inbox.webhook_inbox_runner import webhook_inbox_runner
+
+from sqlalchemy.exc import IntegrityError
 
 
 class MidtransConfirmation:
@@ -20,6 +25,9 @@ class MidtransConfirmation:
         product_service=None,
         transaction_voucher_service=None,
         shipment_detail_service=None,
+        stock_hold_service=None,
+        webhook_inbox_repository=None,
+        webhook_inbox_runner=webhook_inbox_runner,
     ):
         self.db = db
         self.repository = repository or TransactionsRepository()
@@ -35,15 +43,58 @@ class MidtransConfirmation:
         self.shipment_detail_service = (
             shipment_detail_service or ShipmentDetailsService()
         )
+        self.stock_hold_service = stock_hold_service or StockHoldsService()
+        self.webhook_inbox_repository = (
+            webhook_inbox_repository or WebhookInboxRepository()
+        )
+        self.webhook_inbox_runner = webhook_inbox_runner
 
     def midtrans_confirmation(self, data):
+        """
+        Verify the notification and append it to the webhook inbox. The
+        inbox worker runs process_notification; a notification Midtrans
+        retries with the same (order_id, transaction_status, status_code)
+        is acknowledged without being stored again.
+        """
         try:
-            # raise valueerror
+            if not data:
+                raise ValueError("Invalid notification")
+
+            for key in [
+                "order_id",
+                "transaction_status",
+                "status_code",
+                "gross_amount",
+                "signature_key",
+            ]:
+                if not data.get(key):
+                    raise ValueError(f"Missing {key}")
+
             message, status_code = self.midtrans_service.webhook(data)
 
             if status_code != 200:
-                raise ValueError(message["error"])
+                return message, status_code
+
+            try:
+                self.db.session.add(self.webhook_inbox_repository.create_entry(data))
+                self.db.session.commit()
+            except IntegrityError:
+                self.db.session.rollback()
+                return {"success": True, "duplicate": True}, 200
+
+            self.webhook_inbox_runner.submit(data["order_id"])
+
+            return {"success": True}, 200
+
+        except ValueError as e:
+            self.db.session.rollback()
+            return {"error": str(e)}, 400
+        except Exception as e:
+            self.db.session.rollback()
+            return {"error": str(e)}, 500
 
+    def process_notification(self, data):
+        try:
             new_payment_details = self.payment_details_service.input_details(data)[0][
                 "details"
             ]
@@ -58,6 +109,13 @@ class MidtransConfirmation:
             if data["transaction_status"] in ["expire", "deny", "cancel"]:
 
                 for transaction in transactions:
+                    # already cancelled by the unpaid transaction sweeper
+                    if (
+                        transaction.transaction_status
+                        == transaction_status.CANCELED.value
+                    ):
+                        continue
+
                     transaction.transaction_status = transaction_status.CANCELED.value
 
                     transaction.payment_details_id = payment_details_id
@@ -83,28 +141,56 @@ class MidtransConfirmation:
                             f"{delete_shipment_detail['error']} while deleting shipment detail"
                         )
 
+                # give the reserved stock back
+                self.stock_hold_service.release(
+                    [transaction.id for transaction in transactions]
+                )
+
             elif data["transaction_status"] == "settlement":
+                settled_transaction_ids = []
+
                 for transaction in transactions:
 
                     # if already success, to prevent multiple success and multiple of reducing stock
                     if transaction.transaction_status in [
                         transaction_status.PAYMENT_SUCCESS.value,
+                        transaction_status.REFUND_REQUIRED.value,
                     ]:
                         continue
 
+                    # cancelled by the sweeper or an expire notification
+                    # before this payment landed: its shipment detail and
+                    # voucher are already gone, so refund instead of
+                    # fulfilling it
+                    if (
+                        transaction.transaction_status
+                        == transaction_status.CANCELED.value
+                    ):
+                        transaction.payment_details_id = payment_details_id
+                        transaction.require_refund("Paid after cancellation")
+                        continue
+
                     transaction.transaction_status = (
                         transaction_status.PAYMENT_SUCCESS.value
                     )
 
                     transaction.payment_details_id = payment_details_id
                     transaction.payment_link = None
+                    settled_transaction_ids.append(transaction.id)
 
+                if settled_transaction_ids:
                     message, status_code = self.reduce_quantity(
-                        transaction_id=transaction.id, commit=False
+                        transaction_ids=settled_transaction_ids, commit=False
                     )
 
                     if status_code != 200:
                         raise ValueError(message["error"])
+
+                    # stock given back before the payment arrived is gone
+                    short_transaction_ids = message["refund_transaction_ids"]
+                    for transaction in transactions:
+                        if transaction.id in short_transaction_ids:
+                            transaction.require_refund("Out of stock after payment")
             else:
                 for transaction in transactions:
                     transaction.payment_details_id = payment_details_id
@@ -114,35 +200,24 @@ class MidtransConfirmation:
             return {"success": True}, 200
 
         except ValueError as e:
+            self.db.session.rollback()
             return {"error": str(e)}, 400
         except Exception as e:
+            self.db.session.rollback()
             return {"error": str(e)}, 500
 
-    def reduce_quantity(self, transaction_id, commit=True):
+    def reduce_quantity(self, transaction_ids, commit=True):
+        # stock was already taken when the order was placed, settling only
+        # commits the holds and counts the items as sold
         try:
-            product_orders, status_code = (
-                self.product_order_service.get_product_orders_by_transaction_id(
-                    transaction_id=transaction_id
-                )
-            )
+            short_transaction_ids = self.stock_hold_service.commit(transaction_ids)
 
-            if status_code != 200:
-                raise ValueError(product_orders["error"])
-
-            for product in product_orders:
-                message, status_code = (
-                    self.product_service.transaction_success_modification(
-                        product_id=product["product_id"],
-                        quantity=product["quantity"],
-                        commit=False,
-                    )
-                )
-
-            if status_code != 200:
-                raise ValueError(message)
             if commit:
                 self.db.session.commit()
-            return {"success": True}, 200
+            return {
+                "success": True,
+                "refund_transaction_ids": short_transaction_ids,
+            }, 200
 
         except ValueError as e:
             if commit:
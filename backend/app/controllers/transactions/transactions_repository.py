@@ -1,5 +1,10 @@
+from sqlalchemy import update
+from sqlalchemy.orm import joinedload, selectinload, load_only
+
 from app.db import db
-from app.models import Transactions
+from app.models import Transactions, ProductOrders, Products, Sellers
+from app.models.transactions import transaction_status
+from ..common import keyset_paginate
 
 
 class TransactionsRepository:
@@ -11,9 +16,18 @@ class TransactionsRepository:
         return self.transaction(**data)
 
     def get_transaction_by_user_id(
-        self, role, role_id, date=None, page=1, per_page=10, tx=None, status=None
+        self,
+        role,
+        role_id,
+        date=None,
+        page=1,
+        per_page=10,
+        tx=None,
+        status=None,
+        cursor=None,
     ):
-        query = self.transaction.query
+        query = self.transaction.query.options(*self.history_load_options())
+        sort_column, descending = self.transaction.id, False
 
         if role == "user":
             query = query.filter_by(user_id=role_id)
@@ -26,13 +40,42 @@ class TransactionsRepository:
             query = query.filter_by(id=tx)
         if date == "newest":
             query = query.order_by(self.transaction.created_at.desc())
+            sort_column, descending = self.transaction.created_at, True
         if date == "oldest":
             query = query.order_by(self.transaction.created_at.asc())
+            sort_column, descending = self.transaction.created_at, False
         if status:
             query = query.filter_by(transaction_status=status)
 
+        if cursor is not None:
+            return keyset_paginate(
+                query,
+                sort_column=sort_column,
+                id_column=self.transaction.id,
+                cursor=cursor,
+                per_page=per_page,
+                descending=descending,
+            )
+
         return query.paginate(page=page, per_page=per_page)
 
+    def history_load_options(self):
+        """
+        Everything Transactions.to_dict reads, in a fixed number of queries
+        per page: sellers are joined, product orders, products and images
+        are each fetched with one IN query. The backref attributes exist
+        because create_app configures the mappers at startup.
+        """
+        return (
+            joinedload(self.transaction.seller_transactions).load_only(
+                Sellers.store_name, Sellers.store_image_url
+            ),
+            selectinload(self.transaction.product_orders)
+            .joinedload(ProductOrders.product_orders)
+            .load_only(Products.name, Products.price, Products.is_active)
+            .selectinload(Products.product_images),
+        )
+
     def get_transaction_by_parent_id(self, parent_id):
         return self.transaction.query.filter_by(parent_id=parent_id).all()
 
@@ -45,3 +88,55 @@ class TransactionsRepository:
             query = query.filter_by(seller_id=role_id)
 
         return query.first()
+
+    def lock_unpaid_transactions(self, created_before, limit):
+        """
+        (id, user_id, user_seller_voucher_id) of unpaid transactions older
+        than created_before. Rows locked by another sweeper are skipped.
+        """
+        return (
+            self.db.session.query(
+                self.transaction.id,
+                self.transaction.user_id,
+                self.transaction.user_seller_voucher_id,
+            )
+            .filter(
+                self.transaction.transaction_status
+                == transaction_status.WAITING_FOR_PAYMENT.value,
+                self.transaction.created_at < created_before,
+            )
+            .order_by(self.transaction.created_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+
+    def set_payment_link(self, transaction_ids, payment_link):
+        self.db.session.execute(
+            update(self.transaction)
+            .where(
+                self.transaction.id.in_(transaction_ids),
+                self.transaction.transaction_status
+                == transaction_status.WAITING_FOR_PAYMENT.value,
+            )
+            .values(payment_link=payment_link)
+            .execution_options(synchronize_session=False)
+        )
+
+    def cancel_unpaid_transactions(self, transaction_ids, information):
+        result = self.db.session.execute(
+            update(self.transaction)
+            .where(
+                self.transaction.id.in_(transaction_ids),
+                self.transaction.transaction_status
+                == transaction_status.WAITING_FOR_PAYMENT.value,
+            )
+            .values(
+                transaction_status=transaction_status.CANCELED.value,
+                payment_link=None,
+                information=information,
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+        return result.rowcount
@@ -1,3 +1,5 @@
+from flask import current_app
+
 from app.db import db
 from .transactions_repository import TransactionsRepository
 from ..users.users_services import UserServices
@@ -8,9 +10,10 @@ from .transactions_midtrans import MidtransConfirmation
 from ..midtrans.midtrans_service import MidtransService
 from .transactions_voucher import TransactionsVoucherService
 from ..shipment_details.shipment_details_service import ShipmentDetailsService
-
-from datetime import datetime
-import uuid
+from ..stock_holds.stock_holds_service import StockHoldsService
+from .transactions_expiry import TransactionsExpiryService
+from ..shipments.shipments_service import ShipmentsService
+from ..common import generate_snowflake_id
 
 
 class TransactionsService:
@@ -26,6 +29,9 @@ class TransactionsService:
         midtrans_service=None,
         transaction_voucher_service=None,
         shipment_details_service=None,
+        stock_hold_service=None,
+        shipment_service=None,
+        expiry_service=None,
     ):
         self.db = db
         self.repository = repository or TransactionsRepository()
@@ -41,8 +47,18 @@ class TransactionsService:
         self.shipment_details_service = (
             shipment_details_service or ShipmentDetailsService()
         )
+        self.stock_hold_service = stock_hold_service or StockHoldsService()
+        self.shipment_service = shipment_service or ShipmentsService()
+        self.expiry_service = expiry_service or TransactionsExpiryService()
 
     def create_transaction(self, data, identity):
+        """
+        Validate everything first, then build every row of the order,
+        reserve its stock and commit, so each product row is only locked
+        for the reservation itself. The Snap token is requested after
+        that, outside any database transaction; when Midtrans fails the
+        order is cancelled again and its stock and vouchers given back.
+        """
         try:
             self.check_data(data)
             user_id = self.check_user(identity)
@@ -55,17 +71,14 @@ class TransactionsService:
 
             calculator_data = calculator_data.get("final_calculation")
 
-            parent_id = self.generate_parent_transaction_id()
+            self.check_sellers(calculator_data.keys())
+            shipment_ids = self.resolve_shipment_ids(calculator_data)
 
-            response = self.midtrans_service.create_transaction(
-                calculator_data, parent_id
-            )
+            parent_id = self.generate_parent_transaction_id()
+            transaction_lines = {}
+            voucher_ids = []
 
             for seller_id, details in calculator_data.items():
-                # check seller_id
-                self.check_seller(seller_id)
-
-                # generate transaction id & parent_id
                 transaction_id = self.generate_transaction_id()
 
                 # create transaction
@@ -81,7 +94,6 @@ class TransactionsService:
                 transaction_details["seller_id"] = seller_id
                 transaction_details["id"] = transaction_id
                 transaction_details["parent_id"] = parent_id
-                transaction_details["payment_link"] = response["redirect_url"]
                 transaction_details["gross_amount"] = details.get("final_price")
 
                 new_transaction = self.repository.create_transaction(
@@ -89,6 +101,8 @@ class TransactionsService:
                 )
 
                 self.db.session.add(new_transaction)
+                if transaction_details["user_seller_voucher_id"]:
+                    voucher_ids.append(transaction_details["user_seller_voucher_id"])
 
                 # create shipment_details
                 shipment_details, status_code = (
@@ -98,6 +112,8 @@ class TransactionsService:
                         transaction_id=transaction_id,
                         seller_id=seller_id,
                         user_id=user_id,
+                        shipment_id=shipment_ids[details.get("vendor_name")],
+                        commit=False,
                     )
                 )
 
@@ -114,6 +130,14 @@ class TransactionsService:
                 if status_code not in [200, 201]:
                     raise ValueError(product_order["error"])
 
+                transaction_lines[transaction_id] = [
+                    (item["detail_product"]["id"], item["quantity"])
+                    for item in details["items"]
+                ]
+
+            # raises before Midtrans is called when the stock is gone
+            self.stock_hold_service.reserve(transaction_lines)
+
             if data.get("selected_user_voucher_ids", None):
                 self.transaction_voucher_service.used_user_seller_voucher(
                     identity=identity, data=data
@@ -121,6 +145,19 @@ class TransactionsService:
 
             self.db.session.commit()
 
+            try:
+                response = self.midtrans_service.create_transaction(
+                    calculator_data, parent_id
+                )
+            except Exception:
+                self.cancel_without_payment_link(list(transaction_lines), voucher_ids)
+                raise
+
+            self.repository.set_payment_link(
+                list(transaction_lines), response["redirect_url"]
+            )
+            self.db.session.commit()
+
             return {
                 "message": "Transaction created successfully",
                 "payment_data": response,
@@ -133,6 +170,22 @@ class TransactionsService:
             self.db.session.rollback()
             return {"error": str(e)}, 500
 
+    def cancel_without_payment_link(self, transaction_ids, voucher_ids):
+        try:
+            self.expiry_service.cancel_unpaid(
+                transaction_ids=transaction_ids,
+                voucher_ids=voucher_ids,
+                information="Payment link failed",
+            )
+            self.db.session.commit()
+        except Exception:
+            # the unpaid sweeper cancels it once the payment window is over
+            self.db.session.rollback()
+            current_app.logger.exception(
+                "Could not cancel transactions %s after Midtrans failed",
+                transaction_ids,
+            )
+
     def check_user(self, identity):
         role = identity.get("role")
         role_id = identity.get("id")
@@ -140,17 +193,35 @@ class TransactionsService:
         if role != "user":
             raise ValueError("Unauthorized")
 
-        user = self.user_service.user_info(user_id=role_id)
-        if not user:
-            raise ValueError("User not found")
+        user, status_code = self.user_service.verify_user(user_id=role_id)
+        if status_code != 200:
+            raise ValueError(user["error"])
+
+        return user["user"]["id"]
+
+    def check_sellers(self, seller_ids):
+        sellers, status_code = self.seller_service.check_sellers_exist(
+            seller_ids=seller_ids
+        )
+
+        if status_code != 200:
+            raise ValueError(sellers["error"])
 
-        return user[0]["user"]["id"]
+    def resolve_shipment_ids(self, calculator_data):
+        shipment_ids = {}
 
-    def check_seller(self, seller_id):
-        seller = self.seller_service.seller_info(seller_id=seller_id)
+        for details in calculator_data.values():
+            vendor_name = details.get("vendor_name")
 
-        if not seller:
-            raise ValueError("Seller not found")
+            if vendor_name not in shipment_ids:
+                shipment_id = self.shipment_service.get_shipment_id(vendor_name)
+
+                if shipment_id is None:
+                    raise ValueError(f"Shipment vendor {vendor_name} not found")
+
+                shipment_ids[vendor_name] = shipment_id
+
+        return shipment_ids
 
     def check_data(self, data):
         carts = data.get("carts")
@@ -167,19 +238,7 @@ class TransactionsService:
             raise ValueError("Selected courier not found")
 
     def generate_transaction_id(self):
-        prefix = "TRX"
-        date_str = datetime.now().strftime("%Y%m%d")
-
-        snowflake_id = str(uuid.uuid4()).replace("-", "").upper()
-        snowflake_id = snowflake_id[:8]
-
-        return f"{prefix}{date_str}{snowflake_id}"
+        return generate_snowflake_id("TRX")
 
     def generate_parent_transaction_id(self):
-        prefix = "PRT"
-        date_str = datetime.now().strftime("%Y%m%d")
-
-        snowflake_id = str(uuid.uuid4()).replace("-", "").upper()
-        snowflake_id = snowflake_id[:8]
-
-        return f"{prefix}{date_str}{snowflake_id}"
+        return generate_snowflake_id("PRT")
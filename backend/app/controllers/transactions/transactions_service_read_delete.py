@@ -6,6 +6,7 @@ from ..users.users_services import UserServices
 from ..products.products_services import ProductsServices
 from ..product_orders.product_orders_service import ProductOrdersService
 from ..shipment_details.shipment_details_service import ShipmentDetailsService
+from ..stock_holds.stock_holds_service import StockHoldsService
 
 
 class TransactionsDeleteRead:
@@ -19,6 +20,7 @@ class TransactionsDeleteRead:
         product_serivce=None,
         product_order_service=None,
         shipment_detail_service=None,
+        stock_hold_service=None,
     ):
         self.db = db
         self.repository = repository or TransactionsRepository()
@@ -30,6 +32,7 @@ class TransactionsDeleteRead:
         self.shipment_detail_service = (
             shipment_detail_service or ShipmentDetailsService()
         )
+        self.stock_hold_service = stock_hold_service or StockHoldsService()
 
     def list_transactions(self, identity, req):
         try:
@@ -38,6 +41,7 @@ class TransactionsDeleteRead:
             page = req.args.get("page", 1, int)
             per_page = req.args.get("per_page", 10, int)
             status = req.args.get("status", None, int)
+            cursor = req.args.get("cursor", None)
             role = identity.get("role")
             role_id = identity.get("id")
 
@@ -51,11 +55,15 @@ class TransactionsDeleteRead:
                 page=page,
                 per_page=per_page,
                 status=status,
+                cursor=cursor,
             )
 
             if not transactions:
                 raise ValueError("No transactions found")
 
+            if cursor is not None:
+                return self.cursor_response(transactions), 200
+
             return self.response(transactions), 200
 
         except ValueError as e:
@@ -105,9 +113,9 @@ class TransactionsDeleteRead:
         role_id = identity.get("id")
 
         if role == "seller":
-            detail, status_code = self.seller_service.seller_info(seller_id=role_id)
+            detail, status_code = self.seller_service.verify_seller(seller_id=role_id)
         if role == "user":
-            detail, status_code = self.user_service.user_info(user_id=role_id)
+            detail, status_code = self.user_service.verify_user(user_id=role_id)
 
         if status_code != 200:
             raise ValueError(detail["error"])
@@ -120,10 +128,17 @@ class TransactionsDeleteRead:
             "total_items": transactions.total,
         }
 
+    def cursor_response(self, transactions):
+        return {
+            "transactions": [transaction.to_dict() for transaction in transactions],
+            "next_cursor": transactions.next_cursor,
+        }
+
     def canceled_by_user(self, transaction, role="user"):
         status = transaction.transaction_status
         if status == 1:
             transaction.canceled_transaction(role=role)
+            self.stock_hold_service.release([transaction.id])
 
         if status == 2:
             transaction.canceled_transaction(role=role)
@@ -179,24 +194,4 @@ class TransactionsDeleteRead:
             )
 
     def product_cancelled_modification(self, transaction_id):
-        product_orders, status_code = (
-            self.product_order_service.get_product_orders_by_transaction_id(
-                transaction_id=transaction_id
-            )
-        )
-
-        if status_code != 200:
-            raise ValueError(product_orders["error"])
-
-        for product in product_orders:
-            product_id = product["product_id"]
-            quantity = product["quantity"]
-
-            message, status_code = (
-                self.product_service.transaction_canceled_modification(
-                    product_id=product_id, quantity=quantity, commit=False
-                )
-            )
-
-            if status_code != 200:
-                raise ValueError(message["error"])
+        self.stock_hold_service.restock_cancelled([transaction_id])
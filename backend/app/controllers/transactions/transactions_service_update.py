@@ -183,7 +183,7 @@ class TransactionServiceUpdate:
         if role != "seller":
             raise ValueError("Unauthorized")
 
-        seller, status_code = self.seller_service.seller_info(seller_id=role_id)
+        seller, status_code = self.seller_service.verify_seller(seller_id=role_id)
 
         if status_code != 200:
             raise ValueError(seller["error"])
@@ -195,7 +195,7 @@ class TransactionServiceUpdate:
         if role != "user":
             raise ValueError("Unauthorized")
 
-        user, status_code = self.user_service.user_info(user_id=role_id)
+        user, status_code = self.user_service.verify_user(user_id=role_id)
 
         if status_code != 200:
             raise ValueError(user["error"])
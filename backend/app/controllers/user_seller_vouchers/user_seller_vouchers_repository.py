@@ -1,8 +1,11 @@
 from datetime import datetime, timezone
 
+from sqlalchemy import update
+
 from app.db import db
 from app.models import UserSellerVouchers
 from app.models import SellerVouchers
+from app.models.user_seller_vouchers import Is_Used_Status
 
 
 class UserSellerVouchersRepository:
@@ -47,6 +50,19 @@ class UserSellerVouchersRepository:
             .first()
         )
 
+    def release_vouchers(self, user_seller_voucher_ids):
+        result = self.db.session.execute(
+            update(self.voucher)
+            .where(
+                self.voucher.id.in_(user_seller_voucher_ids),
+                self.voucher.is_used == Is_Used_Status.USED.value,
+            )
+            .values(is_used=Is_Used_Status.UNUSED.value)
+            .execution_options(synchronize_session=False)
+        )
+
+        return result.rowcount
+
     def join_query(self):
         today = datetime.now(timezone.utc)
 
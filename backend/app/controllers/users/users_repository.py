@@ -19,6 +19,10 @@ class UserRepository:
     def get_user_by_id(self, id):
         return self.user.query.filter_by(id=id).first()
 
+    def get_user_identity(self, id):
+        # plain column query, Users.addresses is joined on every entity load
+        return self.db.session.query(self.user.id).filter_by(id=id).first()
+
     def user_register(self, data):
         new_user = self.user(**data)
 
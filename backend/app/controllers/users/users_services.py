@@ -2,7 +2,7 @@ from flask_jwt_extended import create_access_token
 
 from .users_repository import UserRepository
 from app.db import db
-from ..common import is_filled, get_data_and_validate
+from ..common import is_filled, get_data_and_validate, request_identity
 from ..cloudinary.cloudinary_service import CloudinaryService
 
 
@@ -90,6 +90,23 @@ class UserServices:
         except Exception as e:
             return {"error": str(e)}, 500
 
+    def verify_user(self, user_id):
+        """Lean existence check for the caller, memoized for the request."""
+        return request_identity("user", user_id, lambda: self.load_identity(user_id))
+
+    def load_identity(self, user_id):
+        try:
+            user = self.repository.get_user_identity(user_id)
+
+            if not user:
+                raise ValueError("User not found")
+
+            return {"user": {"id": user.id}}, 200
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        except Exception as e:
+            return {"error": str(e)}, 500
+
     def user_edit(self, user_id, data):
         request_type = data.get("request_type")
 
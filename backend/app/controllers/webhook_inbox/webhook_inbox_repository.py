@@ -0,0 +1,128 @@
+import json
+from datetime import datetime, timedelta
+import pytz
+
+from sqlalchemy import update, func, and_, or_
+
+from app.db import db
+from app.models import WebhookInbox
+from app.models.webhook_inbox import webhook_inbox_status
+
+
+class WebhookInboxRepository:
+    def __init__(self, db=db, inbox=WebhookInbox):
+        self.db = db
+        self.inbox = inbox
+
+    def create_entry(self, data):
+        return self.inbox(
+            order_id=data["order_id"],
+            transaction_status=data["transaction_status"],
+            status_code=data["status_code"],
+            payload=json.dumps(data),
+        )
+
+    def claim_next_entry(self, order_id, owner, lease_seconds):
+        """
+        Locks the unfinished entries of the order and leases the oldest
+        one to owner, unless another worker holds a live lease on any
+        entry of the order. Returns the claimed entry id or None; the
+        caller commits.
+        """
+        now = datetime.now(pytz.UTC)
+        live_lease = and_(
+            self.inbox.status == webhook_inbox_status.PROCESSING.value,
+            self.inbox.locked_until >= now,
+        )
+        entries = (
+            self.db.session.query(self.inbox.id, live_lease.label("leased"))
+            .filter(
+                self.inbox.order_id == order_id,
+                self.inbox.status.in_(
+                    [
+                        webhook_inbox_status.PENDING.value,
+                        webhook_inbox_status.PROCESSING.value,
+                    ]
+                ),
+            )
+            .order_by(self.inbox.id)
+            .with_for_update()
+            .all()
+        )
+
+        if not entries or any(leased for _, leased in entries):
+            return None
+
+        entry_id = entries[0].id
+        self.db.session.execute(
+            update(self.inbox)
+            .where(self.inbox.id == entry_id)
+            .values(
+                status=webhook_inbox_status.PROCESSING.value,
+                attempts=self.inbox.attempts + 1,
+                locked_by=owner,
+                locked_until=now + timedelta(seconds=lease_seconds),
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+        return entry_id
+
+    def finish_entry(self, entry_id, owner, **values):
+        """Only applies while owner still holds the lease."""
+        result = self.db.session.execute(
+            update(self.inbox)
+            .where(
+                self.inbox.id == entry_id,
+                self.inbox.status == webhook_inbox_status.PROCESSING.value,
+                self.inbox.locked_by == owner,
+            )
+            .values(locked_by=None, locked_until=None, **values)
+            .execution_options(synchronize_session=False)
+        )
+
+        return result.rowcount == 1
+
+    def get_entry(self, entry_id):
+        return self.inbox.query.filter_by(id=entry_id).first()
+
+    def requeue_expired_entries(self, stale_before=None):
+        """
+        Put entries whose worker died back to pending and return the order
+        ids that have pending entries. Entries of live workers keep their
+        lease. With stale_before, only orders whose pending entries were
+        last touched before it, so entries waiting out a retry backoff are
+        left to their timer.
+        """
+        self.db.session.execute(
+            update(self.inbox)
+            .where(
+                self.inbox.status == webhook_inbox_status.PROCESSING.value,
+                or_(
+                    self.inbox.locked_until.is_(None),
+                    self.inbox.locked_until < datetime.now(pytz.UTC),
+                ),
+            )
+            .values(
+                status=webhook_inbox_status.PENDING.value,
+                locked_by=None,
+                locked_until=None,
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+        query = self.db.session.query(self.inbox.order_id).filter(
+            self.inbox.status == webhook_inbox_status.PENDING.value
+        )
+        if stale_before is not None:
+            query = query.filter(
+                func.coalesce(self.inbox.processed_at, self.inbox.created_at)
+                < stale_before
+            )
+
+        return [
+            order_id
+            for (order_id,) in query.group_by(self.inbox.order_id)
+            .order_by(self.db.func.min(self.inbox.id))
+            .all()
+        ]
@@ -0,0 +1,147 @@
+import json
+import zlib
+import queue
+import threading
+from datetime import datetime
+import pytz
+
+from app.db import db
+from app.models.webhook_inbox import webhook_inbox_status
+from ..common import lease_owner
+from .webhook_inbox_repository import WebhookInboxRepository
+
+
+class WebhookInboxRunner:
+    """
+    Processes webhook_inbox entries on a fixed set of worker threads.
+    Every order_id always maps to the same worker of a process, and an
+    entry is only claimed while no other process holds a lease
+    (WEBHOOK_LEASE_SECONDS) on an entry of the same order, so the
+    notifications of one order are handled one at a time and in arrival
+    order across processes.
+
+    handler(payload) must return (message, status_code) like a service
+    method: 200 marks the entry done, 400 fails it, anything else is
+    retried with exponential backoff.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.handler = None
+        self.queues = []
+        self.max_attempts = 5
+        self.backoff_seconds = 2.0
+        self.lease_seconds = 300
+
+    def init_app(self, app, handler):
+        self.app = app
+        self.handler = handler
+        self.max_attempts = int(app.config.get("WEBHOOK_MAX_ATTEMPTS") or 5)
+        self.backoff_seconds = float(app.config.get("WEBHOOK_BACKOFF_SECONDS") or 2)
+        self.lease_seconds = int(app.config.get("WEBHOOK_LEASE_SECONDS") or 300)
+
+        for index in range(int(app.config.get("WEBHOOK_WORKERS") or 4)):
+            work_queue = queue.Queue()
+            thread = threading.Thread(
+                target=self.work,
+                args=(work_queue,),
+                name=f"webhook-inbox-{index}",
+                daemon=True,
+            )
+            thread.start()
+            self.queues.append(work_queue)
+
+    def submit(self, order_id, delay=0):
+        if not self.queues:
+            raise RuntimeError("Webhook inbox runner is not initialised")
+
+        if delay:
+            timer = threading.Timer(delay, self.submit, args=(order_id,))
+            timer.daemon = True
+            timer.start()
+            return
+
+        partition = zlib.crc32(order_id.encode("utf-8")) % len(self.queues)
+        self.queues[partition].put(order_id)
+
+    def recover(self, stale_before=None):
+        repository = WebhookInboxRepository()
+
+        try:
+            order_ids = repository.requeue_expired_entries(stale_before)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        for order_id in order_ids:
+            self.submit(order_id)
+
+        return len(order_ids)
+
+    def work(self, work_queue):
+        while True:
+            order_id = work_queue.get()
+
+            with self.app.app_context():
+                try:
+                    self.process_order(order_id)
+                except Exception as e:
+                    db.session.rollback()
+                    self.app.logger.exception(
+                        "webhook inbox: order %s failed: %s", order_id, e
+                    )
+                finally:
+                    db.session.remove()
+
+    def process_order(self, order_id):
+        repository = WebhookInboxRepository()
+        owner = lease_owner()
+
+        while True:
+            # None when the order has nothing pending or another process
+            # is handling it; that process picks up the later entries
+            entry_id = repository.claim_next_entry(
+                order_id, owner, self.lease_seconds
+            )
+            if entry_id is None:
+                db.session.rollback()
+                return
+            db.session.commit()
+
+            entry = repository.get_entry(entry_id)
+            message, status_code = self.handler(json.loads(entry.payload))
+
+            entry = repository.get_entry(entry_id)
+            values = {"processed_at": datetime.now(pytz.UTC)}
+            retry_in = None
+
+            if status_code == 200:
+                values.update(status=webhook_inbox_status.DONE.value, error=None)
+            elif status_code == 400 or entry.attempts >= self.max_attempts:
+                values.update(
+                    status=webhook_inbox_status.FAILED.value,
+                    error=message.get("error"),
+                )
+            else:
+                values.update(
+                    status=webhook_inbox_status.PENDING.value,
+                    error=message.get("error"),
+                )
+                retry_in = self.backoff_seconds * 2 ** (entry.attempts - 1)
+
+            if not repository.finish_entry(entry_id, owner, **values):
+                db.session.rollback()
+                self.app.logger.warning(
+                    "webhook inbox: entry %s lost its lease", entry_id
+                )
+                return
+            db.session.commit()
+
+            if retry_in is not None:
+                # later notifications of this order wait behind the retry
+                self.submit(order_id, delay=retry_in)
+                return
+
+
+webhook_inbox_runner = WebhookInboxRunner()
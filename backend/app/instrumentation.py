@@ -0,0 +1,348 @@
+import re
+import json
+import time
+import logging
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+from flask import g, request, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from pymongo import monitoring
+
+
+logger = logging.getLogger("app.instrumentation")
+
+_listeners_registered = False
+_active_budgets = threading.local()
+
+# statements per request for the blueprints whose models lean on lazy
+# relationships, override with QUERY_BUDGETS=blueprint=limit,...
+DEFAULT_QUERY_BUDGETS = {
+    "products_blueprint": 15,
+    "carts_blueprint": 10,
+    "calculators_blueprint": 15,
+    "transactions_blueprint": 30,
+}
+DEFAULT_REPEAT_THRESHOLD = 5
+
+_string_literal = re.compile(r"'(?:[^']|'')*'")
+_number_literal = re.compile(r"\b\d+(?:\.\d+)?\b")
+_bind_param = re.compile(r"%\(\w+\)s|%s|:\w+|\?")
+_in_list = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_whitespace = re.compile(r"\s+")
+
+
+def statement_shape(statement):
+    """
+    The statement with literals and bind parameters replaced, so the same
+    lazy load issued for different rows has the same shape.
+    """
+    shape = _string_literal.sub("?", statement)
+    shape = _bind_param.sub("?", shape)
+    shape = _number_literal.sub("?", shape)
+    shape = _in_list.sub("(?)", shape)
+    return _whitespace.sub(" ", shape).strip()
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryBudget:
+    """
+    Counts the statements executed on the current thread inside the
+    block and flags shapes repeated max_repeats times or more (the usual
+    sign of an N+1). Used per request by init_app, and directly in
+    scripts and benchmarks:
+
+        with QueryBudget(max_queries=5, max_repeats=3, label="history"):
+            service.list_transactions(identity, request)
+
+    raises QueryBudgetExceeded on exit when either limit is broken and
+    strict is True, otherwise violations() can be inspected.
+    """
+
+    def __init__(
+        self,
+        max_queries=None,
+        max_repeats=DEFAULT_REPEAT_THRESHOLD,
+        label=None,
+        strict=True,
+    ):
+        self.max_queries = max_queries
+        self.max_repeats = max_repeats
+        self.label = label
+        self.strict = strict
+        self.count = 0
+        self.shapes = Counter()
+
+    def record(self, statement):
+        self.count += 1
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self):
+        if not self.max_repeats:
+            return []
+
+        return [
+            (shape, count)
+            for shape, count in self.shapes.most_common()
+            if count >= self.max_repeats
+        ]
+
+    def violations(self):
+        violations = []
+
+        if self.max_queries is not None and self.count > self.max_queries:
+            violations.append(
+                f"{self.count} queries, budget is {self.max_queries}"
+            )
+        for shape, count in self.repeated():
+            violations.append(f"{count}x {shape[:200]}")
+
+        return violations
+
+    def __enter__(self):
+        stack = getattr(_active_budgets, "stack", None)
+        if stack is None:
+            stack = _active_budgets.stack = []
+
+        stack.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        _active_budgets.stack.remove(self)
+
+        if exc_type is None and self.strict:
+            violations = self.violations()
+            if violations:
+                label = f"{self.label}: " if self.label else ""
+                raise QueryBudgetExceeded(label + "; ".join(violations))
+
+        return False
+
+
+class RequestMetrics:
+    """Counters for one request. Only touched from the request thread."""
+
+    def __init__(self, sample_queries=False, max_queries=200):
+        self.started = time.perf_counter()
+        self.sql_count = 0
+        self.sql_ms = 0.0
+        self.mongo_count = 0
+        self.mongo_ms = 0.0
+        self.external = {}
+        self.sample_queries = sample_queries
+        self.max_queries = max_queries
+        self.queries = []
+
+    def add_query(self, statement, duration_ms):
+        self.sql_count += 1
+        self.sql_ms += duration_ms
+
+        if self.sample_queries and len(self.queries) < self.max_queries:
+            self.queries.append((statement, duration_ms))
+
+    def add_mongo(self, duration_ms):
+        self.mongo_count += 1
+        self.mongo_ms += duration_ms
+
+    def add_external(self, name, duration_ms):
+        count, total_ms = self.external.get(name, (0, 0.0))
+        self.external[name] = (count + 1, total_ms + duration_ms)
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    def server_timing(self, total_ms):
+        entries = [
+            f'db;dur={self.sql_ms:.1f};desc="{self.sql_count} queries"',
+            f'mongo;dur={self.mongo_ms:.1f};desc="{self.mongo_count} commands"',
+        ]
+        for name, (count, duration_ms) in self.external.items():
+            entries.append(f'ext-{name};dur={duration_ms:.1f};desc="{count} calls"')
+        entries.append(f"total;dur={total_ms:.1f}")
+
+        return ", ".join(entries)
+
+    def to_dict(self, total_ms):
+        return {
+            "duration_ms": round(total_ms, 1),
+            "sql_count": self.sql_count,
+            "sql_ms": round(self.sql_ms, 1),
+            "mongo_count": self.mongo_count,
+            "mongo_ms": round(self.mongo_ms, 1),
+            "external": {
+                name: {"count": count, "ms": round(duration_ms, 1)}
+                for name, (count, duration_ms) in self.external.items()
+            },
+        }
+
+
+def current_metrics():
+    if not has_request_context():
+        return None
+
+    return g.get("request_metrics")
+
+
+@contextmanager
+def track_external(name):
+    """Time an outbound call made from the request thread."""
+    started = time.perf_counter()
+
+    try:
+        yield
+    finally:
+        metrics = current_metrics()
+        if metrics is not None:
+            metrics.add_external(name, (time.perf_counter() - started) * 1000)
+
+
+def handle_error(exception_context):
+    # after_cursor_execute is skipped for failed statements
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_started"):
+        connection.info["query_started"].pop()
+
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_started"].pop()
+    metrics = current_metrics()
+
+    if metrics is not None:
+        metrics.add_query(statement, (time.perf_counter() - started) * 1000)
+
+    for budget in getattr(_active_budgets, "stack", ()):
+        budget.record(statement)
+
+
+class MongoCommandTimer(monitoring.CommandListener):
+    # pymongo runs commands synchronously on the calling thread, so the
+    # request context is available here
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        self.record(event)
+
+    def failed(self, event):
+        self.record(event)
+
+    def record(self, event):
+        metrics = current_metrics()
+
+        if metrics is not None:
+            metrics.add_mongo(event.duration_micros / 1000)
+
+
+def register_listeners():
+    global _listeners_registered
+
+    if _listeners_registered:
+        return
+
+    event.listen(Engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", after_cursor_execute)
+    event.listen(Engine, "handle_error", handle_error)
+    # only applies to clients created afterwards, see init_app
+    monitoring.register(MongoCommandTimer())
+
+    _listeners_registered = True
+
+
+def init_app(app):
+    """
+    Must run before mongo.init_app so the PyMongo client picks up the
+    command listener.
+    """
+    if str(app.config.get("INSTRUMENTATION_ENABLED") or "true").lower() == "false":
+        return
+
+    slow_request_ms = float(app.config.get("SLOW_REQUEST_MS") or 500)
+    query_budgets = parse_query_budgets(app.config.get("QUERY_BUDGETS"))
+    repeat_threshold = int(
+        app.config.get("QUERY_REPEAT_THRESHOLD") or DEFAULT_REPEAT_THRESHOLD
+    )
+    strict_budgets = (
+        str(app.config.get("QUERY_BUDGET_STRICT") or "false").lower() == "true"
+    )
+    sample_queries = (
+        str(app.config.get("INSTRUMENTATION_SAMPLE_QUERIES") or "false").lower()
+        == "true"
+    )
+
+    register_listeners()
+    # propagates to the Flask app logger, which has the handler
+    logger.setLevel(logging.INFO)
+
+    @app.before_request
+    def start_request_metrics():
+        g.request_metrics = RequestMetrics(sample_queries=sample_queries)
+        g.query_budget = QueryBudget(
+            max_queries=query_budgets.get(request.blueprint),
+            max_repeats=repeat_threshold,
+            label=request.endpoint,
+            strict=False,
+        ).__enter__()
+
+    @app.teardown_request
+    def close_query_budget(exception=None):
+        budget = g.pop("query_budget", None)
+        if budget is not None:
+            budget.__exit__(None, None, None)
+
+    @app.after_request
+    def finish_request_metrics(response):
+        metrics = g.pop("request_metrics", None)
+        if metrics is None:
+            return response
+
+        budget = g.get("query_budget")
+        violations = budget.violations() if budget is not None else []
+        if violations and strict_budgets:
+            raise QueryBudgetExceeded(f"{request.endpoint}: " + "; ".join(violations))
+
+        total_ms = metrics.elapsed_ms()
+        response.headers["Server-Timing"] = metrics.server_timing(total_ms)
+
+        line = {
+            "event": "request",
+            "method": request.method,
+            "endpoint": request.endpoint,
+            "path": request.path,
+            "status": response.status_code,
+            **metrics.to_dict(total_ms),
+        }
+        if violations:
+            line["query_budget"] = violations
+
+        if total_ms >= slow_request_ms or violations:
+            line["slow"] = total_ms >= slow_request_ms
+            if metrics.queries:
+                line["queries"] = [
+                    {"statement": statement[:500], "ms": round(duration_ms, 2)}
+                    for statement, duration_ms in metrics.queries
+                ]
+            logger.warning(json.dumps(line, default=str))
+        else:
+            logger.info(json.dumps(line, default=str))
+
+        return response
+
+
+def parse_query_budgets(value):
+    budgets = dict(DEFAULT_QUERY_BUDGETS)
+
+    for entry in (value or "").split(","):
+        if "=" in entry:
+            blueprint, limit = entry.split("=", 1)
+            budgets[blueprint.strip()] = int(limit)
+
+    return budgets
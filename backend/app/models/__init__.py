@@ -15,3 +15,8 @@ from .reviews import Reviews
 from .shipment_details import ShipmentDetails
 from .product_orders import ProductOrders
 from .product_images import ProductImages
+from .image_jobs import ImageJobs
+from .product_image_variants import ProductImageVariants
+from .stock_holds import StockHolds
+from .webhook_inbox import WebhookInbox
+from .idempotency_keys import IdempotencyKeys
@@ -0,0 +1,49 @@
+from sqlalchemy import (
+    Column,
+    Integer,
+    SmallInteger,
+    VARCHAR,
+    CHAR,
+    Text,
+    DateTime,
+    UniqueConstraint,
+)
+from enum import Enum
+from datetime import datetime
+import pytz
+
+from ..db import db
+
+
+class idempotency_key_status(Enum):
+    IN_PROGRESS = 1
+    COMPLETED = 2
+
+
+class IdempotencyKeys(db.Model):
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (UniqueConstraint("owner", "endpoint", "idempotency_key"),)
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    owner = Column(VARCHAR(50), nullable=False)
+    endpoint = Column(VARCHAR(100), nullable=False)
+    idempotency_key = Column(VARCHAR(255), nullable=False)
+    request_hash = Column(CHAR(64), nullable=False)
+    status = Column(
+        SmallInteger, default=idempotency_key_status.IN_PROGRESS.value, nullable=False
+    )
+    response_code = Column(SmallInteger, nullable=True)
+    response_body = Column(Text, nullable=True)
+    locked_at = Column(
+        DateTime, nullable=False, default=lambda: datetime.now(pytz.UTC)
+    )
+    created_at = Column(
+        DateTime, nullable=False, default=lambda: datetime.now(pytz.UTC), index=True
+    )
+    completed_at = Column(DateTime, nullable=True)
+
+    def __init__(self, owner, endpoint, idempotency_key, request_hash):
+        self.owner = owner
+        self.endpoint = endpoint
+        self.idempotency_key = idempotency_key
+        self.request_hash = request_hash
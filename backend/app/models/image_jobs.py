@@ -0,0 +1,57 @@
+from sqlalchemy import Column, Integer, VARCHAR, Text, ForeignKey, DateTime, SmallInteger
+from sqlalchemy.dialects.mysql import LONGTEXT
+from enum import Enum
+from datetime import datetime
+import pytz
+
+from ..db import db
+
+
+class image_job_status(Enum):
+    QUEUED = 1
+    PROCESSING = 2
+    DONE = 3
+    FAILED = 4
+
+
+class ImageJobs(db.Model):
+    __tablename__ = "image_jobs"
+
+    id = Column(VARCHAR(32), primary_key=True)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
+    seller_id = Column(Integer, ForeignKey("sellers.id"), nullable=False)
+    status = Column(
+        SmallInteger,
+        default=image_job_status.QUEUED.value,
+        nullable=False,
+        index=True,
+    )
+    attempts = Column(SmallInteger, default=0, nullable=False)
+    # worker holding the job while PROCESSING, and until when
+    locked_by = Column(VARCHAR(100), nullable=True)
+    locked_until = Column(DateTime, nullable=True)
+    image_count = Column(SmallInteger, nullable=False)
+    # base64 images as a JSON list, cleared once the job is done
+    payload = Column(Text().with_variant(LONGTEXT(), "mysql"), nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(
+        DateTime, nullable=False, default=lambda: datetime.now(pytz.UTC)
+    )
+    updated_at = Column(
+        DateTime,
+        nullable=False,
+        default=lambda: datetime.now(pytz.UTC),
+        onupdate=lambda: datetime.now(pytz.UTC),
+    )
+
+    def to_dict(self):
+        return {
+            "job_id": self.id,
+            "product_id": self.product_id,
+            "status": image_job_status(self.status).name,
+            "attempts": self.attempts,
+            "image_count": self.image_count,
+            "error": self.error,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
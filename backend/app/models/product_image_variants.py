@@ -0,0 +1,39 @@
+from datetime import datetime
+import pytz
+
+from app.db import db
+
+
+class ProductImageVariants(db.Model):
+    __tablename__ = "product_image_variants"
+    __table_args__ = (
+        db.UniqueConstraint("product_image_id", "width", "image_format"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    product_image_id = db.Column(
+        db.Integer,
+        db.ForeignKey("product_images.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    width = db.Column(db.SmallInteger, nullable=False)
+    image_format = db.Column(db.String(10), nullable=False)
+    image_public_id = db.Column(db.String(255), nullable=False)
+    image_secure_url = db.Column(db.String(255), nullable=False)
+    created_at = db.Column(
+        db.DateTime, nullable=False, default=lambda: datetime.now(pytz.UTC)
+    )
+
+    def __init__(self, width, image_format, image_public_id, image_secure_url):
+        self.width = width
+        self.image_format = image_format
+        self.image_public_id = image_public_id
+        self.image_secure_url = image_secure_url
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "width": self.width,
+            "image_format": self.image_format,
+            "image_secure_url": self.image_secure_url,
+        }
@@ -15,15 +15,35 @@ class ProductImages(db.Model):
         db.DateTime, nullable=False, default=lambda: datetime.now(pytz.UTC)
     )
 
+    variants = db.relationship(
+        "ProductImageVariants",
+        backref="product_image",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+
     def __init__(self, product_id, image_public_id, image_secure_url):
         self.product_id = product_id
         self.image_public_id = image_public_id
         self.image_secure_url = image_secure_url
 
-    def to_dict(self):
-        return {
+    def to_dict(self, image_variant=None):
+        image = {
             "id": self.id,
             "product_id": self.product_id,
             "image_public_id": self.image_public_id,
             "image_secure_url": self.image_secure_url,
         }
+
+        # image_variant is (width, image_format); fall back to the original
+        # for images ingested before variants existed
+        if image_variant:
+            width, image_format = image_variant
+            for variant in self.variants:
+                if variant.width == width and variant.image_format == image_format:
+                    image["image_secure_url"] = variant.image_secure_url
+                    image["width"] = width
+                    image["image_format"] = image_format
+                    break
+
+        return image
@@ -27,17 +27,16 @@ class ProductOrders(db.Model):
         self.quantity = quantity
 
     def to_dict(self):
-        product = self.product_orders.to_cart()
+        # only the fields shown in order history, Products.to_cart also
+        # loads the seller and category
+        product = self.product_orders
+        images = product.product_images
 
         product_info = {
-            "is_active": product["is_active"],
-            "image_url": (
-                product.get("image_url")[0]["image_secure_url"]
-                if product["image_url"]
-                else None
-            ),
-            "name": product["name"],
-            "price": product["price"],
+            "is_active": product.is_active,
+            "image_url": images[0].image_secure_url if images else None,
+            "name": product.name,
+            "price": product.price,
         }
         return {
             "product_order_id": self.id,
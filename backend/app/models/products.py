@@ -9,13 +9,11 @@ from sqlalchemy import (
     DateTime,
     Float,
 )
-from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import pytz
 
 from app.db import db
-from .reviews import Reviews
 
 
 class Product_Type(Enum):
@@ -41,6 +39,9 @@ class Products(db.Model):
     seller_id = Column(Integer, ForeignKey("sellers.id"), nullable=False)
     is_active = Column(SmallInteger, default=1, nullable=False)
     sold_qty = Column(Integer, default=0, nullable=False)
+    rating_sum = Column(Integer, default=0, nullable=False)
+    rating_count = Column(Integer, default=0, nullable=False)
+    avg_rating = Column(Float(precision=53), default=0, nullable=False, index=True)
     created_at = Column(
         DateTime, nullable=False, default=lambda: datetime.now(pytz.utc)
     )
@@ -79,26 +80,20 @@ class Products(db.Model):
         self.height_cm = height_cm
         self.volume_m3 = self.length_cm * self.width_cm * self.height_cm / 1_000_000
 
-    def to_dict(self):
+    def to_dict(self, image_variant=None):
         all_reviews = self.reviews
         reviews = [review.to_dict() for review in all_reviews]
 
-        avg_rating = (
-            db.session.query(func.avg(Reviews.rating))
-            .filter(Reviews.product_id == self.id)
-            .scalar()
-        )
-
-        seller = self.seller_products.to_dict()
+        seller = self.seller_products
         seller_info = {
-            "store_name": seller["store_name"],
-            "store_image_url": seller["store_image_url"],
-            "store_district": seller["addresses"][0]["district_name"],
+            "store_name": seller.store_name,
+            "store_image_url": seller.store_image_url,
+            "store_district": seller.addresses[0].district_addresses.district,
         }
 
         product_images = self.product_images
         if len(product_images) > 0:
-            images = [image.to_dict() for image in product_images]
+            images = [image.to_dict(image_variant) for image in product_images]
         else:
             images = None
 
@@ -116,7 +111,7 @@ class Products(db.Model):
             "is_active": self.is_active,
             "sold_qty": self.sold_qty,
             "reviews": reviews,
-            "avg_rating": round(avg_rating, 2) if avg_rating else None,
+            "avg_rating": round(self.avg_rating, 2) if self.avg_rating else None,
             "seller_id": self.seller_id,
             "seller_info": seller_info,
             "created_at": self.created_at,
@@ -151,12 +146,3 @@ class Products(db.Model):
 
     def upload_image(self):
         pass
-
-    def item_sold(self, qty):
-        self.sold_qty += qty
-
-    def reduce_item_qty(self, qty):
-        self.stock -= qty
-
-    def increase_item_qty(self, qty):
-        self.stock += qty
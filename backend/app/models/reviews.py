@@ -36,7 +36,7 @@ class Reviews(db.Model):
         self.transaction_id = transaction_id
 
     def to_dict(self):
-        user_username = self.user_reviews.to_dict()["username"]
+        user_username = self.user_reviews.username
 
         return {
             "id": self.id,
@@ -0,0 +1,40 @@
+from sqlalchemy import Column, Integer, SmallInteger, VARCHAR, DateTime, ForeignKey, Index
+from enum import Enum
+from datetime import datetime
+import pytz
+
+from ..db import db
+
+
+class stock_hold_status(Enum):
+    ACTIVE = 1
+    COMMITTED = 2
+    RELEASED = 3
+
+
+class StockHolds(db.Model):
+    __tablename__ = "stock_holds"
+    __table_args__ = (Index("ix_stock_holds_status_expires_at", "status", "expires_at"),)
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    transaction_id = Column(
+        VARCHAR(30), ForeignKey("transactions.id"), nullable=False, index=True
+    )
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
+    quantity = Column(SmallInteger, nullable=False)
+    status = Column(
+        SmallInteger, default=stock_hold_status.ACTIVE.value, nullable=False
+    )
+    expires_at = Column(DateTime, nullable=False)
+    created_at = Column(
+        DateTime, nullable=False, default=lambda: datetime.now(pytz.UTC)
+    )
+    updated_at = Column(
+        DateTime, nullable=True, onupdate=lambda: datetime.now(pytz.UTC)
+    )
+
+    def __init__(self, transaction_id, product_id, quantity, expires_at):
+        self.transaction_id = transaction_id
+        self.product_id = product_id
+        self.quantity = quantity
+        self.expires_at = expires_at
@@ -5,6 +5,7 @@ from sqlalchemy import (
     ForeignKey,
     SmallInteger,
     VARCHAR,
+    Index,
 )
 from enum import Enum
 from datetime import datetime
@@ -20,10 +21,16 @@ class transaction_status(Enum):
     ON_DELIVERY = 4
     DELIVERED = 5
     CANCELED = 6
+    # paid, but the order can no longer be fulfilled, refund by hand
+    REFUND_REQUIRED = 7
 
 
 class Transactions(db.Model):
     __tablename__ = "transactions"
+    # drives the unpaid transaction sweeper
+    __table_args__ = (
+        Index("ix_transactions_status_created_at", "transaction_status", "created_at"),
+    )
 
     id = Column(
         VARCHAR(30),
@@ -80,10 +87,11 @@ class Transactions(db.Model):
         self.gross_amount = gross_amount
 
     def to_dict(self):
-        seller = self.seller_transactions.to_dict()
+        # read the two store columns directly, Sellers.to_dict loads every address
+        seller = self.seller_transactions
         seller_info = {
-            "store_name": seller["store_name"],
-            "store_image_url": seller["store_image_url"],
+            "store_name": seller.store_name,
+            "store_image_url": seller.store_image_url,
         }
 
         products = self.product_orders
@@ -111,6 +119,11 @@ class Transactions(db.Model):
         self.information = f"Canceled By {role}"
         self.payment_link = None
 
+    def require_refund(self, reason):
+        self.transaction_status = transaction_status.REFUND_REQUIRED.value
+        self.information = reason
+        self.payment_link = None
+
     def change_to_prepared(self):
         self.transaction_status = transaction_status.PREPARED_BY_SELLER.value
 
@@ -0,0 +1,55 @@
+from sqlalchemy import (
+    Column,
+    Integer,
+    SmallInteger,
+    VARCHAR,
+    Text,
+    DateTime,
+    UniqueConstraint,
+)
+from enum import Enum
+from datetime import datetime
+import pytz
+
+from ..db import db
+
+
+class webhook_inbox_status(Enum):
+    PENDING = 1
+    PROCESSING = 2
+    DONE = 3
+    FAILED = 4
+
+
+class WebhookInbox(db.Model):
+    __tablename__ = "webhook_inbox"
+    __table_args__ = (
+        UniqueConstraint("order_id", "transaction_status", "status_code"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    order_id = Column(VARCHAR(50), nullable=False)
+    transaction_status = Column(VARCHAR(30), nullable=False)
+    status_code = Column(VARCHAR(5), nullable=False)
+    payload = Column(Text, nullable=False)
+    status = Column(
+        SmallInteger,
+        default=webhook_inbox_status.PENDING.value,
+        nullable=False,
+        index=True,
+    )
+    attempts = Column(SmallInteger, default=0, nullable=False)
+    # worker holding the entry while PROCESSING, and until when
+    locked_by = Column(VARCHAR(100), nullable=True)
+    locked_until = Column(DateTime, nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(
+        DateTime, nullable=False, default=lambda: datetime.now(pytz.UTC)
+    )
+    processed_at = Column(DateTime, nullable=True)
+
+    def __init__(self, order_id, transaction_status, status_code, payload):
+        self.order_id = order_id
+        self.transaction_status = transaction_status
+        self.status_code = status_code
+        self.payload = payload
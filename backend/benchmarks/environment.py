@@ -0,0 +1,203 @@
+import os
+import shutil
+import tempfile
+import threading
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+
+from app import create_app
+from app.db import db, mongo
+from app.instrumentation import register_listeners
+from app.controllers.reference.reference_store import reference_store
+from standins import (
+    create_rajaongkir_app,
+    create_midtrans_app,
+    serve_in_thread,
+)
+from .seed import seed_catalog, seed_carts
+
+MIDTRANS_SERVER_KEY = "SB-Mid-server-benchmark"
+
+
+class StatementCounter:
+    """Statements executed on every thread, webhook workers included."""
+
+    def __init__(self):
+        self.count = 0
+        self.lock = threading.Lock()
+        event.listen(Engine, "after_cursor_execute", self.record)
+
+    def record(self, *args):
+        with self.lock:
+            self.count += 1
+
+    def value(self):
+        with self.lock:
+            return self.count
+
+    def close(self):
+        event.remove(Engine, "after_cursor_execute", self.record)
+
+
+class BenchEnvironment:
+    """
+    The real app on a throwaway SQLite database with mongomock carts and
+    the RajaOngkir / Midtrans stand-ins on local ports. Nothing leaves the
+    machine.
+    """
+
+    def __init__(
+        self,
+        products=10_000,
+        sellers=200,
+        users=100,
+        rajaongkir_latency_ms=0,
+        midtrans_latency_ms=0,
+        jitter_ms=0,
+        shipment_cache_ttl=None,
+        mongo_uri=None,
+        database_uri=None,
+        seed=1,
+    ):
+        self.products = products
+        self.sellers = sellers
+        self.users = users
+        self.rajaongkir_latency_ms = rajaongkir_latency_ms
+        self.midtrans_latency_ms = midtrans_latency_ms
+        self.jitter_ms = jitter_ms
+        self.shipment_cache_ttl = shipment_cache_ttl
+        self.mongo_uri = mongo_uri
+        self.database_uri = database_uri
+        self.seed = seed
+        self.directory = None
+        self.database_path = None
+        self.servers = []
+        self.app = None
+        self.base_url = None
+        self.client = None
+        self.catalog = None
+        self.carts = None
+        self.counter = None
+
+    def start(self):
+        self.directory = tempfile.mkdtemp(prefix="bench-")
+        database_uri = self.database_uri
+        if database_uri is None:
+            self.database_path = os.path.join(self.directory, "bench.sqlite")
+            database_uri = f"sqlite:///{self.database_path}"
+
+        rajaongkir_server, rajaongkir_url = serve_in_thread(
+            create_rajaongkir_app(
+                {
+                    "LATENCY_MS": self.rajaongkir_latency_ms,
+                    "JITTER_MS": self.jitter_ms,
+                    "SEED": self.seed,
+                }
+            )
+        )
+        midtrans_server, midtrans_url = serve_in_thread(
+            create_midtrans_app(
+                {
+                    "LATENCY_MS": self.midtrans_latency_ms,
+                    "JITTER_MS": self.jitter_ms,
+                    "SEED": self.seed,
+                }
+            )
+        )
+        self.servers = [rajaongkir_server, midtrans_server]
+        self.midtrans_url = midtrans_url
+
+        # app/__init__ has already loaded .env, so these win over it
+        os.environ["RAJAONGKIR_LINK"] = f"{rajaongkir_url}/cost"
+        os.environ["RAJAONGKIR_KEY"] = "benchmark"
+        os.environ["MIDTRANS_SNAP_BASE_URL"] = midtrans_url
+        os.environ["MIDTRANS_SERVER_KEY"] = MIDTRANS_SERVER_KEY
+        os.environ["IMAGE_STORAGE"] = "local"
+        os.environ["IMAGE_LOCAL_DIR"] = os.path.join(self.directory, "images")
+        if not os.getenv("SNOWFLAKE_WORKER_ID"):
+            os.environ["SNOWFLAKE_WORKER_ID"] = "0"
+        if self.shipment_cache_ttl is not None:
+            os.environ["SHIPMENT_CACHE_TTL"] = str(self.shipment_cache_ttl)
+
+        config = {}
+        if self.database_path:
+            # webhook workers and served requests write from their own threads
+            config["SQLALCHEMY_ENGINE_OPTIONS"] = {"connect_args": {"timeout": 30}}
+
+        self.app = create_app(
+            {
+                **config,
+                "TESTING": True,
+                "SECRET_KEY": "benchmark",
+                "JWT_SECRET_KEY": "benchmark",
+                "SQLALCHEMY_DATABASE_URI": database_uri,
+                "MONGO_URI": self.mongo_uri or "mongodb://127.0.0.1:27017/benchmark",
+                "TRANSACTION_SWEEP_INTERVAL_SECONDS": "0",
+                "BACKGROUND_RECOVERY_INTERVAL_SECONDS": "0",
+                "INSTRUMENTATION_ENABLED": "false",
+            }
+        )
+
+        if self.mongo_uri is None:
+            self.use_mongomock()
+
+        # QueryBudget counts through these, request instrumentation is off
+        register_listeners()
+
+        with self.app.app_context():
+            if self.database_path:
+                # readers no longer block the writer, closer to InnoDB
+                db.session.execute(text("PRAGMA journal_mode=WAL"))
+
+            self.catalog = seed_catalog(
+                products=self.products,
+                sellers=self.sellers,
+                users=self.users,
+                seed=self.seed,
+            )
+            self.carts = seed_carts(mongo, self.catalog, seed=self.seed)
+            reference_store.reload()
+
+        self.client = self.app.test_client()
+        self.counter = StatementCounter()
+
+        return self
+
+    def use_mongomock(self):
+        try:
+            import mongomock
+        except ImportError:
+            raise RuntimeError(
+                "Install mongomock (pipenv install --dev) or pass --mongo-uri"
+            )
+
+        mongo.cx = mongomock.MongoClient()
+        mongo.db = mongo.cx["benchmark"]
+
+    def serve(self):
+        """Serve the app over HTTP on a local port, for load tests."""
+        server, self.base_url = serve_in_thread(self.app)
+        self.servers.append(server)
+
+        return self.base_url
+
+    def token(self, role, role_id):
+        from flask_jwt_extended import create_access_token
+
+        with self.app.app_context():
+            return create_access_token(identity={"id": role_id, "role": role})
+
+    def stop(self):
+        if self.counter is not None:
+            self.counter.close()
+
+        for server in self.servers:
+            server.shutdown()
+
+        with self.app.app_context():
+            db.session.remove()
+            db.engine.dispose()
+
+        if self.directory:
+            shutil.rmtree(self.directory, ignore_errors=True)
@@ -0,0 +1,56 @@
+def legacy_cart_pricing(
+    seller_ids, prices, quantities, weights_kg, volumes_m3, carry_over=True
+):
+    """
+    The per-line loop ProductService.calculate_product_detail ran before
+    CartPricing, on CartPricing's columns. Returns (lines, seller_totals)
+    in CartPricing's shapes, lines in seller order. carry_over=True keeps
+    the old bug of summing weights across sellers; False resets them per
+    seller, which is what CartPricing does. The volumetric weight is
+    taken per line (volume times quantity) like CartPricing; the old loop
+    left the quantity out.
+    """
+    sorted_cart = {}
+    for index, seller_id in enumerate(seller_ids):
+        sorted_cart.setdefault(seller_id, []).append(index)
+
+    lines = []
+    seller_totals = {}
+    sub_total_weight = 0
+    sub_total_volume_to_weight = 0
+
+    for seller_id, indexes in sorted_cart.items():
+        seller_totals[seller_id] = {"total_price_before_shipment": 0}
+
+        if not carry_over:
+            sub_total_weight = 0
+            sub_total_volume_to_weight = 0
+
+        for index in indexes:
+            sub_total = prices[index] * quantities[index]
+            sub_weight = weights_kg[index] * quantities[index]
+            sub_volume = volumes_m3[index] * quantities[index]
+            sub_volume_to_weight = (sub_volume * 1_000_000) / 5000
+
+            lines.append(
+                {
+                    "sub_total": sub_total,
+                    "sub_weight": sub_weight,
+                    "sub_volume": sub_volume,
+                    "sub_volume_to_weight": sub_volume_to_weight,
+                }
+            )
+
+            sub_total_weight += sub_weight
+            sub_total_volume_to_weight += sub_volume_to_weight
+
+            seller_totals[seller_id]["total_price_before_shipment"] += sub_total
+
+        if sub_total_weight > sub_total_volume_to_weight:
+            seller_totals[seller_id]["total_weight_gram"] = sub_total_weight * 1000
+        else:
+            seller_totals[seller_id]["total_weight_gram"] = (
+                sub_total_volume_to_weight * 1000
+            )
+
+    return lines, seller_totals
@@ -0,0 +1,489 @@
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+from collections import Counter
+
+import aiohttp
+
+from standins import signed_notification
+from .environment import BenchEnvironment, MIDTRANS_SERVER_KEY
+from .run import percentile
+
+DEFAULT_WEIGHTS = "browse=60,cart=25,checkout=15"
+DEFAULT_CONCURRENCY = "1,5,10,25,50"
+
+
+class Recorder:
+    """Latency samples per request label, only kept after the warmup."""
+
+    def __init__(self, measure_from):
+        self.measure_from = measure_from
+        self.samples = {}
+        self.errors = Counter()
+        self.journeys = Counter()
+        self.failed_journeys = Counter()
+
+    def measuring(self):
+        return time.monotonic() >= self.measure_from
+
+    def request(self, label, duration_ms, ok):
+        if not self.measuring():
+            return
+
+        self.samples.setdefault(label, []).append(duration_ms)
+        if not ok:
+            self.errors[label] += 1
+
+    def journey(self, name, ok):
+        if not self.measuring():
+            return
+
+        self.journeys[name] += 1
+        if not ok:
+            self.failed_journeys[name] += 1
+
+    def summary(self, duration):
+        every = [ms for samples in self.samples.values() for ms in samples]
+        requests = len(every)
+        errors = sum(self.errors.values())
+
+        def latency(samples):
+            if not samples:
+                return {"p50_ms": None, "p95_ms": None, "p99_ms": None}
+
+            return {
+                "p50_ms": round(percentile(samples, 0.50), 1),
+                "p95_ms": round(percentile(samples, 0.95), 1),
+                "p99_ms": round(percentile(samples, 0.99), 1),
+            }
+
+        return {
+            "requests": requests,
+            "requests_per_second": round(requests / duration, 1),
+            "journeys_per_second": round(sum(self.journeys.values()) / duration, 1),
+            "error_rate": round(errors / requests, 4) if requests else 0,
+            **latency(every),
+            "journeys": dict(self.journeys),
+            "failed_journeys": dict(self.failed_journeys),
+            "endpoints": {
+                label: {
+                    "requests": len(samples),
+                    "errors": self.errors[label],
+                    **latency(samples),
+                }
+                for label, samples in sorted(self.samples.items())
+            },
+        }
+
+
+class LoadData:
+    """Everything the journeys send, generated before the clock starts."""
+
+    def __init__(self, env, seed=1):
+        catalog = env.catalog
+        randomizer = random.Random(seed)
+
+        self.user_ids = catalog.user_ids
+        self.product_ids = list(catalog.product_sellers)
+        self.carts = env.carts
+        self.headers = {
+            user_id: {"Authorization": f"Bearer {env.token('user', user_id)}"}
+            for user_id in catalog.user_ids
+        }
+        self.checkouts = {}
+
+        for user_id, items in env.carts.items():
+            seller_ids = sorted(
+                {catalog.product_sellers[item["product_id"]] for item in items}
+            )
+            self.checkouts[user_id] = {
+                "carts": items,
+                "user_selected_address_id": catalog.user_address_ids[user_id],
+                "selected_courier": [
+                    {
+                        "seller_id": seller_id,
+                        "selected_courier": randomizer.choice(["jne", "pos", "tiki"]),
+                        "selected_service": "REG",
+                    }
+                    for seller_id in seller_ids
+                ],
+            }
+
+        self.browse_queries = (
+            [{"category": category_id} for category_id in catalog.category_ids]
+            + [{"province_id": province_id} for province_id in catalog.province_ids]
+            + [{"rating": "desc"}, {"price": "asc"}, {"price": "desc"}]
+        )
+
+
+class Journeys:
+    """
+    Weighted shopper journeys over the real endpoints. Each returns False
+    as soon as one of its requests fails.
+    """
+
+    def __init__(self, base_url, midtrans_url, data):
+        self.base_url = base_url
+        self.midtrans_url = midtrans_url
+        self.data = data
+
+    async def request(
+        self, session, recorder, label, method, path, expected=(200,), **kwargs
+    ):
+        started = time.perf_counter()
+
+        try:
+            async with session.request(
+                method, self.base_url + path, **kwargs
+            ) as response:
+                body = await response.json(content_type=None)
+                ok = response.status in expected
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+            body, ok = None, False
+
+        recorder.request(label, (time.perf_counter() - started) * 1000, ok)
+
+        return body if ok else None
+
+    async def browse(self, session, recorder, user_id, randomizer):
+        for _ in range(2):
+            query = {**randomizer.choice(self.data.browse_queries), "per_page": 20}
+            # an empty filter result is a 400 in this API
+            await self.request(
+                session,
+                recorder,
+                "products.query",
+                "GET",
+                "/api/products/user/query",
+                (200, 400),
+                params=query,
+            )
+
+        product = await self.request(
+            session,
+            recorder,
+            "products.detail",
+            "GET",
+            f"/api/products/user/product/{randomizer.choice(self.data.product_ids)}",
+        )
+
+        return product is not None
+
+    async def cart(self, session, recorder, user_id, randomizer):
+        if not await self.browse(session, recorder, user_id, randomizer):
+            return False
+
+        # change quantities of products already in the cart so carts keep
+        # the seeded size however long the run is
+        items = [
+            {"product_id": item["product_id"], "quantity": randomizer.randint(1, 3)}
+            for item in randomizer.sample(self.data.carts[user_id], 2)
+        ]
+        updated = await self.request(
+            session,
+            recorder,
+            "carts.createupdate",
+            "POST",
+            "/api/carts/createupdate",
+            json={"items": items},
+            headers=self.data.headers[user_id],
+        )
+        if updated is None:
+            return False
+
+        cart = await self.request(
+            session,
+            recorder,
+            "carts.list",
+            "GET",
+            "/api/carts/list",
+            headers=self.data.headers[user_id],
+        )
+
+        return cart is not None
+
+    async def checkout(self, session, recorder, user_id, randomizer):
+        headers = self.data.headers[user_id]
+        payload = self.data.checkouts[user_id]
+
+        cart = await self.request(
+            session, recorder, "carts.list", "GET", "/api/carts/list", headers=headers
+        )
+        if cart is None:
+            return False
+
+        calculated = await self.request(
+            session,
+            recorder,
+            "calculators.calculatecart",
+            "POST",
+            "/api/calculators/calculatecart",
+            json=payload,
+            headers=headers,
+        )
+        if calculated is None:
+            return False
+
+        created = await self.request(
+            session,
+            recorder,
+            "transactions.create",
+            "POST",
+            "/api/transactions/create",
+            (201,),
+            json=payload,
+            headers=headers,
+        )
+        if created is None:
+            return False
+
+        # Midtrans would call back on its own, ask the stand-in which
+        # order the token belongs to (not timed)
+        token = created["payment_data"]["token"]
+        async with session.get(f"{self.midtrans_url}/tokens/{token}") as response:
+            if response.status != 200:
+                return False
+            order = await response.json()
+
+        notification = signed_notification(
+            order["order_id"], "settlement", order["gross_amount"], MIDTRANS_SERVER_KEY
+        )
+        confirmed = await self.request(
+            session,
+            recorder,
+            "transactions.confirmation",
+            "POST",
+            "/api/transactions/confirmation",
+            json=notification,
+        )
+
+        return confirmed is not None
+
+
+async def virtual_user(
+    index, journeys, weights, recorder, deadline, think_ms, session, seed
+):
+    randomizer = random.Random(seed * 100_003 + index)
+    user_ids = journeys.data.user_ids
+    user_id = user_ids[index % len(user_ids)]
+    names = list(weights)
+
+    while time.monotonic() < deadline:
+        name = randomizer.choices(names, [weights[n] for n in names])[0]
+        ok = await getattr(journeys, name)(session, recorder, user_id, randomizer)
+        recorder.journey(name, ok)
+
+        if think_ms:
+            await asyncio.sleep(think_ms * randomizer.uniform(0.5, 1.5) / 1000)
+
+
+async def run_level(journeys, weights, concurrency, duration, warmup, think_ms, seed):
+    now = time.monotonic()
+    recorder = Recorder(measure_from=now + warmup)
+    deadline = now + warmup + duration
+
+    connector = aiohttp.TCPConnector(limit=concurrency + 1)
+    timeout = aiohttp.ClientTimeout(total=60)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        await asyncio.gather(
+            *(
+                virtual_user(
+                    index,
+                    journeys,
+                    weights,
+                    recorder,
+                    deadline,
+                    think_ms,
+                    session,
+                    seed,
+                )
+                for index in range(concurrency)
+            )
+        )
+
+    # the last journeys finish after the deadline
+    measured = max(time.monotonic() - recorder.measure_from, duration)
+
+    return recorder.summary(measured)
+
+
+def parse_weights(value):
+    weights = {}
+
+    for entry in value.split(","):
+        if "=" not in entry:
+            continue
+
+        name, weight = entry.split("=", 1)
+        name = name.strip()
+        if name not in ("browse", "cart", "checkout"):
+            raise ValueError(f"Unknown journey {name}")
+        if float(weight) > 0:
+            weights[name] = float(weight)
+
+    if not weights:
+        raise ValueError("At least one journey needs a weight")
+
+    return weights
+
+
+def within_slo(summary, slo_p95_ms, max_error_rate):
+    return (
+        summary["p95_ms"] is not None
+        and summary["p95_ms"] <= slo_p95_ms
+        and summary["error_rate"] <= max_error_rate
+    )
+
+
+def print_report(levels, slo_p95_ms, max_error_rate):
+    header = (
+        f"{'users':>6}{'req/s':>10}{'journeys/s':>12}{'p50 ms':>10}"
+        f"{'p95 ms':>10}{'p99 ms':>10}{'errors':>9}"
+    )
+    print(header)
+    print("-" * len(header))
+
+    for concurrency, summary in levels.items():
+        print(
+            f"{concurrency:>6}{summary['requests_per_second']:>10}"
+            f"{summary['journeys_per_second']:>12}{summary['p50_ms']!s:>10}"
+            f"{summary['p95_ms']!s:>10}{summary['p99_ms']!s:>10}"
+            f"{summary['error_rate']:>9.2%}"
+        )
+
+    print()
+    for concurrency, summary in levels.items():
+        print(f"{concurrency} users")
+        for label, endpoint in summary["endpoints"].items():
+            print(
+                f"  {label:<28}{endpoint['requests']:>8} req"
+                f"  p50 {endpoint['p50_ms']!s:>8}  p95 {endpoint['p95_ms']!s:>8}"
+                f"  p99 {endpoint['p99_ms']!s:>8}  errors {endpoint['errors']}"
+            )
+
+    healthy = [
+        concurrency
+        for concurrency, summary in levels.items()
+        if within_slo(summary, slo_p95_ms, max_error_rate)
+    ]
+    print()
+    if healthy:
+        print(
+            f"Highest concurrency within p95 <= {slo_p95_ms}ms and "
+            f"errors <= {max_error_rate:.1%}: {max(healthy)} users"
+        )
+    else:
+        print(f"No level stayed within p95 <= {slo_p95_ms}ms")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Concurrent shopper load test against local stand-ins"
+    )
+    parser.add_argument("--products", type=int, default=10_000)
+    parser.add_argument("--sellers", type=int, default=200)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument(
+        "--concurrency",
+        default=DEFAULT_CONCURRENCY,
+        help="comma separated virtual user counts to sweep",
+    )
+    parser.add_argument("--duration", type=float, default=30, help="seconds per level")
+    parser.add_argument("--warmup", type=float, default=5, help="seconds per level")
+    parser.add_argument("--think-ms", type=float, default=0)
+    parser.add_argument("--weights", default=DEFAULT_WEIGHTS)
+    parser.add_argument("--rajaongkir-latency-ms", type=float, default=150)
+    parser.add_argument("--midtrans-latency-ms", type=float, default=300)
+    parser.add_argument("--jitter-ms", type=float, default=50)
+    parser.add_argument("--shipment-cache-ttl", type=int, default=None)
+    parser.add_argument("--slo-p95-ms", type=float, default=500)
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument(
+        "--mongo-uri", default=None, help="real MongoDB instead of mongomock"
+    )
+    parser.add_argument(
+        "--database-uri",
+        default=None,
+        help="an empty database instead of a temporary SQLite file",
+    )
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default=None, help="write the report as json")
+
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    try:
+        weights = parse_weights(args.weights)
+        levels = [int(level) for level in args.concurrency.split(",") if level]
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        return 2
+
+    print(
+        f"Seeding {args.products} products, {args.sellers} sellers, "
+        f"{args.users} users..."
+    )
+    env = BenchEnvironment(
+        products=args.products,
+        sellers=args.sellers,
+        users=args.users,
+        rajaongkir_latency_ms=args.rajaongkir_latency_ms,
+        midtrans_latency_ms=args.midtrans_latency_ms,
+        jitter_ms=args.jitter_ms,
+        shipment_cache_ttl=args.shipment_cache_ttl,
+        mongo_uri=args.mongo_uri,
+        database_uri=args.database_uri,
+        seed=args.seed,
+    ).start()
+
+    results = {}
+    try:
+        journeys = Journeys(env.serve(), env.midtrans_url, LoadData(env, args.seed))
+
+        for concurrency in levels:
+            print(f"{concurrency} users for {args.duration:g}s...")
+            results[concurrency] = asyncio.run(
+                run_level(
+                    journeys,
+                    weights,
+                    concurrency,
+                    args.duration,
+                    args.warmup,
+                    args.think_ms,
+                    args.seed,
+                )
+            )
+    finally:
+        env.stop()
+
+    print()
+    print_report(results, args.slo_p95_ms, args.max_error_rate)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "products": args.products,
+                    "sellers": args.sellers,
+                    "users": args.users,
+                    "weights": weights,
+                    "think_ms": args.think_ms,
+                    "rajaongkir_latency_ms": args.rajaongkir_latency_ms,
+                    "midtrans_latency_ms": args.midtrans_latency_ms,
+                    "levels": results,
+                },
+                f,
+                indent=2,
+            )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,246 @@
+import sys
+import json
+import time
+import argparse
+import platform
+
+from app.instrumentation import QueryBudget
+from .environment import BenchEnvironment
+from .scenarios import SCENARIOS, DEFAULT_CART_LINES
+
+DEFAULT_BASELINE = "benchmarks/baseline.json"
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def run_scenario(scenario, env, iterations, warmup):
+    scenario.setup(warmup + iterations)
+
+    for index in range(warmup):
+        scenario.run(index)
+
+    durations = []
+    queries = 0
+    max_repeats = 0
+    started = time.perf_counter()
+
+    for index in range(warmup, warmup + iterations):
+        before = env.counter.value() if env else 0
+        # only sees statements of this thread, the counter sees every thread
+        with QueryBudget(max_repeats=None, strict=False) as budget:
+            operation_started = time.perf_counter()
+            scenario.run(index)
+            durations.append((time.perf_counter() - operation_started) * 1000)
+
+        if env:
+            queries += env.counter.value() - before
+        max_repeats = max([max_repeats, *budget.shapes.values()])
+
+    elapsed = time.perf_counter() - started
+
+    return {
+        "iterations": iterations,
+        "p50_ms": round(percentile(durations, 0.50), 3),
+        "p95_ms": round(percentile(durations, 0.95), 3),
+        "p99_ms": round(percentile(durations, 0.99), 3),
+        "mean_ms": round(sum(durations) / len(durations), 3),
+        "throughput_ops": round(iterations / elapsed, 1),
+        "queries_per_op": round(queries / iterations, 2),
+        "max_repeated_query": max_repeats,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Regressions against the stored baseline, as readable lines."""
+    regressions = []
+
+    for name, result in results.items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if previous is None:
+            continue
+
+        if result["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append(
+                f"{name}: p95 {result['p95_ms']}ms, baseline {previous['p95_ms']}ms"
+            )
+        if result["throughput_ops"] < previous["throughput_ops"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: throughput {result['throughput_ops']} ops/s, "
+                f"baseline {previous['throughput_ops']} ops/s"
+            )
+        # query counts are deterministic, any increase is a regression
+        if result["queries_per_op"] > previous["queries_per_op"]:
+            regressions.append(
+                f"{name}: {result['queries_per_op']} queries/op, "
+                f"baseline {previous['queries_per_op']}"
+            )
+
+    return regressions
+
+
+def print_table(results):
+    header = (
+        f"{'scenario':<20}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+        f"{'ops/s':>10}{'queries':>10}{'repeat':>8}"
+    )
+    print(header)
+    print("-" * len(header))
+
+    for name, result in results.items():
+        print(
+            f"{name:<20}{result['p50_ms']:>10}{result['p95_ms']:>10}"
+            f"{result['p99_ms']:>10}{result['throughput_ops']:>10}"
+            f"{result['queries_per_op']:>10}{result['max_repeated_query']:>8}"
+        )
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Checkout hot path benchmarks against local stand-ins"
+    )
+    parser.add_argument("--products", type=int, default=10_000)
+    parser.add_argument("--sellers", type=int, default=200)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument(
+        "--cart-lines",
+        type=int,
+        default=DEFAULT_CART_LINES,
+        help="lines per cart in the cart_pricing scenarios",
+    )
+    parser.add_argument(
+        "--scenarios",
+        default=",".join(SCENARIOS),
+        help="comma separated, default all: " + ", ".join(SCENARIOS),
+    )
+    parser.add_argument("--rajaongkir-latency-ms", type=float, default=0)
+    parser.add_argument("--midtrans-latency-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--shipment-cache-ttl", type=int, default=None)
+    parser.add_argument(
+        "--mongo-uri", default=None, help="real MongoDB instead of mongomock"
+    )
+    parser.add_argument(
+        "--database-uri",
+        default=None,
+        help="an empty database instead of a temporary SQLite file",
+    )
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument(
+        "--write-baseline",
+        action="store_true",
+        help="store the results as the new baseline instead of comparing",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="allowed relative p95 / throughput regression",
+    )
+    parser.add_argument("--output", default=None, help="write results as json")
+
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    names = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        print(f"Unknown scenarios: {', '.join(unknown)}", file=sys.stderr)
+        return 2
+
+    scenarios = [SCENARIOS[name] for name in names]
+    env = None
+
+    if any(scenario.needs_env for scenario in scenarios):
+        print(
+            f"Seeding {args.products} products, {args.sellers} sellers, "
+            f"{args.users} users..."
+        )
+        env = BenchEnvironment(
+            products=args.products,
+            sellers=args.sellers,
+            users=args.users,
+            rajaongkir_latency_ms=args.rajaongkir_latency_ms,
+            midtrans_latency_ms=args.midtrans_latency_ms,
+            jitter_ms=args.jitter_ms,
+            shipment_cache_ttl=args.shipment_cache_ttl,
+            mongo_uri=args.mongo_uri,
+            database_uri=args.database_uri,
+            seed=args.seed,
+        ).start()
+
+    results = {}
+    try:
+        for scenario_class in scenarios:
+            scenario = scenario_class(
+                env if scenario_class.needs_env else None,
+                seed=args.seed,
+                cart_lines=args.cart_lines,
+            )
+            results[scenario.name] = run_scenario(
+                scenario,
+                env if scenario_class.needs_env else None,
+                args.iterations,
+                args.warmup,
+            )
+    finally:
+        if env is not None:
+            env.stop()
+
+    print_table(results)
+
+    report = {
+        "python": platform.python_version(),
+        "products": args.products,
+        "sellers": args.sellers,
+        "users": args.users,
+        "cart_lines": args.cart_lines,
+        "rajaongkir_latency_ms": args.rajaongkir_latency_ms,
+        "midtrans_latency_ms": args.midtrans_latency_ms,
+        "scenarios": results,
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.write_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    try:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        print(f"No baseline at {args.baseline}, run with --write-baseline")
+        return 0
+
+    scale = ("products", "sellers", "users", "cart_lines")
+    if any(baseline.get(key) != report[key] for key in scale):
+        print("Baseline was recorded at a different catalog size, not comparing")
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print("Regressions against baseline:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+
+    print("No regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,245 @@
+import time
+import random
+import sqlite3
+
+from app.models.webhook_inbox import webhook_inbox_status
+from app.controllers.calculators.cart_pricing import CartPricing
+from standins import signed_notification
+from .environment import MIDTRANS_SERVER_KEY
+from .legacy_pricing import legacy_cart_pricing
+
+WEBHOOK_TIMEOUT_SECONDS = 30
+DEFAULT_CART_LINES = 200
+
+
+class BenchmarkError(Exception):
+    pass
+
+
+def expect(response, status_codes=(200,)):
+    if response.status_code not in status_codes:
+        raise BenchmarkError(
+            f"{response.request.method} {response.request.path} returned "
+            f"{response.status_code}: {response.get_data(as_text=True)[:300]}"
+        )
+
+    return response
+
+
+class Scenario:
+    """
+    setup() runs once before the timed loop (untimed), run(index) is one
+    timed operation. needs_env is False for pure CPU benchmarks.
+    """
+
+    name = None
+    needs_env = True
+
+    def __init__(self, env=None, seed=1, cart_lines=DEFAULT_CART_LINES):
+        self.env = env
+        self.randomizer = random.Random(seed)
+        self.cart_lines = cart_lines
+
+    def setup(self, operations):
+        pass
+
+    def run(self, index):
+        raise NotImplementedError
+
+    def user(self, index):
+        return self.env.catalog.user_ids[index % len(self.env.catalog.user_ids)]
+
+    def user_headers(self, user_id):
+        token = self.env.token("user", user_id)
+        return {"Authorization": f"Bearer {token}"}
+
+    def checkout_payload(self, user_id):
+        items = self.env.carts[user_id]
+        seller_ids = sorted(
+            {self.env.catalog.product_sellers[item["product_id"]] for item in items}
+        )
+
+        return {
+            "carts": items,
+            "user_selected_address_id": self.env.catalog.user_address_ids[user_id],
+            "selected_courier": [
+                {
+                    "seller_id": seller_id,
+                    "selected_courier": "jne",
+                    "selected_service": "REG",
+                }
+                for seller_id in seller_ids
+            ],
+        }
+
+
+class CartPricingScenario(Scenario):
+    """Columnar cart pricing on its own, no database."""
+
+    name = "cart_pricing"
+    needs_env = False
+
+    def setup(self, operations):
+        lines = range(self.cart_lines)
+        self.columns = {
+            "seller_ids": [self.randomizer.randint(1, 20) for _ in lines],
+            "prices": [self.randomizer.randint(10, 2000) * 1000 for _ in lines],
+            "quantities": [self.randomizer.randint(1, 5) for _ in lines],
+            "weights_kg": [round(self.randomizer.uniform(0.1, 5), 2) for _ in lines],
+            "volumes_m3": [
+                round(self.randomizer.uniform(0.0001, 0.05), 5) for _ in lines
+            ],
+        }
+
+    def run(self, index):
+        pricing = CartPricing(**self.columns)
+        pricing.seller_totals()
+        for line in range(self.cart_lines):
+            pricing.line(line)
+
+
+class LegacyCartPricingScenario(CartPricingScenario):
+    """The per-line loop CartPricing replaced, on the same cart."""
+
+    name = "cart_pricing_legacy"
+
+    def run(self, index):
+        legacy_cart_pricing(**self.columns)
+
+
+class ProductBrowseScenario(Scenario):
+    name = "product_browse"
+
+    def setup(self, operations):
+        catalog = self.env.catalog
+        self.queries = [
+            {"category": catalog.category_ids[i % len(catalog.category_ids)]}
+            for i in range(10)
+        ] + [
+            {"province_id": catalog.province_ids[i % len(catalog.province_ids)]}
+            for i in range(10)
+        ] + [{"rating": "desc"}, {"price": "asc"}]
+
+    def run(self, index):
+        query = {**self.queries[index % len(self.queries)], "per_page": 20}
+        # an empty filter result is a 400 in this API, that is still a valid read
+        expect(
+            self.env.client.get("/api/products/user/query", query_string=query),
+            (200, 400),
+        )
+
+
+class ListCartScenario(Scenario):
+    name = "list_cart"
+
+    def setup(self, operations):
+        self.headers = {
+            user_id: self.user_headers(user_id)
+            for user_id in self.env.catalog.user_ids
+        }
+        self.payloads = {
+            user_id: self.checkout_payload(user_id)
+            for user_id in self.env.catalog.user_ids
+        }
+
+    def run(self, index):
+        user_id = self.user(index)
+        expect(self.env.client.get("/api/carts/list", headers=self.headers[user_id]))
+
+
+class CalculateCartScenario(ListCartScenario):
+    name = "calculate_cart"
+
+    def run(self, index):
+        user_id = self.user(index)
+        expect(
+            self.env.client.post(
+                "/api/calculators/calculatecart",
+                json=self.payloads[user_id],
+                headers=self.headers[user_id],
+            )
+        )
+
+
+class CreateTransactionScenario(ListCartScenario):
+    name = "create_transaction"
+
+    def run(self, index):
+        user_id = self.user(index)
+        return expect(
+            self.env.client.post(
+                "/api/transactions/create",
+                json=self.payloads[user_id],
+                headers=self.headers[user_id],
+            ),
+            (201,),
+        )
+
+
+class MidtransWebhookScenario(CreateTransactionScenario):
+    """
+    Settlement notification from POST to the inbox entry being processed
+    by the webhook worker. Orders are created untimed in setup.
+    """
+
+    name = "midtrans_webhook"
+
+    def setup(self, operations):
+        if self.env.database_path is None:
+            raise BenchmarkError("The webhook scenario polls the SQLite database")
+
+        super().setup(operations)
+
+        for index in range(operations):
+            super().run(index)
+
+        # poll with a separate sqlite connection so waiting adds no
+        # statements to the app's count
+        self.poller = sqlite3.connect(self.env.database_path, timeout=30)
+        self.orders = self.poller.execute(
+            "SELECT parent_id, SUM(gross_amount) FROM transactions "
+            "WHERE transaction_status = 1 GROUP BY parent_id ORDER BY parent_id"
+        ).fetchall()
+
+        if len(self.orders) < operations:
+            raise BenchmarkError("Not enough unpaid orders for the webhook scenario")
+
+    def run(self, index):
+        order_id, gross_amount = self.orders[index]
+        notification = signed_notification(
+            order_id, "settlement", gross_amount, MIDTRANS_SERVER_KEY
+        )
+        expect(
+            self.env.client.post("/api/transactions/confirmation", json=notification)
+        )
+
+        deadline = time.monotonic() + WEBHOOK_TIMEOUT_SECONDS
+        while time.monotonic() < deadline:
+            (status,) = self.poller.execute(
+                "SELECT status FROM webhook_inbox WHERE order_id = ? "
+                "AND transaction_status = 'settlement'",
+                (order_id,),
+            ).fetchone() or (None,)
+
+            if status == webhook_inbox_status.DONE.value:
+                return
+            if status == webhook_inbox_status.FAILED.value:
+                raise BenchmarkError(f"Webhook for {order_id} failed")
+
+            time.sleep(0.001)
+
+        raise BenchmarkError(f"Webhook for {order_id} was not processed in time")
+
+
+SCENARIOS = {
+    scenario.name: scenario
+    for scenario in [
+        CartPricingScenario,
+        LegacyCartPricingScenario,
+        ProductBrowseScenario,
+        ListCartScenario,
+        CalculateCartScenario,
+        CreateTransactionScenario,
+        MidtransWebhookScenario,
+    ]
+}
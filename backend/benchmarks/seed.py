@@ -0,0 +1,238 @@
+import json
+import random
+
+from sqlalchemy import insert
+
+from app.db import db
+from app.models import (
+    Provinces,
+    Districts,
+    Categories,
+    Shipments,
+    Sellers,
+    Users,
+    Addresses,
+    ShippingOptions,
+    Products,
+    ProductImages,
+)
+
+RAJAONGKIR_FILE = "rajaongkir.json"
+CATEGORY_FILE = "category.json"
+VENDORS = ["jne", "pos", "tiki"]
+CHUNK_SIZE = 5000
+
+
+class SeededCatalog:
+    """Ids the scenarios need to build valid requests."""
+
+    def __init__(self):
+        self.user_ids = []
+        self.user_address_ids = {}
+        self.seller_ids = []
+        self.products_by_seller = {}
+        self.product_sellers = {}
+        self.district_ids = []
+        self.province_ids = []
+        self.category_ids = []
+
+
+def read_json(filename):
+    with open(filename, "r") as f:
+        return json.load(f)
+
+
+def insert_chunks(model, rows):
+    for start in range(0, len(rows), CHUNK_SIZE):
+        db.session.execute(insert(model), rows[start : start + CHUNK_SIZE])
+
+
+def seed_catalog(products=10_000, sellers=200, users=100, seed=1):
+    """
+    Deterministic synthetic catalog: districts and categories from the
+    repo's json files, every seller ships with all couriers from one
+    address, products are spread evenly over sellers.
+    """
+    randomizer = random.Random(seed)
+    catalog = SeededCatalog()
+
+    districts = read_json(RAJAONGKIR_FILE)["rajaongkir"]["results"]
+    provinces = {int(d["province_id"]): d["province"] for d in districts}
+
+    insert_chunks(
+        Provinces,
+        [{"id": pid, "province": name} for pid, name in sorted(provinces.items())],
+    )
+    insert_chunks(
+        Districts,
+        [
+            {
+                "id": int(d["city_id"]),
+                "province_id": int(d["province_id"]),
+                "district": d["city_name"],
+            }
+            for d in districts
+        ],
+    )
+    # SMALLINT primary key, SQLite only autoincrements INTEGER ones
+    insert_chunks(
+        Categories,
+        [
+            {"id": category_id, **category}
+            for category_id, category in enumerate(read_json(CATEGORY_FILE), start=1)
+        ],
+    )
+    insert_chunks(Shipments, [{"vendor_name": vendor} for vendor in VENDORS])
+
+    catalog.district_ids = [int(d["city_id"]) for d in districts]
+    catalog.province_ids = sorted(provinces)
+    catalog.category_ids = [
+        category_id for (category_id,) in db.session.query(Categories.id).all()
+    ]
+    district_provinces = {int(d["city_id"]): int(d["province_id"]) for d in districts}
+
+    def address(index, owner_field, owner_id):
+        district_id = randomizer.choice(catalog.district_ids)
+        return {
+            "receiver_name": f"Receiver {index}",
+            "phone_number": f"08{index:010d}",
+            "address_type": "home",
+            "address_line": f"Jalan Benchmark {index}",
+            "province_id": district_provinces[district_id],
+            "district_id": district_id,
+            "postal_code": "12345",
+            owner_field: owner_id,
+        }
+
+    insert_chunks(
+        Sellers,
+        [
+            {
+                "email": f"seller{index}@bench.local",
+                "password": "benchmark",
+                "phone_number": f"081{index:09d}",
+                "store_name": f"Store {index}",
+                "store_image_url": f"https://img.bench.local/store/{index}.jpg",
+            }
+            for index in range(sellers)
+        ],
+    )
+    catalog.seller_ids = [
+        seller_id
+        for (seller_id,) in db.session.query(Sellers.id).order_by(Sellers.id).all()
+    ]
+
+    insert_chunks(
+        Addresses,
+        [
+            address(index, "seller_id", seller_id)
+            for index, seller_id in enumerate(catalog.seller_ids)
+        ],
+    )
+
+    shipment_ids = [shipment_id for (shipment_id,) in db.session.query(Shipments.id)]
+    insert_chunks(
+        ShippingOptions,
+        [
+            {"seller_id": seller_id, "shipment_id": shipment_id, "is_active": 1}
+            for seller_id in catalog.seller_ids
+            for shipment_id in shipment_ids
+        ],
+    )
+
+    insert_chunks(
+        Users,
+        [
+            {
+                "username": f"user{index}",
+                "fullname": f"User {index}",
+                "email": f"user{index}@bench.local",
+                "password": "benchmark",
+                "phone_number": f"082{index:09d}",
+                "balance": 0,
+            }
+            for index in range(users)
+        ],
+    )
+    catalog.user_ids = [
+        user_id for (user_id,) in db.session.query(Users.id).order_by(Users.id).all()
+    ]
+
+    insert_chunks(
+        Addresses,
+        [
+            address(sellers + index, "user_id", user_id)
+            for index, user_id in enumerate(catalog.user_ids)
+        ],
+    )
+    catalog.user_address_ids = dict(
+        db.session.query(Addresses.user_id, Addresses.id)
+        .filter(Addresses.user_id.isnot(None))
+        .all()
+    )
+
+    product_rows = []
+    for index in range(products):
+        length, width, height = (randomizer.randint(5, 60) for _ in range(3))
+        product_rows.append(
+            {
+                "name": f"Product {index}",
+                "description": "Synthetic benchmark product",
+                "price": randomizer.randint(10, 2000) * 1000,
+                "weight_kg": round(randomizer.uniform(0.1, 5), 2),
+                "volume_m3": round(length * width * height / 1_000_000, 5),
+                "length_cm": length,
+                "width_cm": width,
+                "height_cm": height,
+                # large enough that checkout runs never sell out
+                "stock": 30_000,
+                "product_type": 1,
+                "category_id": randomizer.choice(catalog.category_ids),
+                "seller_id": catalog.seller_ids[index % len(catalog.seller_ids)],
+                "is_active": 1,
+                "avg_rating": round(randomizer.uniform(0, 5), 2),
+            }
+        )
+    insert_chunks(Products, product_rows)
+
+    for product_id, seller_id in db.session.query(Products.id, Products.seller_id):
+        catalog.products_by_seller.setdefault(seller_id, []).append(product_id)
+        catalog.product_sellers[product_id] = seller_id
+
+    insert_chunks(
+        ProductImages,
+        [
+            {
+                "product_id": product_id,
+                "image_public_id": f"bench/{product_id}",
+                "image_secure_url": f"https://img.bench.local/{product_id}.jpg",
+            }
+            for product_ids in catalog.products_by_seller.values()
+            for product_id in product_ids
+        ],
+    )
+
+    db.session.commit()
+
+    return catalog
+
+
+def seed_carts(mongo, catalog, sellers_per_cart=2, items_per_seller=2, seed=1):
+    """One cart per user with products from a few sellers."""
+    randomizer = random.Random(seed)
+    carts = {}
+
+    for user_id in catalog.user_ids:
+        items = []
+        for seller_id in randomizer.sample(catalog.seller_ids, sellers_per_cart):
+            for product_id in randomizer.sample(
+                catalog.products_by_seller[seller_id], items_per_seller
+            ):
+                items.append(
+                    {"product_id": product_id, "quantity": randomizer.randint(1, 3)}
+                )
+
+        carts[user_id] = items
+        mongo.db.carts.replace_one({"_id": user_id}, {"items": items}, upsert=True)
+
+    return carts
@@ -0,0 +1,3 @@
+from .rajaongkir import create_rajaongkir_app
+from .midtrans import create_midtrans_app, signed_notification
+from .serving import serve_in_thread
@@ -0,0 +1,165 @@
+import time
+import uuid
+import random
+import hashlib
+import argparse
+import threading
+from datetime import datetime
+
+from flask import Flask, request
+
+
+def signed_notification(
+    order_id,
+    transaction_status,
+    gross_amount,
+    server_key,
+    status_code="200",
+    payment_type="bank_transfer",
+    fraud_status="accept",
+):
+    """A Midtrans HTTP notification body with a valid signature_key."""
+    gross_amount = f"{float(gross_amount):.2f}"
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    payload = order_id + status_code + gross_amount + server_key
+
+    return {
+        "transaction_id": str(uuid.uuid4()),
+        "transaction_time": now,
+        "settlement_time": now if transaction_status == "settlement" else None,
+        "transaction_status": transaction_status,
+        "status_code": status_code,
+        "gross_amount": gross_amount,
+        "order_id": order_id,
+        "payment_type": payment_type,
+        "fraud_status": fraud_status,
+        "signature_key": hashlib.sha512(payload.encode("utf-8")).hexdigest(),
+    }
+
+
+def create_midtrans_app(config=None):
+    """
+    Local stand-in for the Midtrans Snap create transaction API. Point
+    MIDTRANS_SNAP_BASE_URL at it; every order it accepts is kept so the
+    caller can send matching notifications with signed_notification.
+    """
+    app = Flask(__name__)
+    app.config.update(
+        LATENCY_MS=0,
+        JITTER_MS=0,
+        ERROR_RATE=0.0,
+        SEED=None,
+    )
+    app.config.update(config or {})
+
+    randomizer = random.Random(app.config["SEED"])
+    lock = threading.Lock()
+    orders = {}
+    tokens = {}
+    counters = {"requests": 0, "errors": 0}
+
+    def draw():
+        with lock:
+            return randomizer.random(), randomizer.random()
+
+    # midtransclient appends its own version path to the base url
+    @app.route("/transactions", methods=["POST"])
+    @app.route("/<path:prefix>/transactions", methods=["POST"])
+    def create_transaction(prefix=None):
+        body = request.get_json(silent=True) or {}
+        details = body.get("transaction_details") or {}
+        order_id = details.get("order_id")
+
+        with lock:
+            counters["requests"] += 1
+
+        delay, failure = draw()
+        latency = app.config["LATENCY_MS"] + delay * app.config["JITTER_MS"]
+        if latency:
+            time.sleep(latency / 1000)
+
+        if failure < app.config["ERROR_RATE"]:
+            with lock:
+                counters["errors"] += 1
+            return {
+                "error_messages": [
+                    "Sorry. Our system is recovering from unexpected issues."
+                ]
+            }, 500
+
+        if not order_id or details.get("gross_amount") is None:
+            return {"error_messages": ["transaction_details is required"]}, 400
+
+        with lock:
+            if order_id in orders:
+                return {
+                    "error_messages": [
+                        "transaction_details.order_id sudah digunakan"
+                    ]
+                }, 409
+
+            token = uuid.uuid4().hex
+            orders[order_id] = {
+                "gross_amount": details["gross_amount"],
+                "token": token,
+            }
+            tokens[token] = order_id
+
+        return {
+            "token": token,
+            "redirect_url": f"{request.host_url}snap/v4/redirection/{token}",
+        }, 201
+
+    @app.route("/orders/<order_id>", methods=["GET"])
+    def get_order(order_id):
+        with lock:
+            order = orders.get(order_id)
+
+        if order is None:
+            return {"error": "Order not found"}, 404
+
+        return {"order_id": order_id, **order}, 200
+
+    # the Snap response only carries the token, load tests look the order
+    # up here to send its notification
+    @app.route("/tokens/<token>", methods=["GET"])
+    def get_order_by_token(token):
+        with lock:
+            order_id = tokens.get(token)
+
+        if order_id is None:
+            return {"error": "Token not found"}, 404
+
+        return get_order(order_id)
+
+    @app.route("/stats", methods=["GET"])
+    def stats():
+        with lock:
+            return {**counters, "orders": len(orders)}, 200
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Midtrans Snap stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5056)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    app = create_midtrans_app(
+        {
+            "LATENCY_MS": args.latency_ms,
+            "JITTER_MS": args.jitter_ms,
+            "ERROR_RATE": args.error_rate,
+            "SEED": args.seed,
+        }
+    )
+    app.run(host=args.host, port=args.port, threaded=True)
+
+
+if __name__ == "__main__":
+    main()
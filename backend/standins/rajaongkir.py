@@ -0,0 +1,295 @@
+import os
+import json
+import math
+import time
+import random
+import hashlib
+import argparse
+import threading
+
+import requests
+from flask import Flask, request
+
+
+DISTRICTS_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "rajaongkir.json"
+)
+
+COURIERS = {
+    "jne": {
+        "name": "Jalur Nugraha Ekakurir (JNE)",
+        "services": [
+            ("OKE", "Ongkos Kirim Ekonomis", 0.8, 2),
+            ("REG", "Layanan Reguler", 1.0, 1),
+            ("YES", "Yakin Esok Sampai", 1.8, 0),
+        ],
+    },
+    "pos": {
+        "name": "POS Indonesia (POS)",
+        "services": [
+            ("Pos Reguler", "Pos Reguler", 0.9, 2),
+            ("Pos Nextday", "Pos Nextday", 1.6, 0),
+        ],
+    },
+    "tiki": {
+        "name": "Citra Van Titipan Kilat (TIKI)",
+        "services": [
+            ("ECO", "Economy Service", 0.75, 3),
+            ("REG", "Regular Service", 1.0, 1),
+            ("ONS", "Over Night Service", 1.7, 0),
+        ],
+    },
+}
+
+
+def load_districts(path=DISTRICTS_FILE):
+    with open(path, "r") as f:
+        data = json.load(f)
+
+    return {
+        district["city_id"]: district for district in data["rajaongkir"]["results"]
+    }
+
+
+def fixture_key(params):
+    key = ":".join(
+        str(params.get(name, ""))
+        for name in ("origin", "destination", "weight", "courier")
+    )
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+def rajaongkir_body(query, code, description, **extra):
+    return {
+        "rajaongkir": {
+            "query": query,
+            "status": {"code": code, "description": description},
+            **extra,
+        }
+    }
+
+
+def generate_costs(origin, destination, weight, courier):
+    """
+    Deterministic prices: the same (origin, destination, courier) always
+    gets the same per-kg rate, provinces apart cost more than districts
+    in the same province.
+    """
+    seed = hashlib.sha1(
+        f"{origin['city_id']}:{destination['city_id']}:{courier}".encode()
+    ).digest()
+    rate = 6000 + int.from_bytes(seed[:2], "big") % 9000
+
+    if origin["province_id"] != destination["province_id"]:
+        rate += 12000
+
+    kilograms = max(1, math.ceil(weight / 1000))
+    base_etd = 1 if origin["province_id"] == destination["province_id"] else 3
+
+    costs = []
+    for service, description, multiplier, extra_days in COURIERS[courier]["services"]:
+        etd = base_etd + extra_days
+        costs.append(
+            {
+                "service": service,
+                "description": description,
+                "cost": [
+                    {
+                        "value": int(round(rate * multiplier * kilograms, -2)),
+                        "etd": f"{etd}-{etd + 1}",
+                        "note": "",
+                    }
+                ],
+            }
+        )
+
+    return costs
+
+
+def create_rajaongkir_app(config=None):
+    """
+    Local stand-in for the RajaOngkir /cost endpoint.
+
+    Modes:
+        generate - deterministic prices from rajaongkir.json districts
+        record   - forward to UPSTREAM_URL and store each response as a fixture
+        replay   - serve stored fixtures, falling back to generate
+    """
+    app = Flask(__name__)
+    app.config.update(
+        MODE="generate",
+        LATENCY_MS=0,
+        JITTER_MS=0,
+        ERROR_RATE=0.0,
+        SEED=None,
+        API_KEY=None,
+        UPSTREAM_URL=None,
+        FIXTURES_DIR=os.path.join(os.path.dirname(__file__), "fixtures"),
+        STRICT_REPLAY=False,
+    )
+    app.config.update(config or {})
+
+    districts = load_districts()
+    randomizer = random.Random(app.config["SEED"])
+    lock = threading.Lock()
+    counters = {"requests": 0, "errors": 0, "recorded": 0, "replayed": 0}
+
+    def draw():
+        with lock:
+            return randomizer.random(), randomizer.random()
+
+    def count(counter):
+        with lock:
+            counters[counter] += 1
+
+    def fixture_path(params):
+        return os.path.join(app.config["FIXTURES_DIR"], f"{fixture_key(params)}.json")
+
+    def record(params):
+        response = requests.post(app.config["UPSTREAM_URL"], data=params, timeout=30)
+        body = response.json()
+
+        if response.status_code == 200:
+            os.makedirs(app.config["FIXTURES_DIR"], exist_ok=True)
+            with open(fixture_path(params), "w") as f:
+                json.dump(body, f, indent=2)
+            count("recorded")
+
+        return body, response.status_code
+
+    def replay(params):
+        path = fixture_path(params)
+        if not os.path.exists(path):
+            return None
+
+        with open(path, "r") as f:
+            count("replayed")
+            return json.load(f), 200
+
+    def generate(params, query):
+        origin = districts.get(str(params.get("origin")))
+        destination = districts.get(str(params.get("destination")))
+        courier = params.get("courier")
+
+        if origin is None or destination is None:
+            return (
+                rajaongkir_body(
+                    query, 400, "Bad request. Kota asal atau tujuan tidak ditemukan."
+                ),
+                400,
+            )
+
+        if courier not in COURIERS:
+            return (
+                rajaongkir_body(query, 400, "Bad request. Kurir tidak valid."),
+                400,
+            )
+
+        try:
+            weight = int(float(params.get("weight")))
+        except (TypeError, ValueError):
+            return (
+                rajaongkir_body(query, 400, "Bad request. Weight harus diisi."),
+                400,
+            )
+
+        return (
+            rajaongkir_body(
+                query,
+                200,
+                "OK",
+                origin_details=origin,
+                destination_details=destination,
+                results=[
+                    {
+                        "code": courier,
+                        "name": COURIERS[courier]["name"],
+                        "costs": generate_costs(origin, destination, weight, courier),
+                    }
+                ],
+            ),
+            200,
+        )
+
+    @app.route("/cost", methods=["POST"])
+    def cost():
+        params = request.form.to_dict()
+        query = {name: value for name, value in params.items() if name != "key"}
+        count("requests")
+
+        delay, failure = draw()
+        latency = app.config["LATENCY_MS"] + delay * app.config["JITTER_MS"]
+        if latency:
+            time.sleep(latency / 1000)
+
+        if app.config["API_KEY"] and params.get("key") != app.config["API_KEY"]:
+            return rajaongkir_body(query, 400, "Invalid key."), 400
+
+        if failure < app.config["ERROR_RATE"]:
+            count("errors")
+            return (
+                rajaongkir_body(query, 503, "Service temporarily unavailable."),
+                503,
+            )
+
+        mode = app.config["MODE"]
+
+        if mode == "record":
+            return record(params)
+
+        if mode == "replay":
+            replayed = replay(params)
+            if replayed is not None:
+                return replayed
+            if app.config["STRICT_REPLAY"]:
+                return rajaongkir_body(query, 404, "No recorded fixture."), 404
+
+        return generate(params, query)
+
+    @app.route("/stats", methods=["GET"])
+    def stats():
+        with lock:
+            return dict(counters), 200
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local RajaOngkir stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5055)
+    parser.add_argument(
+        "--mode", choices=["generate", "record", "replay"], default="generate"
+    )
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--key", default=None, help="reject requests with another key")
+    parser.add_argument("--upstream", default=os.getenv("RAJAONGKIR_UPSTREAM_LINK"))
+    parser.add_argument("--fixtures", default=None)
+    parser.add_argument("--strict", action="store_true")
+    args = parser.parse_args()
+
+    if args.mode == "record" and not args.upstream:
+        parser.error("--mode record needs --upstream (the real RajaOngkir cost URL)")
+
+    config = {
+        "MODE": args.mode,
+        "LATENCY_MS": args.latency_ms,
+        "JITTER_MS": args.jitter_ms,
+        "ERROR_RATE": args.error_rate,
+        "SEED": args.seed,
+        "API_KEY": args.key,
+        "UPSTREAM_URL": args.upstream,
+        "STRICT_REPLAY": args.strict,
+    }
+    if args.fixtures:
+        config["FIXTURES_DIR"] = args.fixtures
+
+    app = create_rajaongkir_app(config)
+    app.run(host=args.host, port=args.port, threaded=True)
+
+
+if __name__ == "__main__":
+    main()
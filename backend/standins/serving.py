@@ -0,0 +1,14 @@
+import threading
+
+from werkzeug.serving import make_server
+
+
+def serve_in_thread(app, host="127.0.0.1", port=0):
+    """Start the app on a background thread. Returns (server, base_url)."""
+    server = make_server(host, port, app, threaded=True)
+    thread = threading.Thread(
+        target=server.serve_forever, name=f"{app.name}-standin", daemon=True
+    )
+    thread.start()
+
+    return server, f"http://{host}:{server.server_port}"
@@ -0,0 +1,85 @@
+import pytest
+
+from benchmarks.environment import BenchEnvironment
+
+# small enough to seed in a second, large enough that every seller has
+# more products than the biggest page the tests ask for
+PRODUCTS = 400
+SELLERS = 10
+USERS = 10
+
+
+@pytest.fixture(scope="session")
+def env():
+    """The real app on SQLite + mongomock with the local stand-ins."""
+    env = BenchEnvironment(products=PRODUCTS, sellers=SELLERS, users=USERS).start()
+
+    yield env
+
+    env.stop()
+
+
+@pytest.fixture(scope="session")
+def app(env):
+    return env.app
+
+
+@pytest.fixture(scope="session")
+def client(env):
+    return env.client
+
+
+@pytest.fixture(scope="session")
+def catalog(env):
+    return env.catalog
+
+
+@pytest.fixture
+def user_id(catalog):
+    return catalog.user_ids[0]
+
+
+@pytest.fixture
+def user_headers(env, user_id):
+    return {"Authorization": f"Bearer {env.token('user', user_id)}"}
+
+
+@pytest.fixture
+def seller_id(catalog):
+    return catalog.seller_ids[0]
+
+
+@pytest.fixture
+def seller_headers(env, seller_id):
+    return {"Authorization": f"Bearer {env.token('seller', seller_id)}"}
+
+
+@pytest.fixture(scope="session")
+def checkout_payload_for(env, catalog):
+    """Checkout body for a user's seeded cart, every seller on JNE REG."""
+
+    def build(user_id):
+        items = env.carts[user_id]
+        seller_ids = sorted(
+            {catalog.product_sellers[item["product_id"]] for item in items}
+        )
+
+        return {
+            "carts": items,
+            "user_selected_address_id": catalog.user_address_ids[user_id],
+            "selected_courier": [
+                {
+                    "seller_id": seller_id,
+                    "selected_courier": "jne",
+                    "selected_service": "REG",
+                }
+                for seller_id in seller_ids
+            ],
+        }
+
+    return build
+
+
+@pytest.fixture
+def checkout_payload(checkout_payload_for, user_id):
+    return checkout_payload_for(user_id)
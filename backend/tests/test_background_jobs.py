@@ -0,0 +1,63 @@
+import threading
+from datetime import datetime, timedelta
+import pytz
+
+from app.db import db
+from app.background_jobs import BackgroundJobsSweeper
+from app.controllers.webhook_inbox.webhook_inbox_runner import webhook_inbox_runner
+from app.controllers.webhook_inbox.webhook_inbox_repository import (
+    WebhookInboxRepository,
+)
+
+
+def add_pending_entry(app, order_id):
+    """A pending entry nobody submitted, as if its process died right after."""
+    with app.app_context():
+        entry = WebhookInboxRepository().create_entry(
+            {
+                "order_id": order_id,
+                "transaction_status": "pending",
+                "status_code": "201",
+            }
+        )
+        db.session.add(entry)
+        db.session.commit()
+        return entry.created_at
+
+
+def test_requeue_skips_entries_touched_after_stale_before(app):
+    created_at = add_pending_entry(app, "orphan-stale")
+
+    with app.app_context():
+        repository = WebhookInboxRepository()
+        before = repository.requeue_expired_entries(
+            stale_before=created_at - timedelta(seconds=1)
+        )
+        after = repository.requeue_expired_entries(
+            stale_before=datetime.now(pytz.UTC) + timedelta(seconds=1)
+        )
+        db.session.rollback()
+
+    assert "orphan-stale" not in before
+    assert "orphan-stale" in after
+
+
+def test_sweeper_recovers_on_startup(app, monkeypatch):
+    add_pending_entry(app, "orphan-startup")
+    submitted = threading.Event()
+
+    def submit(order_id, delay=0):
+        if order_id == "orphan-startup":
+            submitted.set()
+
+    monkeypatch.setattr(webhook_inbox_runner, "submit", submit)
+
+    sweeper = BackgroundJobsSweeper()
+    app.config["BACKGROUND_RECOVERY_INTERVAL_SECONDS"] = "3600"
+    try:
+        sweeper.init_app(app)
+        assert submitted.wait(10)
+    finally:
+        sweeper.stop()
+        sweeper.thread.join(10)
+        app.config["BACKGROUND_RECOVERY_INTERVAL_SECONDS"] = "0"
@@ -0,0 +1,87 @@
+import random
+
+import pytest
+
+from app.controllers.calculators.cart_pricing import CartPricing
+from benchmarks.legacy_pricing import legacy_cart_pricing
+
+CARTS = 200
+MAX_LINES = 500
+
+
+def random_cart(randomizer, lines, sellers):
+    return {
+        "seller_ids": [randomizer.randint(1, sellers) for _ in range(lines)],
+        "prices": [randomizer.randint(1, 20_000) * 100 for _ in range(lines)],
+        "quantities": [randomizer.randint(1, 50) for _ in range(lines)],
+        "weights_kg": [round(randomizer.uniform(0, 30), 3) for _ in range(lines)],
+        "volumes_m3": [
+            round(randomizer.uniform(0, 0.5), 6) for _ in range(lines)
+        ],
+    }
+
+
+def random_carts():
+    randomizer = random.Random(8)
+    sizes = [1, 2, MAX_LINES] + [
+        randomizer.randint(1, MAX_LINES) for _ in range(CARTS - 3)
+    ]
+
+    for size in sizes:
+        yield random_cart(randomizer, size, sellers=randomizer.randint(1, 30))
+
+
+def grouped_indexes(seller_ids):
+    """Line indexes in the order the legacy loop visited them."""
+    order = {}
+    for index, seller_id in enumerate(seller_ids):
+        order.setdefault(seller_id, []).append(index)
+
+    return [index for indexes in order.values() for index in indexes]
+
+
+@pytest.mark.parametrize("cart", list(random_carts()))
+def test_cart_pricing_matches_legacy_loop(cart):
+    pricing = CartPricing(**cart)
+    legacy_lines, legacy_totals = legacy_cart_pricing(**cart, carry_over=False)
+
+    for legacy_line, index in zip(legacy_lines, grouped_indexes(cart["seller_ids"])):
+        assert pricing.line(index) == pytest.approx(legacy_line)
+
+    totals = pricing.seller_totals()
+    assert list(totals) == list(legacy_totals)
+
+    for seller_id, legacy in legacy_totals.items():
+        assert (
+            totals[seller_id]["total_price_before_shipment"]
+            == legacy["total_price_before_shipment"]
+        )
+        assert totals[seller_id]["total_weight_gram"] == pytest.approx(
+            legacy["total_weight_gram"]
+        )
+
+
+@pytest.mark.parametrize("cart", list(random_carts()))
+def test_cart_pricing_first_seller_matches_unfixed_loop(cart):
+    # the old loop carried weights over from one seller to the next, so
+    # only the first seller's totals are comparable without the reset
+    _, legacy_totals = legacy_cart_pricing(**cart, carry_over=True)
+    first_seller = cart["seller_ids"][0]
+
+    assert CartPricing(**cart).seller_totals()[first_seller] == pytest.approx(
+        legacy_totals[first_seller]
+    )
+
+
+def test_volumetric_weight_counts_every_unit():
+    # 0.1 m3 is 20 volumetric kg per unit, heavier than the 1 kg actual
+    pricing = CartPricing(
+        seller_ids=[1],
+        prices=[10_000],
+        quantities=[3],
+        weights_kg=[1],
+        volumes_m3=[0.1],
+    )
+
+    assert pricing.line(0)["sub_volume_to_weight"] == pytest.approx(60)
+    assert pricing.seller_totals()[1]["total_weight_gram"] == pytest.approx(60_000)
@@ -0,0 +1,41 @@
+import pytest
+
+
+@pytest.fixture
+def cart_headers(env, catalog):
+    # a user of its own, the checkout tests use the seeded carts
+    return {"Authorization": f"Bearer {env.token('user', catalog.user_ids[2])}"}
+
+
+def test_cart_accepts_string_ids_and_quantities(client, catalog, cart_headers):
+    product_id = catalog.products_by_seller[catalog.seller_ids[1]][0]
+
+    response = client.post(
+        "/api/carts/createupdate",
+        json={"items": [{"product_id": str(product_id), "quantity": "2"}]},
+        headers=cart_headers,
+    )
+    assert response.status_code == 200
+
+    cart = client.get("/api/carts/list", headers=cart_headers).get_json()
+    quantities = {
+        item["detail_product"]["id"]: item["quantity"] for item in cart["items"]
+    }
+    assert quantities[product_id] == 2
+
+
+@pytest.mark.parametrize(
+    "item",
+    [
+        {"product_id": "abc", "quantity": 1},
+        {"product_id": 1, "quantity": "two"},
+        {"product_id": 1, "quantity": None},
+        {"quantity": 1},
+    ],
+)
+def test_cart_rejects_malformed_items(client, cart_headers, item):
+    response = client.post(
+        "/api/carts/createupdate", json={"items": [item]}, headers=cart_headers
+    )
+
+    assert response.status_code == 400
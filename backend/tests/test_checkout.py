@@ -0,0 +1,48 @@
+from app.db import db
+from app.models import Products, Transactions
+from app.models.transactions import transaction_status
+from app.controllers.transactions import transactions_controller
+
+
+def stocks(app, product_ids):
+    with app.app_context():
+        return dict(
+            db.session.query(Products.id, Products.stock)
+            .filter(Products.id.in_(product_ids))
+            .all()
+        )
+
+
+def test_failed_snap_call_cancels_the_reserved_order(
+    app, client, catalog, checkout_payload_for, env, monkeypatch
+):
+    user_id = catalog.user_ids[1]
+    headers = {"Authorization": f"Bearer {env.token('user', user_id)}"}
+    payload = checkout_payload_for(user_id)
+    product_ids = [item["product_id"] for item in payload["carts"]]
+    before = stocks(app, product_ids)
+
+    def unavailable(data, parent_id):
+        raise ConnectionError("Midtrans unavailable")
+
+    monkeypatch.setattr(
+        transactions_controller.service.midtrans_service,
+        "create_transaction",
+        unavailable,
+    )
+
+    response = client.post("/api/transactions/create", json=payload, headers=headers)
+
+    assert response.status_code == 500
+    # the reservation was committed before the call and given back after it
+    assert stocks(app, product_ids) == before
+
+    with app.app_context():
+        latest = (
+            Transactions.query.filter_by(user_id=user_id)
+            .order_by(Transactions.id.desc())
+            .first()
+        )
+        assert latest.transaction_status == transaction_status.CANCELED.value
+        assert latest.information == "Payment link failed"
+        assert latest.payment_link is None
@@ -0,0 +1,117 @@
+from app.instrumentation import QueryBudget, DEFAULT_QUERY_BUDGETS
+
+
+def within_budget(blueprint, label, send):
+    """
+    Run one request under the blueprint's production query budget,
+    QueryBudgetExceeded fails the test with the offending statements.
+    """
+    with QueryBudget(max_queries=DEFAULT_QUERY_BUDGETS[blueprint], label=label):
+        return send()
+
+
+def test_product_filter_within_budget(client):
+    response = within_budget(
+        "products_blueprint",
+        "products.filter",
+        lambda: client.get("/api/products/user/query", query_string={"per_page": 20}),
+    )
+
+    assert response.status_code == 200
+
+
+def test_product_detail_within_budget(client, catalog, seller_id):
+    product_id = catalog.products_by_seller[seller_id][0]
+
+    response = within_budget(
+        "products_blueprint",
+        "products.detail",
+        lambda: client.get(f"/api/products/user/product/{product_id}"),
+    )
+
+    assert response.status_code == 200
+
+
+def test_seller_product_list_within_budget(client, seller_headers):
+    response = within_budget(
+        "products_blueprint",
+        "products.seller_list",
+        lambda: client.get(
+            "/api/products/seller",
+            query_string={"per_page": 20},
+            headers=seller_headers,
+        ),
+    )
+
+    assert response.status_code == 200
+
+
+def test_cart_list_within_budget(client, user_headers):
+    response = within_budget(
+        "carts_blueprint",
+        "carts.list",
+        lambda: client.get("/api/carts/list", headers=user_headers),
+    )
+
+    assert response.status_code == 200
+
+
+def test_cart_update_within_budget(client, env, user_id, user_headers):
+    items = [{**item, "quantity": 1} for item in env.carts[user_id]]
+
+    response = within_budget(
+        "carts_blueprint",
+        "carts.createupdate",
+        lambda: client.post(
+            "/api/carts/createupdate", json={"items": items}, headers=user_headers
+        ),
+    )
+
+    assert response.status_code in (200, 201)
+
+
+def test_calculate_cart_within_budget(client, user_headers, checkout_payload):
+    response = within_budget(
+        "calculators_blueprint",
+        "calculators.calculatecart",
+        lambda: client.post(
+            "/api/calculators/calculatecart",
+            json=checkout_payload,
+            headers=user_headers,
+        ),
+    )
+
+    assert response.status_code == 200
+
+
+def test_create_transaction_within_budget(client, user_headers, checkout_payload):
+    response = within_budget(
+        "transactions_blueprint",
+        "transactions.create",
+        lambda: client.post(
+            "/api/transactions/create",
+            json=checkout_payload,
+            headers=user_headers,
+        ),
+    )
+
+    assert response.status_code == 201
+
+
+def test_transaction_history_within_budget(client, user_headers, checkout_payload):
+    created = client.post(
+        "/api/transactions/create", json=checkout_payload, headers=user_headers
+    )
+    assert created.status_code == 201
+
+    response = within_budget(
+        "transactions_blueprint",
+        "transactions.history",
+        lambda: client.get(
+            "/api/transactions/",
+            query_string={"per_page": 20},
+            headers=user_headers,
+        ),
+    )
+
+    assert response.status_code == 200
@@ -0,0 +1,111 @@
+from flask import request
+from sqlalchemy import func
+
+from app.db import db
+from app.models import Products
+from app.instrumentation import QueryBudget
+from app.controllers.products.product_services_user import ProductServicesUser
+
+SMALL_PAGE = 2
+LARGE_PAGE = 20
+
+
+def count_queries(send):
+    """(result of send(), statements it executed on this thread)"""
+    with QueryBudget(max_repeats=None, strict=False) as budget:
+        result = send()
+
+    return result, budget.count
+
+
+def assert_constant_per_page(send, key="products"):
+    """
+    send(per_page) -> (body, status_code); the statement count must not
+    grow with the page size, a lazy load per row would.
+    """
+    (small, small_status), small_count = count_queries(lambda: send(SMALL_PAGE))
+    (large, large_status), large_count = count_queries(lambda: send(LARGE_PAGE))
+
+    assert small_status == large_status == 200
+    assert len(small[key]) == SMALL_PAGE
+    assert len(large[key]) == LARGE_PAGE
+    assert large_count == small_count, (
+        f"{small_count} queries for {SMALL_PAGE} {key}, "
+        f"{large_count} for {LARGE_PAGE}"
+    )
+
+
+def get(client, path, **kwargs):
+    response = client.get(path, **kwargs)
+    return response.get_json(), response.status_code
+
+
+def test_product_filter_queries_constant_per_page(client):
+    assert_constant_per_page(
+        lambda per_page: get(
+            client, "/api/products/user/query", query_string={"per_page": per_page}
+        )
+    )
+
+
+def test_product_category_queries_constant_per_page(app):
+    with app.app_context():
+        category_id, products = (
+            db.session.query(Products.category_id, func.count())
+            .group_by(Products.category_id)
+            .order_by(func.count().desc())
+            .first()
+        )
+
+    # otherwise the large page is short and the comparison proves nothing
+    assert products >= LARGE_PAGE, f"category {category_id} has {products} products"
+
+    def send(per_page):
+        # not routed, called the way a controller would
+        with app.test_request_context(query_string={"per_page": per_page}):
+            return ProductServicesUser().get_product_by_category(category_id, request)
+
+    assert_constant_per_page(send)
+
+
+def test_seller_product_list_queries_constant_per_page(client, seller_headers):
+    assert_constant_per_page(
+        lambda per_page: get(
+            client,
+            "/api/products/seller",
+            query_string={"per_page": per_page},
+            headers=seller_headers,
+        )
+    )
+
+
+def test_transaction_history_queries_constant_per_page(
+    client, env, catalog, checkout_payload_for
+):
+    # a user of its own, so the other tests' orders do not change the pages
+    user_id = catalog.user_ids[-1]
+    headers = {"Authorization": f"Bearer {env.token('user', user_id)}"}
+    payload = checkout_payload_for(user_id)
+
+    # every seeded cart spans two sellers, one transaction each
+    for _ in range(LARGE_PAGE // 2):
+        created = client.post(
+            "/api/transactions/create", json=payload, headers=headers
+        )
+        assert created.status_code == 201
+
+    # also guards against per-request mapper configuration creeping back
+    # into history_load_options
+    history, status_code = get(client, "/api/transactions/", headers=headers)
+    assert status_code == 200
+    assert history["total_items"] >= LARGE_PAGE
+
+    assert_constant_per_page(
+        lambda per_page: get(
+            client,
+            "/api/transactions/",
+            query_string={"per_page": per_page},
+            headers=headers,
+        ),
+        key="transactions",
+    )